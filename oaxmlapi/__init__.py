@@ -1,2 +1,4 @@
 # Set modules to be exported with "from oaxmlapi import *"
-__all__ = ['base', 'commands', 'connections', 'datatypes', 'utilities']
+__all__ = ['base', 'batch', 'cache', 'columnar', 'commands', 'connections',
+    'datatypes', 'errors', 'pagination', 'records', 'retry', 'schema',
+    'session', 'sync', 'throttle', 'transport', 'utilities']
@@ -0,0 +1,257 @@
+# -*- coding: utf-8
+"""The aiotransport.py module sends Request objects to OpenAir
+concurrently from a single asyncio event loop. It speaks HTTP/1.1
+directly over asyncio streams, so overlapping requests do not need a
+thread each. Requires Python 3.5 or newer.
+"""
+
+import asyncio
+import ssl
+
+from urllib.parse import urlsplit
+
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+from oaxmlapi.transport import ENCODINGS, TransportError, _replayable, decode
+
+
+# errors raised when a pooled connection was closed by the server
+# while it sat idle; the request is retried once on a new connection
+_STALE_ERRORS = (ConnectionError, asyncio.IncompleteReadError, )
+
+
+class _Connection(object):
+    """
+    A single HTTP/1.1 connection made of an asyncio stream pair.
+
+    """
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self):
+        self.writer.close()
+
+    async def _read_chunked(self):
+        data = []
+        while True:
+            size = int((await self.reader.readline()).split(b';')[0], 16)
+            if size == 0:
+                # skip trailers
+                while (await self.reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                return b''.join(data)
+            data.append(await self.reader.readexactly(size))
+            await self.reader.readline()
+
+    async def roundtrip(self, host, path, body, headers):
+        """
+        Writes one POST and reads the full response. Returns a tuple
+        of (status, reason, will_close, data), with data decompressed.
+
+        """
+        await self.write(host, path, body, headers)
+        return await self.read()
+
+    async def write(self, host, path, body, headers):
+        """
+        Writes one POST and waits until it has been handed to the socket.
+
+        """
+        lines = ['POST {path} HTTP/1.1'.format(path=path),
+                 'Host: {host}'.format(host=host),
+                 'Content-Length: {length}'.format(length=len(body))]
+        for key, value in headers.items():
+            lines.append('{key}: {value}'.format(key=key, value=value))
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        await self.writer.drain()
+
+    async def read(self):
+        """
+        Reads the full response to the last POST, see roundtrip.
+
+        """
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError('connection closed by server')
+        version, status, reason = (status_line.decode('latin-1').rstrip('\r\n').split(' ', 2) + [''])[:3]
+
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            key, _, value = line.decode('latin-1').partition(':')
+            response_headers[key.strip().lower()] = value.strip()
+
+        will_close = (
+            version == 'HTTP/1.0' or
+            response_headers.get('connection', '').lower() == 'close'
+        )
+        if response_headers.get('transfer-encoding', '').lower() == 'chunked':
+            data = await self._read_chunked()
+        elif 'content-length' in response_headers:
+            data = await self.reader.readexactly(int(response_headers['content-length']))
+        else:
+            data = await self.reader.read()
+            will_close = True
+        data = decode(data, response_headers.get('content-encoding'))
+        return int(status), reason, will_close, data
+
+
+class AsyncClient(object):
+    """
+    Use the AsyncClient to POST many Request objects concurrently over
+    a pool of keep-alive connections.
+
+    Arguments:
+        url (str): the API endpoint, e.g. https://www.openair.com/api.pl
+        pool_size (int): the maximum number of open connections
+        keepalive (bool): reuse connections between calls (default: True)
+        timeout (float): the per-request timeout in seconds
+        compression (bool): ask for gzip or deflate responses
+                            (default: True)
+
+    """
+    def __init__(self, url, pool_size=4, keepalive=True, timeout=60,
+                 compression=True):
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise Exception('url scheme "{scheme}" must be http or https'.format(
+                scheme=parts.scheme))
+        if pool_size < 1:
+            raise Exception('pool_size must be at least 1')
+        self.url = url
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.path = parts.path or '/'
+        if parts.query:
+            self.path += '?' + parts.query
+        self.pool_size = pool_size
+        self.keepalive = keepalive
+        self.timeout = timeout
+        self.compression = compression
+        self._idle = []
+        self._slots = None
+
+    def __str__(self):
+        return '<AsyncClient url={url}>'.format(url=self.url)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """
+        Closes all idle pooled connections.
+
+        """
+        while self._idle:
+            self._idle.pop().close()
+
+    async def _new(self):
+        if self.scheme == 'https':
+            reader, writer = await asyncio.open_connection(
+                self.host, self.port, ssl=ssl.create_default_context())
+        else:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+        return _Connection(reader, writer)
+
+    def _headers(self):
+        headers = {
+            'Content-Type': 'text/xml; charset=utf-8',
+            'Connection': 'keep-alive' if self.keepalive else 'close',
+        }
+        if self.compression:
+            headers['Accept-Encoding'] = ', '.join(ENCODINGS)
+        return headers
+
+    async def _request(self, body, headers):
+        if self._slots is None:
+            # created lazily so the semaphore binds to the running loop
+            self._slots = asyncio.Semaphore(self.pool_size)
+        host = self.host if self.port in (80, 443) else '{host}:{port}'.format(
+            host=self.host, port=self.port)
+
+        sent = False
+
+        async def roundtrip(conn):
+            nonlocal sent
+            await conn.write(host, self.path, body, headers)
+            sent = True
+            return await conn.read()
+
+        async with self._slots:
+            reused = bool(self._idle)
+            conn = self._idle.pop() if reused else await self._new()
+            try:
+                try:
+                    result = await asyncio.wait_for(roundtrip(conn), self.timeout)
+                except _STALE_ERRORS as e:
+                    if not reused:
+                        raise
+                    if sent and not _replayable(body):
+                        # the server may have run the commands already
+                        raise TransportError(None, 'connection closed after '
+                            'the request was sent', b'') from e
+                    conn.close()
+                    conn = await self._new()
+                    result = await asyncio.wait_for(
+                        conn.roundtrip(host, self.path, body, headers), self.timeout)
+            except BaseException:
+                conn.close()
+                raise
+
+            status, reason, will_close, data = result
+            if self.keepalive and not will_close:
+                self._idle.append(conn)
+            else:
+                conn.close()
+
+        if status != 200:
+            raise TransportError(status, reason, data)
+        return data
+
+    async def post(self, body):
+        """
+        POSTs a bytestring of XML and returns the raw response bytes.
+
+        Arguments:
+            body (bytes): a serialized XML request
+
+        """
+        return await self._request(body, self._headers())
+
+    async def send(self, request):
+        """
+        Sends a Request and returns the parsed <response> element.
+
+        Arguments:
+            request (obj): a Request object
+
+        """
+        return ET.fromstring(await self.post(request.tostring()))
+
+    async def gather(self, requests, concurrency=None):
+        """
+        Sends every Request with at most concurrency of them in flight
+        and returns the parsed responses in the order given.
+
+        Arguments:
+            requests (list): a list of Request objects
+            concurrency (int): the in-flight limit (default: pool_size)
+
+        """
+        limit = asyncio.Semaphore(concurrency or self.pool_size)
+
+        async def _send(request):
+            async with limit:
+                return await self.send(request)
+
+        return await asyncio.gather(*[_send(r) for r in requests])
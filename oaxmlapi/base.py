@@ -3,6 +3,7 @@
 """
 
 from __future__ import absolute_import
+import hashlib
 from xml.dom import minidom
 
 try:
@@ -11,11 +12,123 @@ except ImportError:
     import xml.etree.ElementTree as ET
 
 
+def _sorted_attrib(attribs):
+    """
+    Return a copy of attribs ordered by key. ElementTree sorted
+    attributes on output until Python 3.8, so building elements from
+    an ordered dict keeps the serialized bytes identical everywhere.
+
+    """
+    return dict(sorted(attribs.items()))
+
+
+def _sorted_tree(elem):
+    """
+    Return a copy of elem with sorted attributes and its children,
+    recursively, sorted by their serialized bytes. Use it for elements
+    whose child order carries no meaning, such as datatype fields.
+
+    """
+    copy = ET.Element(elem.tag, _sorted_attrib(elem.attrib))
+    copy.text = elem.text
+    children = [_sorted_tree(child) for child in elem]
+    children.sort(key=lambda child: ET.tostring(child, 'utf-8'))
+    copy.extend(children)
+    return copy
+
+
+def _sort_filters(read, children):
+    """
+    Sort the filters of a canonical Read element, which all apply at
+    once. A filter is the name in the filter attribute, the name in
+    the field attribute and the datatype child at the same position;
+    they are only sorted when the three line up.
+
+    """
+    filters = read.get('filter', '').split(',') if read.get('filter') else []
+    fields = read.get('field', '').split(',') if read.get('field') else []
+    datatypes = [child for child in children if child.tag != '_Return']
+    if not fields and not datatypes:
+        if filters:
+            read.set('filter', ','.join(sorted(filters)))
+        return
+    if not len(filters) == len(fields) == len(datatypes):
+        return
+    triples = sorted(zip(filters, fields, datatypes),
+        key=lambda t: (t[0], t[1], ET.tostring(t[2], 'utf-8')))
+    read.set('filter', ','.join(t[0] for t in triples))
+    read.set('field', ','.join(t[1] for t in triples))
+    children[:] = [t[2] for t in triples] + [
+        child for child in children if child.tag == '_Return']
+
+
+def _canonical_command(elem):
+    """
+    Return a canonical copy of a command element: its own children
+    keep their order, since commands pair them with attributes, while
+    everything below them is sorted with _sorted_tree. The filters of
+    a Read are sorted with _sort_filters.
+
+    """
+    copy = ET.Element(elem.tag, _sorted_attrib(elem.attrib))
+    copy.text = elem.text
+    children = [_sorted_tree(child) for child in elem]
+    if elem.tag == 'Read':
+        _sort_filters(copy, children)
+    copy.extend(children)
+    return copy
+
+
+def _toelement(datatype):
+    """
+    Return the ElementTree object of a Datatype, or datatype itself
+    when it is already an element (or None).
+
+    """
+    getDatatype = getattr(datatype, 'getDatatype', None)
+    if getDatatype is not None:
+        return getDatatype()
+    return datatype
+
+
+class _LazyElement(object):
+    """
+    A descriptor for command attributes holding a Datatype. The
+    Datatype is stored as given under _name and only turned into an
+    ElementTree object the first time the attribute is read, i.e. at
+    serialization time. The element is kept under _name_element, so
+    every read returns the same object, until the attribute is set.
+
+    """
+    __slots__ = ('name', 'element', )
+
+    def __init__(self, name):
+        self.name = '_' + name
+        self.element = '_' + name + '_element'
+
+    def __get__(self, obj, cls):
+        if obj is None:
+            return self
+        elem = getattr(obj, self.element, None)
+        if elem is None:
+            elem = _toelement(getattr(obj, self.name))
+            setattr(obj, self.element, elem)
+        return elem
+
+    def __set__(self, obj, value):
+        setattr(obj, self.name, value)
+        setattr(obj, self.element, None)
+
+
 class _Base(object):
     """
-    A base class for defining helpful class methods.
+    A base class for defining helpful class methods. Subclasses
+    declare __slots__ so that large queues of commands and datatypes
+    do not carry a __dict__ per instance.
 
     """
+    __slots__ = ('_header', )
+
     def __init__(self):
         self._header = False
 
@@ -35,11 +148,33 @@ class _Base(object):
         if self._header:
             header = b'<?xml version="1.0" encoding="utf-8"?>'
 
-        if self._main() is not None:
-            body = ET.tostring(self._main(), 'utf-8')
+        # build the tree once; _main() may be expensive for large requests
+        elem = self._main()
+        if elem is not None:
+            body = ET.tostring(elem, 'utf-8')
 
         return (header if header else b'') + (body if body else b'')
 
+    def canonical(self):
+        """
+        Return a bytestring of XML tags in a canonical form, so that
+        logically identical objects give identical bytes whatever the
+        order their attributes and fields were given in.
+
+        """
+        elem = self._main()
+        if elem is None:
+            return b''
+        return ET.tostring(_canonical_command(elem), 'utf-8')
+
+    def digest(self):
+        """
+        Return a stable hex digest of canonical(), for deduplication
+        and cache keys.
+
+        """
+        return hashlib.sha1(self.canonical()).hexdigest()
+
     def prettify(self):
         """
         Return a formatted, prettified string containing XML tags. Note
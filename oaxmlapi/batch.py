@@ -0,0 +1,187 @@
+# -*- coding: utf-8
+"""The batch.py module packs many commands into as few <request>
+envelopes as possible and splits the responses back out so that each
+command gets its own result element.
+"""
+
+from __future__ import absolute_import
+
+import hashlib
+
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+from oaxmlapi.base import _Base, _canonical_command
+from oaxmlapi.connections import Request
+from oaxmlapi.utilities import AUTH_TAGS, StatusError
+
+
+MAX_COMMANDS = 50
+
+MAX_BYTES = 2 * 1024 * 1024
+
+# commands which can be sent once for every identical copy in a batch
+MERGE_TAGS = ('Read', )
+
+
+def pack(elements, max_commands=MAX_COMMANDS, max_bytes=MAX_BYTES, overhead=0):
+    """
+    Group command elements, in order, so that no group holds more than
+    max_commands elements or serializes to more than max_bytes once
+    overhead bytes of envelope are added. A command which is too big
+    on its own is placed in a group by itself.
+
+    Arguments:
+        elements (list): a list of ElementTree command objects
+        max_commands (int): the most commands per group
+        max_bytes (int): the largest serialized size per group
+        overhead (int): the serialized size of an empty envelope
+
+    """
+    if max_commands < 1:
+        raise Exception('max_commands must be at least 1')
+
+    groups = []
+    group, size = [], overhead
+    for elem in elements:
+        length = len(ET.tostring(elem, 'utf-8'))
+        if group and (len(group) >= max_commands or size + length > max_bytes):
+            groups.append(group)
+            group, size = [], overhead
+        group.append(elem)
+        size += length
+    if group:
+        groups.append(group)
+    return groups
+
+
+def results(response, describe=None):
+    """
+    Returns the command result elements of a <response> element, in
+    the order the commands were sent.
+
+    Arguments:
+        response (obj): a parsed <response> ElementTree object
+        describe (func): maps a status code to its text (optional)
+
+    """
+    for elem in response:
+        if elem.tag in AUTH_TAGS and elem.get('status', '0') != '0':
+            raise StatusError(elem.tag, elem.get('status'), describe)
+    return [elem for elem in response if elem.tag not in AUTH_TAGS]
+
+
+class Batch(object):
+    """
+    Use a Batch to send many commands in as few requests as possible.
+
+    Arguments:
+        application (obj): an Application object
+        auth (obj): an Auth or RemoteAuth object
+        commands (list): a list of command objects or ElementTree objects
+        max_commands (int): the most commands per request (default: 50)
+        max_bytes (int): the largest request body in bytes (default: 2MB)
+        merge (bool): send identical Read commands once and give each
+                      copy the same result; a Read is only merged with
+                      copies before it when no other command comes in
+                      between (default: True)
+
+    """
+    def __init__(self, application, auth, commands, max_commands=MAX_COMMANDS,
+                 max_bytes=MAX_BYTES, merge=True):
+        self.application = application
+        self.auth = auth
+        self.elements = []
+        self.index = []
+        seen = {}
+        for c in commands:
+            elem = c._main() if isinstance(c, _Base) else c
+            if elem.tag not in MERGE_TAGS:
+                # a write may change what a later copy of a Read returns
+                seen.clear()
+            key = None
+            if merge and elem.tag in MERGE_TAGS:
+                if isinstance(c, _Base):
+                    key = c.digest()
+                else:
+                    key = hashlib.sha1(ET.tostring(_canonical_command(elem), 'utf-8')).hexdigest()
+            if key is not None and key in seen:
+                self.index.append(seen[key])
+                continue
+            if key is not None:
+                seen[key] = len(self.elements)
+            self.index.append(len(self.elements))
+            self.elements.append(elem)
+        overhead = len(Request(application, auth, None).tostring())
+        self.groups = pack(self.elements, max_commands, max_bytes, overhead)
+
+    def __str__(self):
+        return '<Batch commands={commands} requests={requests}>'.format(
+            commands=len(self.index), requests=len(self.groups))
+
+    def requests(self):
+        """
+        Returns a list of Request objects, one per envelope.
+
+        """
+        return [Request(self.application, self.auth, g) for g in self.groups]
+
+    def split(self, responses, describe=None):
+        """
+        Returns one result element per command, in the order the
+        commands were given. Merged commands share a result.
+
+        Arguments:
+            responses (list): the parsed <response> elements, one per
+                              request returned by requests()
+            describe (func): maps a status code to its text (optional)
+
+        """
+        if len(responses) != len(self.groups):
+            raise Exception('expected {expected} responses, got {got}'.format(
+                expected=len(self.groups), got=len(responses)))
+
+        out = []
+        for group, response in zip(self.groups, responses):
+            found = results(response, describe)
+            if len(found) != len(group):
+                raise Exception('expected {expected} results, got {got}'.format(
+                    expected=len(group), got=len(found)))
+            out.extend(found)
+        return [out[i] for i in self.index]
+
+    def send(self, client, retry=None):
+        """
+        Sends every request with a transport.Client and returns one
+        result element per command. With a retry.Retry, only the
+        commands of a request which failed are sent again, and every
+        request is sent even when an earlier one fails for good; a
+        single retry.RetryError then carries the result of each
+        command, None for those without one.
+
+        Arguments:
+            client (obj): a transport.Client or session.Session object
+            retry (obj): a retry.Retry object (optional)
+
+        """
+        if retry is None:
+            return self.split([client.send(r) for r in self.requests()],
+                client.describe)
+        # retry.py imports this module
+        from oaxmlapi.retry import RetryError
+        out, error = [], None
+        for group, request in zip(self.groups, self.requests()):
+            try:
+                out.extend(retry.send(client, request))
+            except RetryError as e:
+                out.extend(e.results)
+                error = e.error
+            except Exception as e:
+                out.extend([None] * len(group))
+                error = e
+        found = [out[i] for i in self.index]
+        if error is not None:
+            raise RetryError(error, found)
+        return found
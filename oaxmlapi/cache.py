@@ -0,0 +1,328 @@
+# -*- coding: utf-8
+"""The cache.py module keeps the results of Read commands for a while
+so that repeated lookups within a run do not cost a round trip each.
+Results are cached per command and per company and user, never on
+passwords, and are dropped when a write to the same datatype goes
+through the client.
+"""
+
+from __future__ import absolute_import
+
+import collections
+import hashlib
+import sqlite3
+import threading
+import time
+
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+from oaxmlapi.base import _Base, _canonical_command
+from oaxmlapi.connections import Request
+from oaxmlapi.utilities import AUTH_TAGS
+
+
+# commands whose results are cached
+CACHED_TAGS = ('Read', )
+
+# commands which change records, and the datatypes they touch when
+# they carry no type attribute
+WRITE_TAGS = {
+    'Add': (),
+    'Modify': (),
+    'ModifyOnCondition': (),
+    'Delete': (),
+    'Submit': (),
+    'CreateUser': ('User', ),
+    'CreateAccount': ('Company', 'User', ),
+}
+
+
+class MemoryCache(object):
+    """
+    An in-process cache which evicts the least recently used entry
+    once it holds maxsize entries. Entries expire ttl seconds after
+    they were stored.
+
+    Arguments:
+        maxsize (int): the most entries kept (default: 1024)
+        ttl (float): the lifetime of an entry in seconds (default: 300)
+
+    """
+    def __init__(self, maxsize=1024, ttl=300):
+        if maxsize < 1:
+            raise Exception('maxsize must be at least 1')
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return '<MemoryCache entries={entries}>'.format(entries=len(self))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        Returns the value stored under key, or None when it is missing
+        or has expired.
+
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            expires, tag, value = entry
+            if expires < time.time():
+                return None
+            self._entries[key] = entry
+            return value
+
+    def set(self, key, value, tag):
+        """
+        Stores value under key. tag names the datatype the value
+        belongs to, for invalidate().
+
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.time() + self.ttl, tag, value)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tag):
+        """
+        Drops every entry stored with tag.
+
+        """
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if e[1] == tag]:
+                del self._entries[key]
+
+    def clear(self):
+        """
+        Drops every entry.
+
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+class SqliteCache(object):
+    """
+    A cache stored in an SQLite file, so entries survive between
+    processes. Eviction and expiry work as in MemoryCache.
+
+    Arguments:
+        path (str): the database file; ':memory:' for a private one
+        maxsize (int): the most entries kept (default: 10000)
+        ttl (float): the lifetime of an entry in seconds (default: 300)
+
+    """
+    def __init__(self, path, maxsize=10000, ttl=300):
+        if maxsize < 1:
+            raise Exception('maxsize must be at least 1')
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, '
+                'tag TEXT, expires REAL, used REAL, value BLOB)')
+            self._db.execute(
+                'CREATE INDEX IF NOT EXISTS entries_used ON entries (used)')
+
+    def __str__(self):
+        return '<SqliteCache path={path}>'.format(path=self.path)
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+
+    def close(self):
+        """
+        Closes the database.
+
+        """
+        self._db.close()
+
+    def get(self, key):
+        """
+        Returns the value stored under key, or None when it is missing
+        or has expired.
+
+        """
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                'SELECT value FROM entries WHERE key = ? AND expires >= ?',
+                (key, now)).fetchone()
+            if row is None:
+                return None
+            with self._db:
+                self._db.execute(
+                    'UPDATE entries SET used = ? WHERE key = ?', (now, key))
+            return bytes(row[0])
+
+    def set(self, key, value, tag):
+        """
+        Stores value under key. tag names the datatype the value
+        belongs to, for invalidate().
+
+        """
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)',
+                (key, tag, now + self.ttl, now, sqlite3.Binary(value)))
+            self._db.execute(
+                'DELETE FROM entries WHERE key IN (SELECT key FROM entries '
+                'ORDER BY used DESC LIMIT -1 OFFSET ?)', (self.maxsize, ))
+
+    def invalidate(self, tag):
+        """
+        Drops every entry stored with tag.
+
+        """
+        with self._lock, self._db:
+            self._db.execute('DELETE FROM entries WHERE tag = ?', (tag, ))
+
+    def clear(self):
+        """
+        Drops every entry.
+
+        """
+        with self._lock, self._db:
+            self._db.execute('DELETE FROM entries')
+
+
+def scope(auth):
+    """
+    Returns the part of a cache key which identifies who is reading:
+    the company and user, without the password.
+
+    Arguments:
+        auth (obj): an Auth, RemoteAuth or SessionAuth object
+
+    """
+    return u'{company}\0{username}\0'.format(
+        company=auth.company, username=auth.username).encode('utf-8')
+
+
+def key(auth, elem):
+    """
+    Returns the cache key of a command element read by auth. The
+    element is put in canonical form first, so field order does not
+    matter.
+
+    Arguments:
+        auth (obj): an Auth, RemoteAuth or SessionAuth object
+        elem (obj): a command ElementTree object
+
+    """
+    return hashlib.sha1(
+        scope(auth) + ET.tostring(_canonical_command(elem), 'utf-8')).hexdigest()
+
+
+def written(command):
+    """
+    Returns the datatypes a command writes to, or None when that
+    cannot be told, e.g. for a serialized command.
+
+    Arguments:
+        command (obj): a command object, an ElementTree object or bytes
+
+    """
+    if isinstance(command, _Base):
+        tag, type = command.__class__.__name__, getattr(command, 'type', None)
+    elif isinstance(command, bytes):
+        return None
+    else:
+        tag, type = command.tag, command.get('type')
+    if tag not in WRITE_TAGS:
+        return ()
+    return ((type, ) if type else ()) + WRITE_TAGS[tag]
+
+
+def invalidate(cache, commands):
+    """
+    Drops the cached results of every datatype written by commands,
+    or the whole cache when a command cannot be inspected.
+
+    Arguments:
+        cache (obj): a MemoryCache or SqliteCache object
+        commands (list): command objects, ElementTree objects or bytes
+
+    """
+    for command in commands:
+        types = written(command)
+        if types is None:
+            cache.clear()
+            return
+        for type in types:
+            cache.invalidate(type)
+
+
+def send_cached(cache, sender, request):
+    """
+    Sends a Request through a cache. Cached Read results are reused
+    and only the remaining commands are sent with sender(); new Read
+    results are stored. A Read of a datatype which the same request
+    writes is never served from or stored in the cache, since it may
+    run before or after the write. Writes invalidate their datatypes
+    once the results are stored. Returns a <response> element holding
+    one result per command, in order.
+
+    Arguments:
+        cache (obj): a MemoryCache or SqliteCache object
+        sender (func): sends a Request and returns the <response> element
+        request (obj): a Request object
+
+    """
+    elements = list(request.xml_data or ())
+    writes = set()
+    for elem in elements:
+        writes.update(written(elem))
+    keys = [
+        key(request.auth, elem)
+        if elem.tag in CACHED_TAGS and elem.get('type') not in writes else None
+        for elem in elements
+    ]
+    found = [cache.get(k) if k is not None else None for k in keys]
+    missing = [elem for elem, hit in zip(elements, found) if hit is None]
+    if elements and not missing:
+        response = ET.Element('response')
+        ET.SubElement(response, request.auth._main().tag, {'status': '0'})
+        for hit in found:
+            response.append(ET.fromstring(hit))
+        return response
+
+    # invalidated last, so no result stored here outlives a write
+    try:
+        sent = sender(Request(request.application, request.auth, missing))
+
+        auth = [elem for elem in sent if elem.tag in AUTH_TAGS]
+        results = iter([elem for elem in sent if elem.tag not in AUTH_TAGS])
+        if any(a.get('status', '0') != '0' for a in auth):
+            return sent
+
+        response = ET.Element('response', sent.attrib)
+        response.extend(auth)
+        for k, elem, hit in zip(keys, elements, found):
+            if hit is not None:
+                response.append(ET.fromstring(hit))
+                continue
+            result = next(results, None)
+            if result is None:
+                break
+            if k is not None and result.get('status') == '0':
+                cache.set(k, ET.tostring(result, 'utf-8'), elem.get('type'))
+            response.append(result)
+        return response
+    finally:
+        invalidate(cache, missing)
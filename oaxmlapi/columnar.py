@@ -0,0 +1,363 @@
+# -*- coding: utf-8
+"""The columnar.py module collects response records straight into
+typed column arrays, without building a dictionary per record, and
+writes them out as CSV or a compact binary file.
+"""
+
+from __future__ import absolute_import
+
+import array
+import csv
+import datetime
+import json
+import math
+import struct
+import sys
+
+from oaxmlapi.records import _compact, decode
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+COLUMN_TYPES = ('str', 'int', 'float', 'date', 'datetime', )
+
+# missing int and datetime values; missing floats are NaN and missing
+# dates are ordinal 0
+MISSING_INT = -2 ** 63
+
+MAGIC = b'OAXC'
+
+
+def _int64_typecode():
+    # Python 2 has no 'q'; its 'l' is 64-bit on most Unix builds, and a
+    # double still holds every integer up to 2 ** 53 exactly
+    try:
+        array.array('q')
+        return 'q'
+    except ValueError:
+        return 'l' if array.array('l').itemsize == 8 else 'd'
+
+
+_INT64 = _int64_typecode()
+
+_TYPECODES = {'int': _INT64, 'float': 'd', 'date': 'i', 'datetime': _INT64}
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def _to_int(elem):
+    text = (elem.text or '').strip()
+    return int(text) if text else MISSING_INT
+
+
+def _to_float(elem):
+    text = (elem.text or '').strip()
+    return float(text) if text else float('nan')
+
+
+def _to_date(elem):
+    value = decode(_compact(elem))
+    if value is None or isinstance(value, str):
+        return 0
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    return value.toordinal()
+
+
+def _to_datetime(elem):
+    value = decode(_compact(elem))
+    if value is None or isinstance(value, str):
+        return MISSING_INT
+    if not isinstance(value, datetime.datetime):
+        value = datetime.datetime(value.year, value.month, value.day)
+    delta = value - _EPOCH
+    return delta.days * 86400 + delta.seconds
+
+
+def _to_str(elem):
+    return elem.text
+
+
+_CONVERTERS = {
+    'str': _to_str,
+    'int': _to_int,
+    'float': _to_float,
+    'date': _to_date,
+    'datetime': _to_datetime,
+}
+
+_MISSING = {
+    'str': None,
+    'int': MISSING_INT,
+    'float': float('nan'),
+    'date': 0,
+    'datetime': MISSING_INT,
+}
+
+
+class Columns(object):
+    """
+    Use Columns to collect records into one array per field. Numeric
+    and date columns are stored in array.array objects: int as 64-bit
+    integers, float as doubles, date as proleptic Gregorian ordinals
+    and datetime as seconds since 1970-01-01. str columns are lists.
+
+    Arguments:
+        fields (list): the field names to collect
+        types (dict): maps field names to one of str, int, float,
+                      date or datetime (default: str)
+
+    """
+    def __init__(self, fields, types=None):
+        types = types or {}
+        for name, t in types.items():
+            if t not in COLUMN_TYPES:
+                raise Exception('type "{type}" must be one of {allowed}'.format(
+                    type=t, allowed=COLUMN_TYPES))
+            if name not in fields:
+                raise Exception('"{name}" is not one of the fields'.format(name=name))
+        self.fields = list(fields)
+        self.types = dict((f, types.get(f, 'str')) for f in self.fields)
+        self.columns = dict(
+            (f, [] if self.types[f] == 'str' else array.array(_TYPECODES[self.types[f]]))
+            for f in self.fields
+        )
+        self.length = 0
+        self._convert = dict(
+            (f, (self.columns[f], _CONVERTERS[self.types[f]])) for f in self.fields)
+        self._missing = [(self.columns[f], _MISSING[self.types[f]]) for f in self.fields]
+
+    def __str__(self):
+        return '<Columns fields={fields} rows={rows}>'.format(
+            fields=len(self.fields), rows=self.length)
+
+    def __len__(self):
+        return self.length
+
+    def append(self, elem):
+        """
+        Adds one record element, such as <Timesheet>, to the columns.
+
+        Arguments:
+            elem (obj): a record ElementTree object
+
+        """
+        length = self.length
+        convert = self._convert
+        for child in elem:
+            found = convert.get(child.tag)
+            # a column longer than length already has this record's value
+            if found is not None and len(found[0]) == length:
+                found[0].append(found[1](child))
+        for column, missing in self._missing:
+            if len(column) == length:
+                column.append(missing)
+        self.length = length + 1
+
+    def extend(self, elems):
+        """
+        Adds every record element of an iterable to the columns.
+
+        """
+        for elem in elems:
+            self.append(elem)
+
+    def column(self, name):
+        """
+        Returns the array (or list, for str columns) of one field.
+
+        """
+        return self.columns[name]
+
+    def rows(self):
+        """
+        A generator which yields one tuple of Python values per row,
+        with None for missing values.
+
+        """
+        readers = [(self.columns[f], self.types[f]) for f in self.fields]
+        for i in range(self.length):
+            yield tuple(_value(column[i], t) for column, t in readers)
+
+    def tonumpy(self):
+        """
+        Returns a dictionary of NumPy arrays sharing memory with the
+        columns. Date columns become datetime64[D] and datetime
+        columns datetime64[s], with missing values as NaT.
+
+        """
+        if numpy is None:
+            raise Exception('tonumpy() requires numpy to be installed')
+        out = {}
+        for f in self.fields:
+            t, column = self.types[f], self.columns[f]
+            if t == 'str':
+                out[f] = numpy.array(column, dtype=object)
+            elif t == 'int':
+                out[f] = numpy.frombuffer(column, dtype=column.typecode).astype(
+                    numpy.int64, copy=False)
+            elif t == 'float':
+                out[f] = numpy.frombuffer(column, dtype=numpy.float64)
+            elif t == 'date':
+                ordinals = numpy.frombuffer(column, dtype=numpy.int32)
+                days = ordinals.astype(numpy.int64) - _EPOCH.toordinal()
+                days[ordinals == 0] = MISSING_INT
+                out[f] = days.view('datetime64[D]')
+            else:
+                out[f] = numpy.frombuffer(column, dtype=column.typecode).astype(
+                    numpy.int64, copy=False).view('datetime64[s]')
+        return out
+
+    def tocsv(self, fp):
+        """
+        Writes a header row and one row per record to a text file
+        opened with newline=''. Dates are written in ISO format and
+        missing values as empty cells.
+
+        """
+        writer = csv.writer(fp)
+        writer.writerow(self.fields)
+        for row in self.rows():
+            writer.writerow([
+                '' if v is None else (v.isoformat() if hasattr(v, 'isoformat') else v)
+                for v in row
+            ])
+
+    def tobinary(self, fp):
+        """
+        Writes the columns to a binary file: MAGIC, a length-prefixed
+        JSON header, then each column's bytes in field order. The
+        header records the array typecode and item size of each
+        numeric column, which differ between platforms. str columns
+        are stored as int32 byte lengths (-1 for None) followed by the
+        UTF-8 text.
+
+        """
+        blobs = []
+        for f in self.fields:
+            column = self.columns[f]
+            if self.types[f] == 'str':
+                encoded = [None if v is None else v.encode('utf-8') for v in column]
+                lengths = array.array('i', [-1 if v is None else len(v) for v in encoded])
+                blobs.append(_tobytes(lengths) + b''.join(v for v in encoded if v))
+            else:
+                blobs.append(_tobytes(column))
+
+        header = json.dumps({
+            'fields': self.fields,
+            'types': self.types,
+            'length': self.length,
+            'byteorder': sys.byteorder,
+            'sizes': [len(b) for b in blobs],
+            'typecodes': [getattr(self.columns[f], 'typecode', None) for f in self.fields],
+            'itemsizes': [getattr(self.columns[f], 'itemsize', None) for f in self.fields],
+        }).encode('utf-8')
+        fp.write(MAGIC + struct.pack('<I', len(header)) + header)
+        for blob in blobs:
+            fp.write(blob)
+
+    @classmethod
+    def frombinary(cls, fp):
+        """
+        Reads columns written by tobinary(). A numeric column written
+        with another typecode or item size than this platform uses is
+        converted value by value.
+
+        """
+        if fp.read(4) != MAGIC:
+            raise Exception('not a columnar file')
+        size = struct.unpack('<I', fp.read(4))[0]
+        header = json.loads(fp.read(size).decode('utf-8'))
+        columns = cls(header['fields'], header['types'])
+        swap = header['byteorder'] != sys.byteorder
+        # files written before typecodes were recorded used this platform's
+        typecodes = header.get('typecodes') or [None] * len(columns.fields)
+        itemsizes = header.get('itemsizes') or [None] * len(columns.fields)
+        for f, blob_size, typecode, itemsize in zip(columns.fields,
+                header['sizes'], typecodes, itemsizes):
+            blob = fp.read(blob_size)
+            if columns.types[f] == 'str':
+                lengths = array.array('i')
+                _frombytes(lengths, blob[:4 * header['length']])
+                if swap:
+                    lengths.byteswap()
+                values, pos = [], 4 * header['length']
+                for n in lengths:
+                    if n < 0:
+                        values.append(None)
+                    else:
+                        values.append(blob[pos:pos + n].decode('utf-8'))
+                        pos += n
+                columns.columns[f][:] = values
+            elif typecode is not None and _format(typecode, itemsize) != _format(
+                    columns.columns[f].typecode, columns.columns[f].itemsize):
+                columns.columns[f].extend(_unpack(blob, typecode, itemsize,
+                    header['byteorder'], columns.columns[f].typecode))
+            else:
+                _frombytes(columns.columns[f], blob)
+                if swap:
+                    columns.columns[f].byteswap()
+        columns.length = header['length']
+        return columns
+
+
+def _value(raw, t):
+    """
+    Converts one stored column value back into a Python value.
+
+    """
+    if t == 'str':
+        return raw
+    if t == 'float':
+        return None if math.isnan(raw) else raw
+    if t == 'date':
+        return datetime.date.fromordinal(raw) if raw else None
+    if raw == MISSING_INT:
+        return None
+    if t == 'datetime':
+        return _EPOCH + datetime.timedelta(seconds=raw)
+    # int columns are doubles where array has no 64-bit integer type
+    return int(raw)
+
+
+def _format(typecode, itemsize):
+    """
+    Returns the struct format character of an array typecode and item
+    size, e.g. q for 'l' on a platform where it is 64 bits wide.
+
+    """
+    if typecode in ('f', 'd'):
+        formats = {4: 'f', 8: 'd'}
+    else:
+        formats = {2: 'h', 4: 'i', 8: 'q'}
+    if itemsize not in formats:
+        raise Exception('cannot read a column of typecode "{typecode}" and item size {size}'.format(
+            typecode=typecode, size=itemsize))
+    return formats[itemsize]
+
+
+def _unpack(blob, typecode, itemsize, byteorder, target):
+    """
+    Returns the values of a column blob written with another typecode,
+    converted for an array of the target typecode.
+
+    """
+    fmt = '{order}{count}{format}'.format(
+        order='<' if byteorder == 'little' else '>',
+        count=len(blob) // itemsize, format=_format(typecode, itemsize))
+    convert = float if target in ('f', 'd') else int
+    return [convert(v) for v in struct.unpack(fmt, blob)]
+
+
+def _tobytes(arr):
+    return arr.tobytes() if hasattr(arr, 'tobytes') else arr.tostring()
+
+
+def _frombytes(arr, data):
+    if hasattr(arr, 'frombytes'):
+        arr.frombytes(data)
+    else:
+        arr.fromstring(data)
@@ -9,9 +9,10 @@ try:
 except ImportError:
     import xml.etree.ElementTree as ET
 
-from oaxmlapi.base import _Base
-from oaxmlapi.utilities import (READ_METHODS, REPORT_TYPES, SUBMIT_TYPES,
-    SWITCH_TYPES, PAGE_ATTRIBUTES, APP_ATTRIBUTES, )
+from oaxmlapi.base import _Base, _LazyElement, _sorted_attrib, _toelement
+from oaxmlapi.schema import default as _default_schema
+from oaxmlapi.utilities import (READ_METHODS, READ_ATTRIBUTES, REPORT_TYPES,
+    SUBMIT_TYPES, SWITCH_TYPES, PAGE_ATTRIBUTES, APP_ATTRIBUTES, )
 
 
 class Time(_Base):
@@ -22,6 +23,8 @@ class Time(_Base):
         none
 
     """
+    __slots__ = ()
+
     def __init__(self):
         _Base.__init__(self)
 
@@ -47,11 +50,14 @@ class Read(_Base):
         type (str): a valid XML type
         method (str): a valid read method
         attribs (dict): a dictionary containing read attributes
-        filters (list): a list of filter types
+        filters (list): a list of Read.Filter objects or of dictionaries
+                        from Read.Filter.getFilter()
         orderby (list): a dictionary containing order attributes (field, order)
         return_fields (list): a list of fields to return
 
     """
+    __slots__ = ('type', '_method', 'attribs', 'filters', 'orderby', 'fields', )
+
     def __init__(self, type, method, attribs, filters=None, orderby=None, fields=None):
         _Base.__init__(self)
         self.type = type
@@ -71,10 +77,7 @@ class Read(_Base):
 
     @method.setter
     def method(self, m):
-        if not m in READ_METHODS:
-            raise Exception('method "{method}" must be one of {allowed}'.format(
-                method=m, allowed=READ_METHODS))
-        self._method = m
+        self._method = READ_METHODS.check(m)
 
     def read(self):
         """
@@ -97,15 +100,20 @@ class Read(_Base):
             field_list = []
 
             for item in self.filters:
+                if isinstance(item, Read.Filter):
+                    item = {'filter': item.filter, 'fieldname': item.fieldname,
+                        'datatype': item.datatype}
+                datatype = _toelement(item['datatype'])
+
                 if item['filter']:
                     filter_list.append(item['filter'])
 
-                elif item['datatype']:  # pragma: no cover -> need to figure this out
-                    elem.append(item['datatype'])
+                elif datatype is not None and len(datatype):  # pragma: no cover -> need to figure this out
+                    elem.append(datatype)
 
                 if item['fieldname']:
                     field_list.append(item['fieldname'])
-                    elem.append(item['datatype'])
+                    elem.append(datatype)
 
             if field_list:
                 attribs['field'] = ','.join(field_list)
@@ -120,7 +128,7 @@ class Read(_Base):
             attribs['order'] = ','.join([field, order])
 
         # add all attribs to the XML element
-        elem.attrib = attribs
+        elem.attrib = _sorted_attrib(attribs)
 
         # process return fields
         if self.fields:
@@ -134,10 +142,43 @@ class Read(_Base):
     def _main(self):
         return self.read()
 
+    def validate(self, schema=None):
+        """
+        Check the read type, the _Return fields and any filter
+        datatypes against an OpenAir schema and the read attributes
+        against READ_ATTRIBUTES. Raises an Exception for an unknown
+        read attribute; unknown datatype and field names are handled
+        as in Schema.check_field.
+
+        Arguments:
+            schema (obj): a schema.Schema object (default: the bundled schema)
+
+        Returns:
+            self (obj): this Read, so calls can be chained
+
+        """
+        schema = schema or _default_schema()
+        schema.check_datatype(self.type)
+        for key in self.attribs or {}:
+            READ_ATTRIBUTES.check(key)
+        if self.fields:
+            schema.check_return(self.type, self.fields)
+        for item in self.filters or ():
+            if isinstance(item, Read.Filter):
+                datatype = item._datatype
+            else:
+                datatype = item['datatype']
+            validate = getattr(datatype, 'validate', None)
+            if validate is not None:
+                validate(schema)
+        return self
+
 
     class Filter(object):
         """
-        Creates a filter object for filtering read commands.
+        Creates a filter object for filtering read commands. Pass it
+        to Read as it is to keep the Datatype until the Read is
+        serialized, or as a dictionary from getFilter().
 
         Arguments:
             filter (str): the type of filter
@@ -145,10 +186,14 @@ class Read(_Base):
             datatype (obj): a valid XML element
 
         """
+        __slots__ = ('filter', 'fieldname', '_datatype', '_datatype_element', )
+
+        datatype = _LazyElement('datatype')
+
         def __init__(self, filter, fieldname, datatype):
             self.filter = filter
             self.fieldname = fieldname
-            self.datatype = datatype.getDatatype()
+            self.datatype = datatype
 
         def __str__(self):
             return "<Filter type={type} field={field}>".format(
@@ -156,7 +201,8 @@ class Read(_Base):
 
         def getFilter(self):
             """
-            Returns a dictionary of filter criteria.
+            Returns a dictionary of filter criteria. The datatype is an
+            ElementTree object.
 
             """
             f = {}
@@ -177,10 +223,14 @@ class Report(_Base):
         datatype (obj): a valid XML report element datatype
 
     """
+    __slots__ = ('_type', '_datatype', '_datatype_element', )
+
+    datatype = _LazyElement('datatype')
+
     def __init__(self, type, datatype):
         _Base.__init__(self)
         self.type = type
-        self.datatype = datatype.getDatatype()
+        self.datatype = datatype
 
     def __str__(self):
         return "<Report type={type}>".format(type=self.type)
@@ -191,10 +241,7 @@ class Report(_Base):
 
     @type.setter
     def type(self, t):
-        if not t in REPORT_TYPES:
-            raise Exception('type "{type}" must be one of {allowed}'.format(
-                type=t, allowed=REPORT_TYPES))
-        self._type = t
+        self._type = REPORT_TYPES.check(t)
 
     def getReport(self):
         """
@@ -222,11 +269,15 @@ class Add(_Base):
         datatype (obj): a valid Datatype() object
 
     """
+    __slots__ = ('_type', 'attribs', '_datatype', '_datatype_element', )
+
+    datatype = _LazyElement('datatype')
+
     def __init__(self, type, attribs, datatype):
         _Base.__init__(self)
         self.type = type
         self.attribs = attribs
-        self.datatype = datatype.getDatatype()
+        self.datatype = datatype
 
     def __str__(self):
         return '<Add type={type}>'.format(type=self.type)
@@ -259,7 +310,7 @@ class Add(_Base):
         for key in self.attribs:
             attribs[key] = self.attribs[key]
 
-        elem.attrib = attribs
+        elem.attrib = _sorted_attrib(attribs)
         elem.append(self.datatype)
         return elem
 
@@ -276,10 +327,14 @@ class Delete(_Base):
         datatype (obj): a valid Datatype() object
 
     """
+    __slots__ = ('type', '_datatype', '_datatype_element', )
+
+    datatype = _LazyElement('datatype')
+
     def __init__(self, type, datatype):
         _Base.__init__(self)
         self.type = type
-        self.datatype = datatype.getDatatype()
+        self.datatype = datatype
 
     def __str__(self):
         return '<Delete type={type}>'.format(type=self.type)
@@ -310,11 +365,15 @@ class Modify(_Base):
         datatype (obj): a valid Datatype() object
 
     """
+    __slots__ = ('type', 'attribs', '_datatype', '_datatype_element', )
+
+    datatype = _LazyElement('datatype')
+
     def __init__(self, type, attribs, datatype):
         _Base.__init__(self)
         self.type = type
         self.attribs = attribs
-        self.datatype = datatype.getDatatype()
+        self.datatype = datatype
 
     def __str__(self):
         return '<Modify type={type}>'.format(type=self.type)
@@ -332,7 +391,7 @@ class Modify(_Base):
         for key in self.attribs:
             attribs[key] = self.attribs[key]
 
-        elem.attrib = attribs
+        elem.attrib = _sorted_attrib(attribs)
         elem.append(self.datatype)
         return elem
 
@@ -352,11 +411,17 @@ class ModifyOnCondition(_Base):
         datatype2 (obj): a valid Datatype() object of type "Date"
 
     """
+    __slots__ = ('type', '_datatype1', '_datatype1_element', '_datatype2',
+        '_datatype2_element', )
+
+    datatype1 = _LazyElement('datatype1')
+    datatype2 = _LazyElement('datatype2')
+
     def __init__(self, type, datatype1, datatype2):
         _Base.__init__(self)
         self.type = type
-        self.datatype1 = datatype1.getDatatype()
-        self.datatype2 = datatype2.getDatatype()
+        self.datatype1 = datatype1
+        self.datatype2 = datatype2
 
     def __str__(self):
         return '<ModifyOnCondition type={type}>'.format(type=self.type)
@@ -389,11 +454,17 @@ class Submit(_Base):
         approval (obj): a valid approval Datatype() object
 
     """
+    __slots__ = ('_type', '_datatype', '_datatype_element', '_approval',
+        '_approval_element', )
+
+    datatype = _LazyElement('datatype')
+    approval = _LazyElement('approval')
+
     def __init__(self, type, datatype, approval):
         _Base.__init__(self)
         self.type = type
-        self.datatype = datatype.getDatatype()
-        self.approval = approval.getDatatype()
+        self.datatype = datatype
+        self.approval = approval
 
     def __str__(self):
         return '<Submit type={type}>'.format(type=self.type)
@@ -401,14 +472,11 @@ class Submit(_Base):
     # type
     @property
     def type(self):
-        return self._datatype
+        return self._type
 
     @type.setter
     def type(self, t):
-        if not t in SUBMIT_TYPES:
-            raise Exception('type "{type}" must be one of {allowed}'.format(
-                type=t, allowed=SUBMIT_TYPES))
-        self._datatype = t
+        self._type = SUBMIT_TYPES.check(t)
 
     def submit(self):
         """
@@ -438,6 +506,8 @@ class CreateAccount(_Base):
         user (obj): a valid user Datatype() object
 
     """
+    __slots__ = ('_company', '_user', )
+
     def __init__(self, company, user):
         _Base.__init__(self)
         self.company = company
@@ -496,6 +566,8 @@ class CreateUser(_Base):
         user (obj): a valid user Datatype() object
 
     """
+    __slots__ = ('_company', '_user', )
+
     def __init__(self, company, user):
         _Base.__init__(self)
         self.company = company
@@ -554,6 +626,8 @@ class Switch(_Base):
         datatype (obj): a valid flag Datatype object
 
     """
+    __slots__ = ('_type', 'datatype', )
+
     def __init__(self, type, datatype):
         _Base.__init__(self)
         self.type = type
@@ -569,10 +643,7 @@ class Switch(_Base):
 
     @type.setter
     def type(self, t):
-        if not t in SWITCH_TYPES:
-            raise Exception('type "{type}" must be one of {allowed}'.format(
-                type=t, allowed=SWITCH_TYPES))
-        self._type = t
+        self._type = SWITCH_TYPES.check(t)
 
     def switch(self):
         """
@@ -599,6 +670,8 @@ class MakeURL(_Base):
         arg (obj): a Datatype object
 
     """
+    __slots__ = ('uid', '_page', '_app', 'arg', )
+
     def __init__(self, uid, page, app, arg):
         _Base.__init__(self)
         self.uid = uid
@@ -616,10 +689,7 @@ class MakeURL(_Base):
 
     @page.setter
     def page(self, p):
-        if not p in PAGE_ATTRIBUTES:
-            raise Exception('page "{page}" must be one of {allowed}'.format(
-                page=p, allowed=PAGE_ATTRIBUTES))
-        self._page = p
+        self._page = PAGE_ATTRIBUTES.check(p)
 
     @property
     def app(self):
@@ -627,10 +697,7 @@ class MakeURL(_Base):
 
     @app.setter
     def app(self, a):
-        if not a in APP_ATTRIBUTES:
-            raise Exception('app "{app}" must be one of {allowed}'.format(
-                app=a, allowed=APP_ATTRIBUTES))
-        self._app = a
+        self._app = APP_ATTRIBUTES.check(a)
 
     def makeurl(self):
         """
@@ -26,6 +26,8 @@ class Application(object):
         key (str): a key string
 
     """
+    __slots__ = ('client', 'client_version', 'namespace', 'key', )
+
     def __init__(self, client, client_version, namespace, key):
         self.client = client
         self.client_version = client_version
@@ -47,6 +49,8 @@ class Auth(_Base):
         password (str): a password string
 
     """
+    __slots__ = ('company', 'username', 'password', '_envelope', )
+
     def __init__(self, company, username, password):
         _Base.__init__(self)
         self.company = company
@@ -93,6 +97,8 @@ class RemoteAuth(_Base):
         password (str): a password string
 
     """
+    __slots__ = ('company', 'username', 'password', '_envelope', )
+
     def __init__(self, company, username, password):
         _Base.__init__(self)
         self.company = company
@@ -129,6 +135,53 @@ class RemoteAuth(_Base):
         return self.remoteauth()
 
 
+class SessionAuth(_Base):
+    """
+    Use SessionAuth to authenticate with a session token issued by an
+    earlier login instead of sending the password again. See
+    session.Session, which manages the token.
+
+    Arguments:
+        company (str): a company string
+        username (str): a username string
+        session (str): a session token string
+
+    """
+    __slots__ = ('company', 'username', 'session', '_envelope', )
+
+    def __init__(self, company, username, session):
+        _Base.__init__(self)
+        self.company = company
+        self.username = username
+        self.session = session
+
+    def __str__(self):
+        return "<SessionAuth company={company} username={username}>".format(
+            company=self.company, username=self.username)
+
+    def sessionauth(self):
+        """
+        Returns an ElementTree object containing an XML Auth tag
+        which carries the session token.
+
+        """
+        auth = ET.Element('Auth')
+        session = ET.SubElement(auth, 'Session')
+
+        company = ET.SubElement(session, 'company')
+        company.text = self.company
+
+        username = ET.SubElement(session, 'user')
+        username.text = self.username
+
+        token = ET.SubElement(session, 'id')
+        token.text = self.session
+        return auth
+
+    def _main(self):
+        return self.sessionauth()
+
+
 class Whoami(_Base):
     """
     Use the Whoami command to return info about the authenticated user.
@@ -137,6 +190,8 @@ class Whoami(_Base):
         datatype (obj): a Datatype object
 
     """
+    __slots__ = ('_datatype', )
+
     def __init__(self, datatype):
         _Base.__init__(self)
         self.datatype = datatype
@@ -177,10 +232,12 @@ class Request(_Base):
 
     Arguments:
         application (obj): an Application object
-        auth (obj): an Auth object
+        auth (obj): an Auth, RemoteAuth or SessionAuth object
         xml_data (list): a list of Datatype object
 
     """
+    __slots__ = ('application', 'auth', 'xml_data', )
+
     def __init__(self, application, auth, xml_data):
         _Base.__init__(self)
         self.application = application
@@ -204,16 +261,18 @@ class Request(_Base):
             'API_ver': '1.0',
             'client': self.application.client,
             'client_ver': self.application.client_version,
-            'namespace': self.application.namespace,
-            'key': self.application.key
+            'key': self.application.key,
+            'namespace': self.application.namespace
         }
 
         if isinstance(self.auth, Auth):
             request.append(self.auth.auth())
         elif isinstance(self.auth, RemoteAuth):
             request.append(self.auth.remoteauth())
+        elif isinstance(self.auth, SessionAuth):
+            request.append(self.auth.sessionauth())
         else:
-            raise Exception('you must pass an Auth or RemoteAuth instance')
+            raise Exception('you must pass an Auth, RemoteAuth or SessionAuth instance')
 
         if self.xml_data:
             for elem in self.xml_data:
@@ -224,6 +283,104 @@ class Request(_Base):
     def _main(self):
         return self.request()
 
+    def envelope(self):
+        """
+        Returns a tuple of (prefix, suffix) bytes: the XML declaration,
+        the request tag and the auth subtree, and the closing request
+        tag. The bytes are cached on the auth object, which already
+        holds the credentials, for as long as neither they nor the
+        application change.
+
+        """
+        app, auth = self.application, self.auth
+        key = (app.client, app.client_version, app.namespace, app.key,
+            getattr(auth, 'company', None), getattr(auth, 'username', None),
+            getattr(auth, 'password', None), getattr(auth, 'session', None))
+        cached = getattr(auth, '_envelope', None)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        body = _Base.tostring(Request(app, auth, None))
+        envelope = (body[:-len(b'</request>')], b'</request>')
+        auth._envelope = (key, envelope)
+        return envelope
+
+    def tostring(self):
+        """
+        Return a bytestring containing the XML request. Only the
+        command elements are serialized per call; the envelope comes
+        from the cache.
+
+        """
+        prefix, suffix = self.envelope()
+        if not self.xml_data:
+            return prefix + suffix
+        return prefix + b''.join(
+            [ET.tostring(elem, 'utf-8') for elem in self.xml_data]) + suffix
+
+
+class RequestWriter(object):
+    """
+    Use the RequestWriter to stream a complete XML request command by
+    command, so that huge Add or Modify uploads never exist as one
+    tree. The output is byte-for-byte what Request.tostring() returns
+    for the same commands.
+
+    Arguments:
+        application (obj): an Application object
+        auth (obj): an Auth, RemoteAuth or SessionAuth object
+
+    """
+    def __init__(self, application, auth):
+        self.application = application
+        self.auth = auth
+
+    def __str__(self):
+        return '<RequestWriter client={client} company={company} username={username}>'.format(
+            client=self.application.client, company=self.auth.company,
+            username=self.auth.username)
+
+    def chunks(self, commands):
+        """
+        A generator which yields the request as bytestrings: the
+        envelope prefix, one chunk per command and the suffix.
+        Commands are only pulled from the iterable as chunks are
+        consumed.
+
+        Arguments:
+            commands (iter): command objects, ElementTree objects or
+                             already serialized bytestrings
+
+        """
+        prefix, suffix = Request(self.application, self.auth, None).envelope()
+        yield prefix
+        for command in commands:
+            if isinstance(command, bytes):
+                yield command
+            elif isinstance(command, _Base):
+                yield command.tostring()
+            else:
+                yield ET.tostring(command, 'utf-8')
+        yield suffix
+
+    def write(self, fp, commands):
+        """
+        Writes the request to a file-like object, one command at a time,
+        and returns the number of bytes written.
+
+        Arguments:
+            fp (obj): a file-like object with a write() method
+            commands (iter): command objects, ElementTree objects or
+                             already serialized bytestrings
+
+        """
+        size = 0
+        for chunk in self.chunks(commands):
+            fp.write(chunk)
+            size += len(chunk)
+        return size
+
+
 class Error(_Base):
     """
     Use the Error command to return info about an error code.
@@ -235,6 +392,8 @@ class Error(_Base):
         code (str): an error code string
 
     """
+    __slots__ = ('application', 'code', )
+
     def __init__(self, application, code):
         _Base.__init__(self)
         self.application = application
@@ -254,12 +413,12 @@ class Error(_Base):
             'API_ver': '1.0',
             'client': self.application.client,
             'client_ver': self.application.client_version,
-            'namespace': self.application.namespace,
-            'key': self.application.key
+            'key': self.application.key,
+            'namespace': self.application.namespace
         }
 
         read = ET.SubElement(request, 'Read')
-        read.attrib = {'type': 'Error', 'method': 'equal to'}
+        read.attrib = {'method': 'equal to', 'type': 'Error'}
 
         error = ET.SubElement(read, 'Error')
         code = ET.SubElement(error, 'code')
@@ -10,9 +10,15 @@ try:
 except ImportError:
     import xml.etree.ElementTree as ET
 
-from oaxmlapi.base import _Base
+from oaxmlapi.base import _Base, _sorted_tree
+from oaxmlapi.schema import default as _default_schema
 from oaxmlapi.utilities import ADDRESS_FIELDS
 
+try:
+    _TEXT = (str, unicode, )
+except NameError:
+    _TEXT = (str, )
+
 
 class Datatype(_Base):
     """
@@ -22,6 +28,8 @@ class Datatype(_Base):
     fields (dict): a dict containing fieldnames and data
 
     """
+    __slots__ = ('type', 'fields', )
+
     def __init__(self, type, fields):
         _Base.__init__(self)
         self.type = type
@@ -68,3 +76,187 @@ class Datatype(_Base):
 
     def _main(self):
         return self.getDatatype()
+
+    def canonical(self):
+        """
+        Return a bytestring of XML tags with fields, and the fields of
+        nested Datatypes, in sorted order.
+
+        """
+        return ET.tostring(_sorted_tree(self.getDatatype()), 'utf-8')
+
+    def validate(self, schema=None):
+        """
+        Check the type and every field name, including those of nested
+        Datatypes, against an OpenAir schema with Schema.check_field,
+        which raises for unknown names or, where the schema is partial,
+        warns.
+
+        Arguments:
+            schema (obj): a schema.Schema object (default: the bundled schema)
+
+        Returns:
+            self (obj): this Datatype, so calls can be chained
+
+        """
+        schema = schema or _default_schema()
+        schema.check_datatype(self.type)
+        for key in self.fields:
+            schema.check_field(self.type, key)
+            if isinstance(self.fields[key], Datatype):
+                self.fields[key].validate(schema)
+        return self
+
+    def coerce(self, schema=None):
+        """
+        Validate this Datatype and convert its field values to what
+        OpenAir expects, e.g. ints to text, booleans to 1 or 0 and
+        dates to Date Datatypes. Nested Datatypes are coerced too.
+
+        Arguments:
+            schema (obj): a schema.Schema object (default: the bundled schema)
+
+        Returns:
+            self (obj): this Datatype, so calls can be chained
+
+        """
+        schema = schema or _default_schema()
+        schema.check_datatype(self.type)
+        fields = {}
+        for key in self.fields:
+            value = schema.coerce(self.type, key, self.fields[key])
+            if isinstance(value, Datatype):
+                value.coerce(schema)
+            fields[key] = value
+        self.fields = fields
+        return self
+
+    def template(self):
+        """
+        Return a Template for this Datatype's shape: its type, its
+        field names in order and the shape of any nested Datatypes.
+
+        Arguments:
+            none
+
+        Returns:
+            template (obj): a Template object
+
+        """
+        fields = []
+        for key in self.fields:
+            if self.type != 'Filter' and isinstance(self.fields[key], Datatype):
+                fields.append((key, self.fields[key].template()))
+            else:
+                fields.append(key)
+        return Template(self.type, fields)
+
+
+def _escape(text):
+    """
+    Escape text content the way ElementTree does.
+
+    """
+    if '&' in text:
+        text = text.replace('&', '&amp;')
+    if '<' in text:
+        text = text.replace('<', '&lt;')
+    if '>' in text:
+        text = text.replace('>', '&gt;')
+    return text.encode('utf-8')
+
+
+class Template(object):
+    """
+    A compiled Datatype shape which renders field values straight to
+    the bytes Datatype.tostring() would produce, without building an
+    ElementTree.
+
+    type (str): a valid XML type
+    fields (list): field names in order; a nested Datatype field is a
+                   (name, Template) tuple
+
+    """
+    def __init__(self, type, fields):
+        self.type = type
+        self.fields = list(fields)
+
+        # a part is either static bytes or a slot tuple of
+        # (name, nested template, open tag, close tag, empty tag)
+        self._parts = []
+        if type == 'Filter':
+            static = ['<{type} type="customer">'.format(type=type)]
+        else:
+            static = ['<{type}>'.format(type=type)]
+
+        for field in self.fields:
+            if isinstance(field, tuple):
+                name, nested = field
+                static.append('<{name}>'.format(name=name))
+                self._static(static)
+                self._parts.append((name, nested, None, None, None))
+                static = ['</{name}>'.format(name=name)]
+                continue
+
+            address = type != 'Filter' and field in ADDRESS_FIELDS
+            if address:
+                static.append('<addr><Address>')
+            self._static(static)
+            self._parts.append((
+                field,
+                None,
+                '<{name}>'.format(name=field).encode('utf-8'),
+                '</{name}>'.format(name=field).encode('utf-8'),
+                '<{name} />'.format(name=field).encode('utf-8'),
+            ))
+            static = ['</Address></addr>'] if address else []
+
+        if not self.fields:
+            # ElementTree writes childless elements as a short tag
+            static = [static[0][:-1] + ' />']
+        else:
+            static.append('</{type}>'.format(type=type))
+        self._static(static)
+
+    def __str__(self):
+        return '<Template type={type}>'.format(type=self.type)
+
+    def _static(self, static):
+        if static:
+            self._parts.append(''.join(static).encode('utf-8'))
+
+    def render(self, fields):
+        """
+        Return the bytes of a Datatype of this shape.
+
+        Arguments:
+            fields (dict|obj): a dict of field values, or a Datatype
+
+        Returns:
+            body (bytes): the serialized XML
+
+        """
+        if isinstance(fields, Datatype):
+            fields = fields.fields
+        out = []
+        append = out.append
+        for part in self._parts:
+            if part.__class__ is bytes:
+                append(part)
+                continue
+            name, nested, start, end, empty = part
+            if name not in fields:
+                raise Exception('field "{name}" is missing'.format(name=name))
+            value = fields[name]
+            if nested is not None:
+                append(nested.render(value))
+            elif value is None or value == '':
+                append(empty)
+            elif isinstance(value, _TEXT):
+                append(start)
+                append(_escape(value))
+                append(end)
+            else:
+                raise TypeError('cannot serialize {value!r} (type {type})'.format(
+                    value=value, type=value.__class__.__name__))
+        return b''.join(out)
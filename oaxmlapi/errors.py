@@ -0,0 +1,118 @@
+# -*- coding: utf-8
+"""The errors.py module translates OpenAir status codes into messages.
+Each code is looked up with the server at most once per process and
+remembered, optionally on disk, so the messages always come from the
+server itself.
+"""
+
+from __future__ import absolute_import
+
+import io
+import json
+import os
+import threading
+
+from oaxmlapi.utilities import _save_json
+
+
+_DEFAULT = []
+
+
+class ErrorCatalog(object):
+    """
+    Use an ErrorCatalog to turn status codes into messages.
+
+    Arguments:
+        path (str): a JSON file where looked-up messages are kept
+                    between processes (optional)
+
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self.messages = {}
+        self._missing = set()
+        self._fetching = {}
+        self._lock = threading.Lock()
+        if path is not None and os.path.exists(path):
+            self.messages.update(_read(path))
+
+    def __str__(self):
+        return '<ErrorCatalog codes={codes}>'.format(codes=len(self.messages))
+
+    def lookup(self, code, fetch=None):
+        """
+        Returns the message of a status code, or None when it is not
+        known. A code missing from the catalog is passed to fetch; the
+        message it returns is kept, and saved when the catalog has a
+        path. When fetch returns None the code is not asked about again,
+        but when it raises, e.g. because the server was unavailable,
+        None is returned and the code is tried again next time. The
+        catalog is not locked while fetch runs, so only lookups of the
+        same code wait for it.
+
+        Arguments:
+            code (str): a status code, e.g. 601
+            fetch (func): maps a code to its message, or None when the
+                          code has none; raises when it cannot tell
+                          (optional)
+
+        """
+        code = str(code)
+        message = self.messages.get(code)
+        if message is not None or fetch is None:
+            return message
+
+        with self._lock:
+            if code in self.messages or code in self._missing:
+                return self.messages.get(code)
+            done = self._fetching.get(code)
+            if done is None:
+                done = self._fetching[code] = threading.Event()
+                owner = True
+            else:
+                owner = False
+        if not owner:
+            done.wait()
+            return self.messages.get(code)
+
+        try:
+            try:
+                message = fetch(code)
+            except Exception:
+                # the lookup failed, not the code; describing an error
+                # must never raise one of its own
+                return None
+            with self._lock:
+                if message is None:
+                    self._missing.add(code)
+                else:
+                    self.messages[code] = message
+                    if self.path is not None:
+                        self.save()
+        finally:
+            with self._lock:
+                del self._fetching[code]
+            done.set()
+        return message
+
+    def save(self):
+        """
+        Writes the catalog to its path, replacing the file in one step.
+
+        """
+        _save_json(self.path, self.messages)
+
+
+def _read(path):
+    with io.open(path, encoding='utf-8') as fp:
+        return dict((str(k), v) for k, v in json.load(fp).items())
+
+
+def default():
+    """
+    Returns the ErrorCatalog shared by every client of the process.
+
+    """
+    if not _DEFAULT:
+        _DEFAULT.append(ErrorCatalog())
+    return _DEFAULT[0]
@@ -0,0 +1,223 @@
+# -*- coding: utf-8
+"""The pagination.py module walks large Read result sets one limit
+window at a time so that callers never hold more than a page or two
+of records in memory.
+"""
+
+from __future__ import absolute_import
+
+import collections
+import copy
+
+from oaxmlapi.columnar import Columns
+from oaxmlapi.utilities import StatusError, iterrecords
+
+try:
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+except ImportError:
+    # Python 2 without the futures backport
+    ThreadPoolExecutor = None
+
+
+def page(read, offset, size):
+    """
+    Returns a copy of a Read command limited to size records starting
+    at offset. The original Read is left untouched.
+
+    Arguments:
+        read (obj): a Read object
+        offset (int): the index of the first record
+        size (int): the number of records
+
+    """
+    window = copy.copy(read)
+    window.attribs = dict(read.attribs or {})
+    window.attribs['limit'] = '{offset},{size}'.format(offset=offset, size=size)
+    return window
+
+
+def start(read):
+    """
+    Returns the offset of a Read's limit attribute, or 0 when the
+    limit has no offset.
+
+    Arguments:
+        read (obj): a Read object
+
+    """
+    limit = (read.attribs or {}).get('limit', '')
+    if ',' in limit:
+        return int(limit.split(',')[0])
+    return 0
+
+
+def fetch(client, read):
+    """
+    Sends a single Read and returns its records as a list of
+    ElementTree objects.
+
+    Arguments:
+        client (obj): a transport.Client with an application and auth
+        read (obj): a Read object
+
+    """
+    try:
+        with client.stream(client.envelope([read.read()])) as res:
+            return list(iterrecords(res))
+    except StatusError as e:
+        # described once the connection is back in the pool, since
+        # looking a code up may need a connection of its own
+        raise e.described(client.describe)
+
+
+def iter_read(client, read, page_size=1000, prefetch=False):
+    """
+    A generator which yields every record matched by a Read, fetching
+    page_size records per request and stopping after a short page.
+    Each page is parsed in full and its connection released before
+    its records are yielded, so the loop body may send requests of
+    its own through the same client.
+
+    Arguments:
+        client (obj): a transport.Client with an application and auth
+        read (obj): a Read object
+        page_size (int): the number of records per request
+        prefetch (bool): fetch the next page in a background thread
+                         while the current page is consumed; needs
+                         concurrent.futures, i.e. the futures backport
+                         on Python 2
+
+    """
+    if page_size < 1:
+        raise Exception('page_size must be at least 1')
+
+    offset = start(read)
+    if not prefetch:
+        while True:
+            records = fetch(client, page(read, offset, page_size))
+            for record in records:
+                yield record
+            if len(records) < page_size:
+                return
+            records = None
+            offset += page_size
+
+    if ThreadPoolExecutor is None:
+        raise Exception('prefetch requires concurrent.futures to be installed')
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pending = executor.submit(fetch, client, page(read, offset, page_size))
+        try:
+            while pending is not None:
+                records = pending.result()
+                pending = None
+                if len(records) == page_size:
+                    offset += page_size
+                    pending = executor.submit(
+                        fetch, client, page(read, offset, page_size))
+                for record in records:
+                    yield record
+                records = None
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+
+def iter_read_parallel(client, read, page_size=1000, workers=4, total=None,
+                       ordered=True):
+    """
+    A generator which yields every record matched by a Read, fetching
+    up to workers limit windows at once. With ordered=False records
+    are yielded page by page as soon as each page arrives.
+
+    When total is given, no window past it is requested until all
+    earlier pages have come back full. An exact total then costs no
+    extra request, unless it is a multiple of page_size: the last
+    page comes back full, and one more window past it is read to
+    tell an exact total from an underestimate. Without a total, up
+    to workers - 1 windows past the last record may be requested.
+
+    Arguments:
+        client (obj): a transport.Client with an application and auth
+        read (obj): a Read object
+        page_size (int): the number of records per request
+        workers (int): the number of pages fetched at once
+        total (int): the known or estimated number of records, e.g.
+                     the width of an id range filter (optional)
+        ordered (bool): yield records in read order (default: True)
+
+    """
+    if page_size < 1:
+        raise Exception('page_size must be at least 1')
+    if workers < 1:
+        raise Exception('workers must be at least 1')
+    if ThreadPoolExecutor is None:
+        raise Exception('iter_read_parallel requires concurrent.futures to be installed')
+
+    offset = start(read)
+    end = offset + total if total is not None else None
+    state = {'offset': offset, 'stop': None}
+    pending = collections.OrderedDict()
+
+    def refill(executor):
+        while len(pending) < workers:
+            offset = state['offset']
+            if state['stop'] is not None and offset >= state['stop']:
+                return
+            if end is not None and offset >= end and pending:
+                return
+            future = executor.submit(fetch, client, page(read, offset, page_size))
+            pending[future] = offset
+            state['offset'] = offset + page_size
+
+    def collect(future):
+        offset = pending.pop(future)
+        records = future.result()
+        if len(records) < page_size:
+            stop = offset + page_size
+            if state['stop'] is None or stop < state['stop']:
+                state['stop'] = stop
+        return records
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        try:
+            refill(executor)
+            while pending:
+                if ordered:
+                    done = [next(iter(pending))]
+                else:
+                    done = wait(list(pending), return_when=FIRST_COMPLETED)[0]
+                pages = [collect(future) for future in done]
+                refill(executor)
+                for records in pages:
+                    for record in records:
+                        yield record
+                pages = None
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def read_columns(client, read, fields, types=None, page_size=1000, workers=1,
+                 total=None):
+    """
+    Reads every record matched by a Read straight into a
+    columnar.Columns object, without building a dictionary per
+    record. Pages are fetched in parallel when workers is above 1.
+
+    Arguments:
+        client (obj): a transport.Client with an application and auth
+        read (obj): a Read object
+        fields (list): the field names to collect
+        types (dict): maps field names to str, int, float, date or datetime
+        page_size (int): the number of records per request
+        workers (int): the number of pages fetched at once (default: 1)
+        total (int): the known or estimated number of records (optional)
+
+    """
+    columns = Columns(fields, types)
+    if workers > 1:
+        columns.extend(iter_read_parallel(client, read, page_size=page_size,
+            workers=workers, total=total))
+    else:
+        columns.extend(iter_read(client, read, page_size=page_size))
+    return columns
@@ -0,0 +1,255 @@
+# -*- coding: utf-8
+"""The records.py module maps response records onto compact record
+objects. One class with __slots__ is generated per OpenAir datatype
+and field layout, and field values are only decoded when first read.
+"""
+
+from __future__ import absolute_import
+
+import collections
+import datetime
+import threading
+
+from oaxmlapi import utilities
+
+try:
+    _TEXT = (str, unicode, )
+except NameError:
+    _TEXT = (str, )
+
+# keep a reference to the builtin, which the "type" arguments shadow
+_new_class = type
+
+# marks a field which has not been decoded yet
+_PENDING = object()
+
+# generated record classes keyed on (datatype, field names), least
+# recently used first
+_CLASSES = collections.OrderedDict()
+
+_CLASSES_MAX = 1024
+
+_CLASSES_LOCK = threading.Lock()
+
+
+def _compact(elem):
+    """
+    Returns the raw value of an element: its text when it has no
+    children, otherwise a tuple of (tag, raw value) pairs.
+
+    """
+    if not len(elem):
+        return elem.text
+    return tuple((child.tag, _compact(child)) for child in elem)
+
+
+def _decode_date(pairs):
+    """
+    Decode the (tag, text) pairs of a <Date> into a date, a datetime
+    or None when the date is empty.
+
+    """
+    parts = dict((tag, (text or '').strip()) for tag, text in pairs)
+    if not parts.get('year'):
+        return None
+    year = int(parts['year'])
+    month = int(parts.get('month') or 1)
+    day = int(parts.get('day') or 1)
+    if parts.get('hour') or parts.get('minute') or parts.get('second'):
+        return datetime.datetime(year, month, day,
+            int(parts.get('hour') or 0), int(parts.get('minute') or 0),
+            int(parts.get('second') or 0))
+    return datetime.date(year, month, day)
+
+
+def decode(raw):
+    """
+    Decode a raw field value. Text is returned unchanged, a nested
+    <Date> becomes a date or datetime, other nested datatypes become
+    records and repeated fields become lists.
+
+    Arguments:
+        raw (obj): a string, None, a tuple of (tag, raw) pairs or a list
+
+    """
+    if raw is None or isinstance(raw, _TEXT):
+        return raw
+    if isinstance(raw, list):
+        return [decode(r) for r in raw]
+
+    values = []
+    for tag, content in raw:
+        if not isinstance(content, tuple):
+            values.append(content)
+        elif tag == 'Date':
+            values.append(_decode_date(content))
+        else:
+            values.append(_build(tag, content))
+    return values[0] if len(values) == 1 else values
+
+
+class _Field(object):
+    """
+    A descriptor which decodes one field of a record on first access.
+
+    """
+    __slots__ = ('index', )
+
+    def __init__(self, index):
+        self.index = index
+
+    def __get__(self, record, cls):
+        if record is None:
+            return self
+        return record._value(self.index)
+
+
+class Record(object):
+    """
+    The base class of generated record classes. Field values are held
+    raw in a tuple until they are read.
+
+    Arguments:
+        raw (tuple): the raw value of each field, in _fields order
+
+    """
+    __slots__ = ('_raw', '_values', )
+
+    _type = None
+    _fields = ()
+    _index = {}
+
+    def __init__(self, raw):
+        self._raw = raw
+        self._values = None
+
+    def _value(self, index):
+        values = self._values
+        if values is None:
+            values = self._values = [_PENDING] * len(self._raw)
+        value = values[index]
+        if value is _PENDING:
+            value = values[index] = decode(self._raw[index])
+        return value
+
+    def __repr__(self):
+        return '<{type} {fields}>'.format(
+            type=self._type,
+            fields=' '.join(
+                '{name}={value!r}'.format(name=name, value=value)
+                for name, value in zip(self._fields, self._raw)
+                if value is None or isinstance(value, _TEXT)
+            ))
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, Record) and
+            self._type == other._type and
+            self.asdict() == other.asdict()
+        )
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def get(self, name, default=None):
+        """
+        Returns the decoded value of a field, or default when the
+        record has no such field. Fields named like a Record attribute
+        are only read this way.
+
+        """
+        index = self._index.get(name)
+        if index is None:
+            return default
+        return self._value(index)
+
+    def asdict(self):
+        """
+        Returns a dictionary of decoded field values.
+
+        """
+        return dict((name, self._value(i)) for i, name in enumerate(self._fields))
+
+
+# field names which would replace a method or internal of Record
+_RESERVED = frozenset(dir(Record))
+
+
+def record_class(type, fields):
+    """
+    Returns the record class for a datatype and an ordered tuple of
+    field names, generating it the first time the pair is seen. A
+    field becomes an attribute unless it starts with an underscore or
+    is named like a Record attribute, e.g. get; read those with get().
+    The most recently used classes are kept.
+
+    Arguments:
+        type (str): a datatype name, e.g. Timesheet
+        fields (tuple): the field names in response order
+
+    """
+    key = (type, fields)
+    with _CLASSES_LOCK:
+        cls = _CLASSES.pop(key, None)
+        if cls is None:
+            attrs = {'__slots__': (), '_type': type, '_fields': fields,
+                '_index': dict((name, i) for i, name in enumerate(fields))}
+            for index, name in enumerate(fields):
+                if not name.startswith('_') and name not in _RESERVED:
+                    attrs[name] = _Field(index)
+            cls = _new_class(str(type), (Record, ), attrs)
+        _CLASSES[key] = cls
+        while len(_CLASSES) > _CLASSES_MAX:
+            _CLASSES.popitem(last=False)
+    return cls
+
+
+def _build(type, items):
+    """
+    Returns a record from (field name, raw value) pairs. A field which
+    appears more than once gets a list of raw values.
+
+    """
+    fields = []
+    raw = []
+    index = {}
+    for tag, value in items:
+        if tag in index:
+            i = index[tag]
+            if isinstance(raw[i], list):
+                raw[i].append(value)
+            else:
+                raw[i] = [raw[i], value]
+            continue
+        index[tag] = len(fields)
+        fields.append(tag)
+        raw.append(value)
+    return record_class(type, tuple(fields))(tuple(raw))
+
+
+def torecord(elem):
+    """
+    Maps a record element such as <Timesheet> onto a record object.
+
+    Arguments:
+        elem (obj): a record ElementTree object
+
+    """
+    return _build(elem.tag, ((child.tag, _compact(child)) for child in elem))
+
+
+def iterrecords(source, tag=None, describe=None):
+    """
+    Yield the records of an XML response as record objects while the
+    response is still being parsed.
+
+    Arguments:
+        source (obj): a file-like object or an XML bytestring
+        tag (str): only yield records with this tag (optional)
+        describe (func): maps a status code to its text (optional)
+
+    """
+    for elem in utilities.iterrecords(source, tag, describe):
+        yield torecord(elem)
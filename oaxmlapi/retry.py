@@ -0,0 +1,177 @@
+# -*- coding: utf-8
+"""The retry.py module sends a request again after a transient failure,
+but only the commands that failed and only those which are safe to
+replay. A Read can be sent twice without harm; an Add which may already
+have gone through cannot.
+"""
+
+from __future__ import absolute_import
+
+import random
+import socket
+import time
+
+try:
+    import http.client as httplib
+except ImportError:
+    import httplib
+
+from oaxmlapi.batch import results as _results
+from oaxmlapi.connections import Request
+from oaxmlapi.transport import REPLAYABLE_TAGS, TransportError
+
+
+# HTTP statuses worth another attempt
+RETRY_STATUSES = (429, 500, 502, 503, 504, )
+
+# OpenAir status codes of a single command worth another attempt. It is
+# empty, so retry by status code is off until a Retry is given codes
+RETRY_CODES = ()
+
+# HTTP statuses which mean the request was turned away without being
+# run, so every command in it may be sent again
+NOT_RUN_STATUSES = (429, )
+
+# errors raised when the connection failed before a response came back
+_NETWORK_ERRORS = (httplib.HTTPException, socket.error, )
+
+
+class RetryError(Exception):
+    """
+    Raised when some commands have no result after every attempt,
+    either because they could not be replayed safely or because the
+    attempts ran out.
+
+    Arguments:
+        error (obj): the last exception
+        results (list): one result element per command, None for those
+                        without one
+
+    """
+    def __init__(self, error, results):
+        Exception.__init__(self, '{missing} of {total} commands have no result: {error}'.format(
+            missing=sum(1 for r in results if r is None), total=len(results),
+            error=error))
+        self.error = error
+        self.results = results
+
+
+class Retry(object):
+    """
+    Use a Retry to send a request with retries. Commands whose result
+    has one of the retry codes were refused by the server and are sent
+    again, whatever their type. Retry by status code is off by default:
+    RETRY_CODES is empty, so a command is only retried on its own when
+    codes are passed. When the whole request fails in transit, only
+    the replayable commands are sent again, since the others may
+    already have run, unless the server answered 429 and so ran none
+    of them. Attempts are spaced out by an exponential
+    backoff with full jitter.
+
+    Arguments:
+        attempts (int): the most times a command is sent (default: 3)
+        base (float): the backoff before the second attempt in seconds
+                      (default: 0.5)
+        cap (float): the longest backoff in seconds (default: 30)
+        codes (list): OpenAir status codes to retry (default: RETRY_CODES)
+        replayable (list): command tags which are safe to send twice
+                           (default: REPLAYABLE_TAGS)
+
+    """
+    def __init__(self, attempts=3, base=0.5, cap=30, codes=RETRY_CODES,
+                 replayable=REPLAYABLE_TAGS):
+        if attempts < 1:
+            raise Exception('attempts must be at least 1')
+        self.attempts = attempts
+        self.base = base
+        self.cap = cap
+        self.codes = frozenset(str(c) for c in codes)
+        self.replayable = frozenset(replayable)
+
+    def __str__(self):
+        return '<Retry attempts={attempts}>'.format(attempts=self.attempts)
+
+    def delay(self, attempt):
+        """
+        Returns the seconds to wait before attempt, counted from 1 for
+        the first retry.
+
+        Arguments:
+            attempt (int): the retry number
+
+        """
+        return random.uniform(0, min(self.cap, self.base * 2 ** (attempt - 1)))
+
+    def transient(self, error):
+        """
+        Returns True when a request which raised error may be sent again.
+
+        Arguments:
+            error (obj): an exception raised while sending
+
+        """
+        if isinstance(error, TransportError):
+            return error.status in RETRY_STATUSES
+        return isinstance(error, _NETWORK_ERRORS)
+
+    def send(self, client, request):
+        """
+        Sends a Request and returns one result element per command, in
+        order. A command whose result still has a retry code after the
+        last attempt keeps that result, unless that attempt failed in
+        transit. Raises a RetryError when some
+        commands have no result, also when a later attempt fails for
+        good after earlier ones returned results.
+
+        Arguments:
+            client (obj): a transport.Client or session.Session object
+            request (obj): a Request object
+
+        """
+        elements = list(request.xml_data or ())
+        found = [None] * len(elements)
+        pending = list(range(len(elements)))
+        error = None
+        for attempt in range(self.attempts):
+            if attempt:
+                time.sleep(self.delay(attempt))
+            try:
+                response = client.send(Request(request.application, request.auth,
+                    [elements[i] for i in pending]))
+                sent = _results(response, client.describe)
+            except Exception as e:
+                if not self.transient(e):
+                    if all(result is None for result in found):
+                        raise
+                    # keep the results of earlier attempts; whether the
+                    # pending commands ran this time cannot be told
+                    for i in pending:
+                        found[i] = None
+                    raise RetryError(e, found)
+                error = e
+                # an earlier result of a command sent again is stale, as
+                # the command may have run this time
+                for i in pending:
+                    found[i] = None
+                if not (isinstance(e, TransportError) and e.status in NOT_RUN_STATUSES):
+                    # the commands may have run, so only replayable ones go again
+                    pending = [i for i in pending if elements[i].tag in self.replayable]
+                if not pending:
+                    break
+                continue
+
+            if len(sent) != len(pending):
+                raise Exception('expected {expected} results, got {got}'.format(
+                    expected=len(pending), got=len(sent)))
+            retry = []
+            for i, result in zip(pending, sent):
+                found[i] = result
+                if result.get('status') in self.codes:
+                    retry.append(i)
+            pending = retry
+            if not pending:
+                break
+
+        if any(result is None for result in found):
+            raise RetryError(error, found)
+        return found
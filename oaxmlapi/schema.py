@@ -0,0 +1,333 @@
+# -*- coding: utf-8
+"""The schema.py module knows the fields of each OpenAir datatype so
+that datatype and field names can be checked, and field values
+coerced, locally before a request is sent. The bundled schema.json is
+only read the first time it is needed. It does not list every OpenAir
+datatype and field, so names it does not know only raise a
+SchemaWarning, except for the datatypes in COMPLETE_TYPES.
+"""
+
+from __future__ import absolute_import
+
+import datetime
+import decimal
+import io
+import json
+import math
+import os
+import warnings
+
+from oaxmlapi.utilities import ADDRESS_FIELDS
+
+
+# written by hand for this package: the commonly used fields of common
+# datatypes, not an export of the OpenAir data dictionary
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schema.json')
+
+# custom fields are named by each account and always end in __c
+CUSTOM_SUFFIX = '__c'
+
+# a datatype with this field accepts any field name, e.g. Filter
+ANY_FIELD = '*'
+
+KINDS = ('str', 'int', 'float', 'bool', 'date', )
+
+# the datatypes of the bundled schema.json whose field lists are known
+# to be complete, so an unknown field of theirs is an error
+COMPLETE_TYPES = ('Date', 'Filter', )
+
+_TRUE = frozenset(('1', 'true', 'yes', ))
+
+_FALSE = frozenset(('0', 'false', 'no', ))
+
+try:
+    _TEXT = (str, unicode, )
+except NameError:
+    _TEXT = (str, )
+
+_DEFAULT = []
+
+
+def _to_int(value):
+    if isinstance(value, bool) or (isinstance(value, float) and value != int(value)):
+        raise ValueError(value)
+    if isinstance(value, _TEXT):
+        int(value)
+        return value.strip()
+    return str(int(value))
+
+
+def _to_float(value):
+    if isinstance(value, bool):
+        raise ValueError(value)
+    number = float(value)
+    if math.isinf(number) or math.isnan(number):
+        raise ValueError(value)
+    text = value.strip() if isinstance(value, _TEXT) else repr(number)
+    if 'e' in text.lower():
+        # OpenAir expects plain decimals, e.g. 0.00001 rather than 1e-05
+        text = format(decimal.Decimal(text), 'f')
+    return text
+
+
+def _to_bool(value):
+    if isinstance(value, _TEXT):
+        value = value.strip().lower()
+        if value in _TRUE:
+            return '1'
+        if value in _FALSE:
+            return '0'
+        raise ValueError(value)
+    if value in (True, False):
+        return '1' if value else '0'
+    raise ValueError(value)
+
+
+def _to_date(value):
+    from oaxmlapi.datatypes import Datatype
+
+    if isinstance(value, Datatype):
+        return value
+    if isinstance(value, _TEXT):
+        text = value.strip()
+        fmt = '%Y-%m-%d %H:%M:%S' if len(text) > 10 else '%Y-%m-%d'
+        value = datetime.datetime.strptime(text, fmt)
+        if len(text) <= 10:
+            value = value.date()
+    if not isinstance(value, datetime.date):
+        raise ValueError(value)
+    fields = {
+        'year': '{0:04d}'.format(value.year),
+        'month': '{0:02d}'.format(value.month),
+        'day': '{0:02d}'.format(value.day),
+    }
+    if isinstance(value, datetime.datetime):
+        fields['hour'] = '{0:02d}'.format(value.hour)
+        fields['minute'] = '{0:02d}'.format(value.minute)
+        fields['second'] = '{0:02d}'.format(value.second)
+    return Datatype('Date', fields)
+
+
+def _to_str(value):
+    if isinstance(value, _TEXT):
+        return value
+    if isinstance(value, bool):
+        raise ValueError(value)
+    if isinstance(value, (int, float)):
+        return str(value)
+    # nested Datatypes, e.g. addr, are kept as they are
+    if hasattr(value, 'getDatatype'):
+        return value
+    raise ValueError(value)
+
+
+_COERCE = {
+    'str': _to_str,
+    'int': _to_int,
+    'float': _to_float,
+    'bool': _to_bool,
+    'date': _to_date,
+}
+
+
+class SchemaWarning(UserWarning):
+    """
+    Warns about a datatype or field name which a partial schema does
+    not know. The name is still accepted, since the schema may simply
+    not list it; turn the warning into an error with the warnings
+    module to reject such names.
+
+    """
+
+
+class Schema(object):
+    """
+    Use a Schema to check datatype and field names and to coerce
+    field values.
+
+    Arguments:
+        types (dict): maps datatype names to dicts of field names and
+                      kinds, e.g. {'Project': {'id': 'int', ...}}
+        complete (list): the datatypes whose fields are all listed; an
+                         unknown field of another datatype, or an
+                         unknown datatype, only raises a SchemaWarning
+                         (default: None, every datatype and field is
+                         listed and unknown names raise)
+
+    """
+    __slots__ = ('types', 'complete', )
+
+    def __init__(self, types, complete=None):
+        self.types = types
+        self.complete = None if complete is None else frozenset(complete)
+
+    def __str__(self):
+        return '<Schema datatypes={count}>'.format(count=len(self.types))
+
+    @classmethod
+    def load(cls, path=SCHEMA_FILE, complete=None):
+        """
+        Returns a Schema read from a JSON file.
+
+        Arguments:
+            path (str): the schema file (default: the bundled schema.json)
+            complete (list): the datatypes whose fields are all listed
+                             (default: None, all of them)
+
+        """
+        with io.open(path, encoding='utf-8') as fp:
+            return cls(json.load(fp), complete)
+
+    def fields(self, type):
+        """
+        Returns the dictionary of fields of a datatype.
+
+        Arguments:
+            type (str): a datatype name, e.g. Project
+
+        """
+        fields = self.types.get(type)
+        if fields is None:
+            raise Exception('datatype "{type}" is not an OpenAir datatype'.format(
+                type=type))
+        return fields
+
+    def _unknown(self, type, message):
+        # an error where the schema lists every field of type, and a
+        # warning where it may simply not list the name
+        if self.complete is None or type in self.complete:
+            raise Exception(message)
+        warnings.warn(message, SchemaWarning, stacklevel=3)
+
+    def check_datatype(self, type):
+        """
+        Returns type. Raises an Exception if it is not a known datatype,
+        or only warns when the schema does not list every datatype.
+
+        Arguments:
+            type (str): a datatype name, e.g. Project
+
+        """
+        if type not in self.types:
+            self._unknown(type, 'datatype "{type}" is not an OpenAir datatype'.format(
+                type=type))
+        return type
+
+    def known(self, type, name):
+        """
+        Returns True if the schema lists name as a field of the
+        datatype. Custom fields (ending in __c) are always known, as
+        are address fields on datatypes with an addr field.
+
+        Arguments:
+            type (str): a datatype name, e.g. Project
+            name (str): a field name, e.g. customerid
+
+        """
+        fields = self.types.get(type, ())
+        return (name in fields or ANY_FIELD in fields or
+            name.endswith(CUSTOM_SUFFIX) or
+            ('addr' in fields and name in ADDRESS_FIELDS))
+
+    def check_field(self, type, name):
+        """
+        Returns name. Raises an Exception if it is not a field of the
+        datatype, or only warns when the schema does not list every
+        field of the datatype.
+
+        Arguments:
+            type (str): a datatype name, e.g. Project
+            name (str): a field name, e.g. customerid
+
+        """
+        if type not in self.types:
+            self.check_datatype(type)
+        elif not self.known(type, name):
+            self._unknown(type, 'field "{field}" is not a {type} field'.format(
+                field=name, type=type))
+        return name
+
+    def check_return(self, type, fields):
+        """
+        Returns fields if every name is a field of the datatype, which
+        is what a Read's _Return list asks for, otherwise raises an
+        Exception.
+
+        Arguments:
+            type (str): a datatype name, e.g. Project
+            fields (list): a list of field names
+
+        """
+        for name in fields:
+            self.check_field(type, name)
+        return fields
+
+    def kind(self, type, name):
+        """
+        Returns the kind of a field: str, int, float, bool or date.
+        Nested datatypes such as addr, custom fields and fields of
+        datatypes accepting any name are str.
+
+        Arguments:
+            type (str): a datatype name, e.g. Project
+            name (str): a field name, e.g. customerid
+
+        """
+        self.check_field(type, name)
+        kind = self.types.get(type, {}).get(name, 'str')
+        return kind if kind in _COERCE else 'str'
+
+    def coerce(self, type, name, value):
+        """
+        Returns a field value converted to what OpenAir expects: ints
+        and floats as text, booleans as 1 or 0 and dates (a date, a
+        datetime or a 'YYYY-MM-DD[ HH:MM:SS]' string) as a Date
+        Datatype. None is returned unchanged, and so is the value of a
+        field the schema does not list, after check_field has warned
+        about it. Raises an Exception for values which cannot be
+        converted, and for unknown fields where check_field raises.
+
+        Arguments:
+            type (str): a datatype name, e.g. Project
+            name (str): a field name, e.g. customerid
+            value (obj): the value to convert
+
+        """
+        if not self.known(type, name):
+            self.check_field(type, name)
+            return value
+        kind = self.kind(type, name)
+        if value is None:
+            return None
+        try:
+            return _COERCE[kind](value)
+        except (TypeError, ValueError, OverflowError):
+            raise Exception('field "{field}" of {type} must be {kind}, not {value!r}'.format(
+                field=name, type=type, kind=kind, value=value))
+
+    def register(self, type, fields):
+        """
+        Adds a datatype, or adds fields to a known one, e.g. for
+        datatypes specific to an account.
+
+        Arguments:
+            type (str): a datatype name
+            fields (dict): maps field names to str, int, float, bool or date
+
+        """
+        for name, kind in fields.items():
+            if kind not in KINDS:
+                raise Exception('kind "{kind}" must be one of {allowed}'.format(
+                    kind=kind, allowed=KINDS))
+        self.types.setdefault(type, {}).update(fields)
+
+
+def default():
+    """
+    Returns the Schema of the bundled schema.json, loading it the first
+    time it is called.
+
+    """
+    if not _DEFAULT:
+        _DEFAULT.append(Schema.load(complete=COMPLETE_TYPES))
+    return _DEFAULT[0]
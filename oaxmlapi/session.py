@@ -0,0 +1,155 @@
+# -*- coding: utf-8
+"""The session.py module logs in once and sends the following requests
+with a session token instead of the full login, so the server does
+not have to authenticate the password on every call. An expired
+session is noticed from the Auth status and replaced transparently.
+"""
+
+from __future__ import absolute_import
+
+import threading
+
+from oaxmlapi.commands import Time
+from oaxmlapi.connections import Request, SessionAuth
+from oaxmlapi.utilities import AUTH_TAGS
+
+
+# the child of a successful <Auth> result which carries the token
+TOKEN_TAG = 'session'
+
+
+def auth_status(response):
+    """
+    Returns a tuple of (status, element) for the Auth or RemoteAuth
+    result of a <response>, or (None, None) when there is none.
+
+    Arguments:
+        response (obj): a parsed <response> ElementTree object
+
+    """
+    for elem in response:
+        if elem.tag in AUTH_TAGS:
+            return elem.get('status', '0'), elem
+    return None, None
+
+
+class Session(object):
+    """
+    Use a Session to send requests through a transport.Client with a
+    session token once one has been issued. The first request logs in
+    with the full Auth or RemoteAuth block; when its Auth result
+    carries a token, later requests send only the token. A request
+    rejected while using a token is sent again once with the full
+    login, which also picks up a fresh token.
+
+    Only requests sent through the session use the token. Batch.send
+    and retry.Retry.send take a Session in place of the client, but
+    Client.stream, Client.upload, the pagination helpers and sync.Sync
+    build their requests with the client's own auth, so they always
+    send the full login.
+
+    Arguments:
+        client (obj): a transport.Client object
+        application (obj): an Application object (default: the client's)
+        auth (obj): an Auth or RemoteAuth object (default: the client's)
+        token_tag (str): the child of the Auth result which carries
+                         the token (default: session)
+
+    """
+    def __init__(self, client, application=None, auth=None, token_tag=TOKEN_TAG):
+        self.client = client
+        self.application = application or client.application
+        self.login_auth = auth or client.auth
+        if self.application is None or self.login_auth is None:
+            raise Exception('session needs an application and auth')
+        self.token_tag = token_tag
+        self.token = None
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return '<Session company={company} username={username} active={active}>'.format(
+            company=self.login_auth.company, username=self.login_auth.username,
+            active=self.token is not None)
+
+    @property
+    def auth(self):
+        """
+        The auth object for the next request: a SessionAuth while a
+        token is held, otherwise the login auth.
+
+        """
+        token = self.token
+        if token is None:
+            return self.login_auth
+        return SessionAuth(self.login_auth.company, self.login_auth.username, token)
+
+    def envelope(self, xml_data):
+        """
+        Returns a Request wrapping xml_data with the session's
+        application and current auth.
+
+        Arguments:
+            xml_data (list): a list of ElementTree command objects
+
+        """
+        return Request(self.application, self.auth, xml_data)
+
+    def expire(self, token=None):
+        """
+        Forgets the session token, so the next request logs in again.
+        With a token, only forgets it if it is still the current one.
+
+        """
+        with self._lock:
+            if token is None or token == self.token:
+                self.token = None
+
+    def _update(self, response):
+        status, elem = auth_status(response)
+        if status != '0':
+            return
+        token = elem.findtext(self.token_tag)
+        if token:
+            with self._lock:
+                self.token = token
+
+    def send(self, request):
+        """
+        Sends the commands of a Request, or of a list of command
+        elements, with the current auth and returns the parsed
+        <response> element. The auth the Request was built with is
+        replaced, so a Batch or a Request built elsewhere can be sent
+        through the session.
+
+        Arguments:
+            request (obj): a Request object or a list of command elements
+
+        """
+        xml_data = request.xml_data if isinstance(request, Request) else request
+        auth = self.auth
+        response = self.client.send(Request(self.application, auth, xml_data))
+        if isinstance(auth, SessionAuth) and auth_status(response)[0] != '0':
+            # the server does not run commands when auth fails, so the
+            # request can be sent again with the full login
+            self.expire(auth.session)
+            response = self.client.send(
+                Request(self.application, self.login_auth, xml_data))
+        self._update(response)
+        return response
+
+    def login(self):
+        """
+        Logs in with the full auth block straight away and returns the
+        session token, or None when the server issued none.
+
+        """
+        self.expire()
+        self.send([Time().time()])
+        return self.token
+
+    def describe(self, code):
+        """
+        Returns the message of a status code, see Client.describe.
+
+        """
+        return self.client.describe(code)
@@ -0,0 +1,244 @@
+# -*- coding: utf-8
+"""The sync.py module reads only the records which changed since the
+last run. A high-water mark per datatype is kept in a local JSON state
+file, and each run pages through a newer-than read on the updated
+field from that mark on, yielding the new and changed records.
+"""
+
+from __future__ import absolute_import
+
+import datetime
+import io
+import json
+import os
+
+from oaxmlapi.commands import Read
+from oaxmlapi.datatypes import Datatype
+from oaxmlapi.pagination import fetch, page
+from oaxmlapi.utilities import _save_json
+
+
+# the field holding the time a record last changed
+UPDATED_FIELD = 'updated'
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+_DATE_FIELDS = (('year', 4), ('month', 2), ('day', 2), ('hour', 2),
+    ('minute', 2), ('second', 2), )
+
+
+def timestamp(record, field=UPDATED_FIELD):
+    """
+    Returns the Date in a field of a record element as a
+    'YYYY-MM-DD HH:MM:SS' string, which sorts in time order, or None
+    when the record has no such date.
+
+    Arguments:
+        record (obj): a record ElementTree object
+        field (str): the date field (default: updated)
+
+    """
+    date = record.find(field + '/Date')
+    if date is None:
+        return None
+    parts = []
+    for name, width in _DATE_FIELDS:
+        text = (date.findtext(name) or '0').strip() or '0'
+        parts.append(text.zfill(width))
+    return '{0}-{1}-{2} {3}:{4}:{5}'.format(*parts)
+
+
+def _date(mark):
+    """
+    Returns a Date Datatype one second before mark, so that a
+    newer-than filter also matches the records stamped at mark.
+
+    """
+    value = datetime.datetime.strptime(mark, TIMESTAMP_FORMAT)
+    value -= datetime.timedelta(seconds=1)
+    return Datatype('Date', {
+        'year': '{0:04d}'.format(value.year),
+        'month': '{0:02d}'.format(value.month),
+        'day': '{0:02d}'.format(value.day),
+        'hour': '{0:02d}'.format(value.hour),
+        'minute': '{0:02d}'.format(value.minute),
+        'second': '{0:02d}'.format(value.second),
+    })
+
+
+class SyncState(object):
+    """
+    Use a SyncState to keep the high-water mark of each datatype: the
+    latest updated timestamp synced, and the ids of the records synced
+    at exactly that timestamp.
+
+    Arguments:
+        path (str): the JSON state file; it is created on save
+
+    """
+    def __init__(self, path):
+        self.path = path
+        self.marks = {}
+        if os.path.exists(path):
+            with io.open(path, encoding='utf-8') as fp:
+                self.marks = json.load(fp)
+
+    def __str__(self):
+        return '<SyncState path={path} datatypes={count}>'.format(
+            path=self.path, count=len(self.marks))
+
+    def mark(self, type):
+        """
+        Returns a tuple of (timestamp, ids) for a datatype, or
+        (None, set()) when it was never synced.
+
+        Arguments:
+            type (str): a datatype name, e.g. Project
+
+        """
+        mark = self.marks.get(type)
+        if not mark:
+            return None, set()
+        return mark['updated'], set(mark['ids'])
+
+    def advance(self, type, updated, id):
+        """
+        Records that the record id stamped updated was synced.
+
+        Arguments:
+            type (str): a datatype name, e.g. Project
+            updated (str): the record's 'YYYY-MM-DD HH:MM:SS' timestamp
+            id (str): the record id
+
+        """
+        mark = self.marks.get(type)
+        if not mark or updated > mark['updated']:
+            self.marks[type] = {'updated': updated, 'ids': [id]}
+        elif updated == mark['updated'] and id not in mark['ids']:
+            mark['ids'].append(id)
+
+    def reset(self, type=None):
+        """
+        Forgets the mark of a datatype, or of every datatype, so the
+        next sync reads everything again.
+
+        Arguments:
+            type (str): a datatype name (default: all of them)
+
+        """
+        if type is None:
+            self.marks.clear()
+        else:
+            self.marks.pop(type, None)
+
+    def save(self):
+        """
+        Writes the state to its path, replacing the file in one step.
+
+        """
+        _save_json(self.path, self.marks)
+
+
+class Sync(object):
+    """
+    Use a Sync to read the records of a datatype which were added or
+    changed since the last run.
+
+    Each page is a newer-than read from the current mark, ordered by
+    the updated field, of at most page_size records. Records stamped
+    at the mark itself are read again, since more of them may have
+    been written in the same second, and the ids already synced at
+    that timestamp are skipped. When a page ends inside a run of
+    records sharing a timestamp, the next page starts after them with
+    an offset in the limit attribute, so the run is read only once.
+    This relies on the server returning records with the same
+    timestamp in the same order each time.
+
+    The state is saved after every page the caller has consumed, so a
+    run which stops part way resumes from the last full page, and a
+    record is yielded at least once.
+
+    Arguments:
+        client (obj): a transport.Client with an application and auth
+        state (obj): a SyncState object, or the path of a state file
+        page_size (int): the number of records per request, at most
+                         1000 (default: 1000)
+        field (str): the field holding the time a record last changed
+                     (default: updated)
+
+    """
+    def __init__(self, client, state, page_size=1000, field=UPDATED_FIELD):
+        if page_size < 1:
+            raise Exception('page_size must be at least 1')
+        self.client = client
+        self.state = state if isinstance(state, SyncState) else SyncState(state)
+        self.page_size = page_size
+        self.field = field
+
+    def __str__(self):
+        return '<Sync state={path}>'.format(path=self.state.path)
+
+    def read(self, type, mark=None, filters=None, fields=None):
+        """
+        Returns the Read of the records of a datatype stamped at or
+        after mark, oldest first.
+
+        Arguments:
+            type (str): a datatype name, e.g. Project
+            mark (str): a 'YYYY-MM-DD HH:MM:SS' timestamp (optional)
+            filters (list): further Read.Filter objects or filter dictionaries
+            fields (list): the fields to return; id and the updated
+                           field are added (default: all fields)
+
+        """
+        filters = list(filters or ())
+        if mark is not None:
+            filters.append(
+                Read.Filter('newer-than', self.field, _date(mark)))
+        if fields:
+            fields = list(fields) + [
+                f for f in ('id', self.field) if f not in fields]
+        return Read(type, 'all', {}, filters=filters or None,
+            orderby={'field': self.field, 'order': 'asc'}, fields=fields)
+
+    def changes(self, type, filters=None, fields=None):
+        """
+        A generator which yields every record of a datatype added or
+        changed since the last sync, oldest first, and advances the
+        datatype's mark as they are consumed.
+
+        Arguments:
+            type (str): a datatype name, e.g. Project
+            filters (list): further Read.Filter objects or filter dictionaries
+            fields (list): the fields to return; id and the updated
+                           field are added (default: all fields)
+
+        """
+        # the timestamp the reads start from, and the number of records
+        # stamped with it which earlier pages of this run already read
+        start, offset = self.state.mark(type)[0], 0
+        while True:
+            mark, seen = self.state.mark(type)
+            read = self.read(type, start, filters, fields)
+            records = fetch(self.client, page(read, offset, self.page_size))
+            stamps = []
+            for record in records:
+                id = record.findtext('id')
+                updated = timestamp(record, self.field)
+                if updated is None:
+                    raise Exception('{type} record {id} has no {field} date'.format(
+                        type=type, id=id, field=self.field))
+                stamps.append(updated)
+                if mark is not None and (updated < mark or
+                        (updated == mark and id in seen)):
+                    continue
+                yield record
+                self.state.advance(type, updated, id)
+            self.state.save()
+            if len(records) < self.page_size:
+                return
+            last = stamps[-1]
+            if last == start:
+                offset += len(records)
+            else:
+                start, offset = last, stamps.count(last)
@@ -0,0 +1,237 @@
+# -*- coding: utf-8
+"""The throttle.py module keeps a transport.Client under the request
+rates OpenAir allows. A RateLimiter spaces out requests and commands
+with token buckets, and an AdaptiveLimit caps the requests in flight,
+halving the cap when the server throttles or slows down and raising it
+again one step at a time while responses stay fast.
+"""
+
+from __future__ import absolute_import
+
+import threading
+import time
+
+
+# HTTP statuses which mean the server is shedding load
+THROTTLE_STATUSES = (429, 503, )
+
+# OpenAir status codes which mean the request was throttled. It is
+# empty, so only THROTTLE_STATUSES and slow responses lower the limit
+# until an AdaptiveLimit is given codes
+THROTTLE_CODES = ()
+
+_clock = getattr(time, 'monotonic', time.time)
+
+
+class TokenBucket(object):
+    """
+    A thread-safe token bucket which refills at rate tokens a second
+    and holds at most burst tokens.
+
+    Arguments:
+        rate (float): the tokens added per second
+        burst (float): the most tokens held (default: rate, at least 1)
+
+    """
+    def __init__(self, rate, burst=None):
+        if rate <= 0:
+            raise Exception('rate must be above 0')
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1, rate))
+        self.tokens = self.burst
+        self._updated = _clock()
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return '<TokenBucket rate={rate} burst={burst}>'.format(
+            rate=self.rate, burst=self.burst)
+
+    def reserve(self, n=1):
+        """
+        Takes n tokens and returns the seconds to wait before they may
+        be used. The bucket may go into debt, so a request larger than
+        burst waits for its share instead of blocking forever.
+
+        Arguments:
+            n (float): the number of tokens
+
+        """
+        with self._lock:
+            now = _clock()
+            self.tokens = min(self.burst,
+                self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self.tokens -= n
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class RateLimiter(object):
+    """
+    Use a RateLimiter to cap the requests and the commands sent per
+    second. Either limit may be left out.
+
+    Arguments:
+        requests (float): the requests allowed per second (optional)
+        commands (float): the commands allowed per second (optional)
+        burst (float): the most requests sent at once after an idle
+                       spell (default: requests, at least 1)
+
+    """
+    def __init__(self, requests=None, commands=None, burst=None):
+        if requests is None and commands is None:
+            raise Exception('pass requests or commands per second')
+        self.requests = TokenBucket(requests, burst) if requests else None
+        self.commands = TokenBucket(commands) if commands else None
+
+    def __str__(self):
+        return '<RateLimiter requests={requests} commands={commands}>'.format(
+            requests=self.requests and self.requests.rate,
+            commands=self.commands and self.commands.rate)
+
+    def reserve(self, commands=1, requests=1):
+        """
+        Takes tokens for requests and commands and returns the seconds
+        to wait before sending.
+
+        Arguments:
+            commands (int): the commands about to be sent
+            requests (int): the requests about to be sent
+
+        """
+        wait = 0.0
+        if self.requests is not None and requests:
+            wait = self.requests.reserve(requests)
+        if self.commands is not None and commands:
+            wait = max(wait, self.commands.reserve(commands))
+        return wait
+
+    def acquire(self, commands=1, requests=1):
+        """
+        Blocks until requests and commands may be sent.
+
+        Arguments:
+            commands (int): the commands about to be sent
+            requests (int): the requests about to be sent
+
+        """
+        wait = self.reserve(commands, requests)
+        if wait > 0:
+            time.sleep(wait)
+
+
+class AdaptiveLimit(object):
+    """
+    Use an AdaptiveLimit to cap the requests in flight. The cap grows
+    by one for every cap's worth of fast responses and is multiplied
+    by backoff when the server throttles, or when the smoothed latency
+    climbs above tolerance times the lowest latency seen. After a cut
+    the cap holds for one window so a burst of slow responses only
+    counts once.
+
+    Arguments:
+        initial (int): the starting cap (default: 4)
+        minimum (int): the lowest cap (default: 1)
+        maximum (int): the highest cap (default: 16)
+        backoff (float): the factor applied on a cut (default: 0.5)
+        tolerance (float): how much slower than the fastest response
+                           the average may get before a cut (default: 2)
+        codes (list): OpenAir status codes which mean throttling
+                      (default: THROTTLE_CODES)
+
+    """
+    # weight of each sample in the smoothed latency
+    smoothing = 0.2
+
+    # how quickly the fastest latency follows a lasting slowdown
+    drift = 0.01
+
+    def __init__(self, initial=4, minimum=1, maximum=16, backoff=0.5,
+                 tolerance=2.0, codes=THROTTLE_CODES):
+        if minimum < 1 or maximum < minimum:
+            raise Exception('limits must satisfy 1 <= minimum <= maximum')
+        if not 0 < backoff < 1:
+            raise Exception('backoff must be between 0 and 1')
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.codes = frozenset(str(c) for c in codes)
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.in_flight = 0
+        self.baseline = None
+        self.latency = None
+        self._hold = 0
+        self._cond = threading.Condition()
+
+    def __str__(self):
+        return '<AdaptiveLimit limit={limit} in_flight={in_flight}>'.format(
+            limit=int(self.limit), in_flight=self.in_flight)
+
+    def acquire(self):
+        """
+        Blocks until fewer requests than the cap are in flight, then
+        counts one more.
+
+        """
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def _cut(self):
+        if self._hold > 0:
+            return
+        self.limit = max(self.minimum, int(self.limit) * self.backoff)
+        self._hold = int(self.limit)
+
+    def release(self, latency=None):
+        """
+        Counts one request less in flight and adjusts the cap from its
+        latency. A request which failed is released without one.
+
+        Arguments:
+            latency (float): the seconds the request took (optional)
+
+        """
+        with self._cond:
+            self.in_flight -= 1
+            if self._hold > 0:
+                self._hold -= 1
+            if latency is not None:
+                if self.latency is None:
+                    self.baseline = self.latency = latency
+                else:
+                    self.latency += self.smoothing * (latency - self.latency)
+                    self.baseline = min(latency,
+                        self.baseline + self.drift * (self.latency - self.baseline))
+                if self.latency > self.tolerance * self.baseline:
+                    self._cut()
+                elif self._hold == 0:
+                    self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+    def throttled(self):
+        """
+        Cuts the cap because the server throttled a request.
+
+        """
+        with self._cond:
+            self._cut()
+
+    def observe(self, response):
+        """
+        Cuts the cap when a result in a parsed <response> element has
+        one of the throttle codes. Returns True when it did.
+
+        Arguments:
+            response (obj): a parsed <response> ElementTree object
+
+        """
+        if not self.codes:
+            return False
+        if any(elem.get('status') in self.codes for elem in response):
+            self.throttled()
+            return True
+        return False
@@ -0,0 +1,647 @@
+# -*- coding: utf-8
+"""The transport.py module sends Request objects to OpenAir over a
+pool of persistent HTTP connections and returns the parsed response.
+"""
+
+from __future__ import absolute_import
+
+import contextlib
+import select
+import socket
+import threading
+import zlib
+
+try:
+    import http.client as httplib
+except ImportError:
+    import httplib
+
+try:
+    from urllib.parse import urlsplit
+except ImportError:
+    from urlparse import urlsplit
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+from oaxmlapi.cache import invalidate, send_cached
+from oaxmlapi.connections import Error, Request, RequestWriter
+from oaxmlapi.errors import default as _default_errors
+from oaxmlapi.throttle import THROTTLE_STATUSES, _clock
+from oaxmlapi.utilities import AUTH_TAGS
+
+
+# errors raised when a pooled connection was closed by the server
+# while it sat idle; the request is retried once on a new connection
+_STALE_ERRORS = (httplib.BadStatusLine, httplib.CannotSendRequest,
+    socket.error, )
+
+# commands which do not change anything, or only change a record when
+# it still matches a condition, so sending them twice is harmless
+REPLAYABLE_TAGS = ('Read', 'Time', 'Whoami', 'ModifyOnCondition', )
+
+
+def _replayable(body):
+    """
+    Returns True when every command in a serialized request is safe to
+    send twice.
+
+    """
+    try:
+        request = ET.fromstring(body)
+    except SyntaxError:
+        return False
+    return all(elem.tag in REPLAYABLE_TAGS
+        for elem in request if elem.tag not in AUTH_TAGS)
+
+
+# response encodings the client can decode, in order of preference
+ENCODINGS = ('gzip', 'deflate', )
+
+# bytes read from the socket per step while decompressing a stream
+_CHUNK_SIZE = 64 * 1024
+
+
+def _decompressor(encoding):
+    if encoding == 'gzip':
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if encoding == 'deflate':
+        return zlib.decompressobj(zlib.MAX_WBITS)
+    raise Exception('content encoding "{encoding}" is not supported'.format(
+        encoding=encoding))
+
+
+def decode(data, encoding):
+    """
+    Returns a response body decompressed according to its
+    Content-Encoding. Deflate bodies are accepted with or without the
+    zlib header, as servers disagree on which one it means.
+
+    Arguments:
+        data (bytes): the response body
+        encoding (str): the Content-Encoding header, or None
+
+    """
+    encoding = (encoding or 'identity').strip().lower()
+    if encoding == 'identity':
+        return data
+    try:
+        decoder = _decompressor(encoding)
+        return decoder.decompress(data) + decoder.flush()
+    except zlib.error:
+        if encoding != 'deflate':
+            raise
+        return zlib.decompress(data, -zlib.MAX_WBITS)
+
+
+class DecodedResponse(object):
+    """
+    A file-like wrapper which decompresses a gzip or deflate http
+    response while it is read, so a parser sees plain XML and the
+    compressed body never has to be held whole.
+
+    Arguments:
+        raw (obj): a file-like object with the compressed body
+        encoding (str): gzip or deflate
+
+    """
+    def __init__(self, raw, encoding):
+        self.raw = raw
+        self.encoding = encoding
+        self._decoder = _decompressor(encoding)
+        self._started = False
+        # compressed input left over when a read hit its size limit
+        self._tail = b''
+        self._eof = False
+
+    def __getattr__(self, name):
+        # status, getheader(), isclosed() etc. come from the response
+        return getattr(self.raw, name)
+
+    def _decompress(self, size):
+        # returns at most size decompressed bytes, or any amount when
+        # size is negative; only empty once the body is done
+        while True:
+            chunk = self._tail
+            if not chunk:
+                chunk = self.raw.read(_CHUNK_SIZE)
+                if not chunk:
+                    self._eof = True
+                    return self._decoder.flush()
+            limit = max(size, 0)
+            if not self._started and self.encoding == 'deflate':
+                # a deflate body without the zlib header
+                try:
+                    data = self._decoder.decompress(chunk, limit)
+                except zlib.error:
+                    self._decoder = zlib.decompressobj(-zlib.MAX_WBITS)
+                    data = self._decoder.decompress(chunk, limit)
+            else:
+                data = self._decoder.decompress(chunk, limit)
+            self._started = True
+            self._tail = self._decoder.unconsumed_tail
+            if data:
+                return data
+
+    def read(self, size=-1):
+        """
+        Returns up to size decompressed bytes, or all of the rest when
+        size is negative or left out. No more than size bytes are
+        decompressed at a time, however well the body compresses.
+
+        """
+        if size is None:
+            size = -1
+        if size == 0 or self._eof:
+            return b''
+        if size > 0:
+            return self._decompress(size)
+        parts = []
+        while not self._eof:
+            parts.append(self._decompress(-1))
+        return b''.join(parts)
+
+
+def _compressed(body):
+    """
+    Returns body gzipped: bytes for bytes, and a generator of gzipped
+    chunks for an iterable of bytestrings.
+
+    """
+    if isinstance(body, bytes):
+        encoder = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return encoder.compress(body) + encoder.flush()
+
+    def chunks():
+        encoder = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for chunk in body:
+            data = encoder.compress(chunk)
+            if data:
+                yield data
+        yield encoder.flush()
+    return chunks()
+
+
+def _post(conn, path, body, headers):
+    """
+    Sends a POST of body on conn. An iterable of bytestrings is framed
+    with chunked transfer encoding here, since http.client only does so
+    from Python 3.6 and Python 2 cannot send an iterable at all.
+
+    """
+    if isinstance(body, bytes):
+        conn.request('POST', path, body, headers)
+        return
+    conn.putrequest('POST', path,
+        skip_accept_encoding='Accept-Encoding' in headers)
+    for name, value in headers.items():
+        conn.putheader(name, value)
+    conn.putheader('Transfer-Encoding', 'chunked')
+    conn.endheaders()
+    for chunk in body:
+        if chunk:
+            conn.send(('%X\r\n' % len(chunk)).encode('ascii') + chunk + b'\r\n')
+    conn.send(b'0\r\n\r\n')
+
+
+def _dropped(conn):
+    """
+    Returns True when an idle connection was closed by the server,
+    i.e. its socket is unusable or already readable. A connection
+    without a socket reconnects by itself.
+
+    """
+    sock = conn.sock
+    if sock is None:
+        return False
+    try:
+        return bool(select.select([sock], [], [], 0)[0])
+    except (ValueError, socket.error):
+        return True
+
+
+class TransportError(Exception):
+    """
+    Raised when the server answers with a non-200 HTTP status.
+
+    Arguments:
+        status (int): the HTTP status code
+        reason (str): the HTTP reason phrase
+        body (bytes): the response body
+
+    """
+    def __init__(self, status, reason, body):
+        Exception.__init__(self, 'HTTP {status} {reason}'.format(
+            status=status, reason=reason))
+        self.status = status
+        self.reason = reason
+        self.body = body
+
+
+class ConnectionPool(object):
+    """
+    A thread-safe pool of HTTP(S) connections to a single host.
+    At most pool_size connections are open at once; callers block
+    until a connection is free.
+
+    Arguments:
+        url (str): the API endpoint url
+        pool_size (int): the maximum number of connections
+        timeout (float): the socket timeout in seconds
+
+    """
+    def __init__(self, url, pool_size=4, timeout=60):
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise Exception('url scheme "{scheme}" must be http or https'.format(
+                scheme=parts.scheme))
+        if pool_size < 1:
+            raise Exception('pool_size must be at least 1')
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = parts.path or '/'
+        if parts.query:
+            self.path += '?' + parts.query
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+
+    def __str__(self):
+        return '<ConnectionPool host={host} size={size}>'.format(
+            host=self.host, size=self.pool_size)
+
+    def _new(self):
+        if self.scheme == 'https':
+            return httplib.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return httplib.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def get(self):
+        """
+        Returns a tuple of (connection, reused). Blocks until one
+        of the pool_size connection slots is free.
+
+        """
+        self._slots.acquire()
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return self._new(), False
+            if not _dropped(conn):
+                return conn, True
+            conn.close()
+
+    def put(self, conn, reusable=True):
+        """
+        Returns a connection to the pool, closing it when it cannot
+        be reused.
+
+        """
+        if reusable:
+            self._idle.put(conn)
+        else:
+            conn.close()
+        self._slots.release()
+
+    def close(self):
+        """
+        Closes all idle connections.
+
+        """
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class Client(object):
+    """
+    Use the Client to POST Request objects to the OpenAir XML API
+    over a pool of keep-alive connections.
+
+    Arguments:
+        url (str): the API endpoint, e.g. https://www.openair.com/api.pl
+        pool_size (int): the maximum number of open connections
+        keepalive (bool): reuse connections between calls (default: True)
+        timeout (float): the socket timeout in seconds
+        application (obj): an Application object used by helpers that
+                           build their own requests (optional)
+        auth (obj): an Auth or RemoteAuth object used by helpers that
+                    build their own requests (optional)
+        cache (obj): a cache.MemoryCache or cache.SqliteCache object
+                     for Read results (optional)
+        errors (obj): an errors.ErrorCatalog object (default: the
+                      catalog shared by the process)
+        limiter (obj): a throttle.RateLimiter object (optional)
+        concurrency (obj): a throttle.AdaptiveLimit object (optional)
+        compression (bool): ask for gzip or deflate responses
+                            (default: True)
+        compress_requests (int): gzip request bodies of at least this
+                                 many bytes, and every streamed upload
+                                 (optional)
+
+    """
+    def __init__(self, url, pool_size=4, keepalive=True, timeout=60,
+                 application=None, auth=None, cache=None, errors=None,
+                 limiter=None, concurrency=None, compression=True,
+                 compress_requests=None):
+        self.url = url
+        self.keepalive = keepalive
+        self.compression = compression
+        self.compress_requests = compress_requests
+        self.application = application
+        self.auth = auth
+        self.cache = cache
+        self.errors = errors if errors is not None else _default_errors()
+        self.limiter = limiter
+        self.concurrency = concurrency
+        self.pool = ConnectionPool(url, pool_size=pool_size, timeout=timeout)
+
+    def __str__(self):
+        return '<Client url={url}>'.format(url=self.url)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """
+        Closes all idle pooled connections.
+
+        """
+        self.pool.close()
+
+    def _headers(self):
+        headers = {
+            'Content-Type': 'text/xml; charset=utf-8',
+            'Connection': 'keep-alive' if self.keepalive else 'close',
+        }
+        if self.compression:
+            headers['Accept-Encoding'] = ', '.join(ENCODINGS)
+        return headers
+
+    def _encode(self, body, headers):
+        """
+        Returns body, gzipped when it is large enough and request
+        compression is on. The Content-Encoding header is added to
+        headers.
+
+        """
+        if self.compress_requests is None:
+            return body
+        if isinstance(body, bytes) and len(body) < self.compress_requests:
+            return body
+        headers['Content-Encoding'] = 'gzip'
+        return _compressed(body)
+
+    def _acquire(self, commands=1, requests=1):
+        """
+        Waits for the rate limiter and for a slot under the
+        concurrency cap, and returns the time the request started.
+
+        """
+        if self.limiter is not None:
+            self.limiter.acquire(commands, requests)
+        if self.concurrency is not None:
+            self.concurrency.acquire()
+        return _clock()
+
+    def _release(self, latency=None, status=None):
+        """
+        Gives back the concurrency slot of a request, with its latency
+        when an HTTP status came back.
+
+        """
+        if self.concurrency is None:
+            return
+        self.concurrency.release(latency)
+        if status in THROTTLE_STATUSES:
+            self.concurrency.throttled()
+
+    def _open(self, body, headers):
+        """
+        POSTs body on a pooled connection and returns a tuple of
+        (connection, response) with the response body still unread.
+        A connection that went stale while idle is replaced once. Once
+        the body has been sent, the server may have run it, so it is
+        only sent again when all of its commands are replayable.
+
+        """
+        raw = body
+        body = self._encode(body, headers)
+        conn, reused = self.pool.get()
+        try:
+            sent = False
+            try:
+                _post(conn, self.pool.path, body, headers)
+                sent = True
+                res = conn.getresponse()
+            except _STALE_ERRORS as e:
+                # an iterable body may be partly consumed; never replay it
+                if (not reused or isinstance(e, socket.timeout) or
+                        not isinstance(body, bytes) or
+                        (sent and not _replayable(raw))):
+                    raise
+                conn.close()
+                conn = self.pool._new()
+                _post(conn, self.pool.path, body, headers)
+                res = conn.getresponse()
+        except BaseException:
+            self.pool.put(conn, reusable=False)
+            raise
+        return conn, res
+
+    def _request(self, body, headers, commands=1, requests=1):
+        """
+        POSTs body on a pooled connection and returns the response
+        bytes after reading them fully.
+
+        """
+        started = self._acquire(commands, requests)
+        latency = status = None
+        try:
+            conn, res = self._open(body, headers)
+            try:
+                data = res.read()
+            except BaseException:
+                self.pool.put(conn, reusable=False)
+                raise
+            latency, status = _clock() - started, res.status
+        finally:
+            self._release(latency, status)
+
+        self.pool.put(conn, reusable=self.keepalive and not res.will_close)
+        data = decode(data, res.getheader('Content-Encoding'))
+        if res.status != 200:
+            raise TransportError(res.status, res.reason, data)
+        return data
+
+    def post(self, body):
+        """
+        POSTs XML and returns the raw response bytes. An iterable of
+        bytestrings is sent with chunked transfer encoding as it is
+        produced.
+
+        Arguments:
+            body (bytes|iter): a serialized XML request, or an iterable
+                               of bytestrings
+
+        """
+        try:
+            return self._request(body, self._headers())
+        finally:
+            # raw XML may hold writes of any datatype
+            if self.cache is not None:
+                self.cache.clear()
+
+    def _send(self, request):
+        response = ET.fromstring(self._request(request.tostring(),
+            self._headers(), len(request.xml_data or ())))
+        if self.concurrency is not None:
+            self.concurrency.observe(response)
+        return response
+
+    def send(self, request):
+        """
+        Sends a Request and returns the parsed <response> element.
+        With a cache, Read results are served from and stored in it.
+
+        Arguments:
+            request (obj): a Request object
+
+        """
+        if self.cache is not None:
+            return send_cached(self.cache, self._send, request)
+        return self._send(request)
+
+    @contextlib.contextmanager
+    def stream(self, request):
+        """
+        Sends a Request and yields the unread http response, a
+        file-like object which can be handed to utilities.iterrecords
+        so that parsing starts before the download ends. A compressed
+        response is decompressed as it is read. The connection goes
+        back to the pool only if the response was read to the end.
+
+        Arguments:
+            request (obj): a Request object
+
+        """
+        started = self._acquire(len(request.xml_data or ()))
+        try:
+            conn, res = self._open(request.tostring(), self._headers())
+        except BaseException:
+            self._release()
+            raise
+        # the body is read by the caller, so only the wait for the
+        # headers counts as latency
+        latency = _clock() - started
+        complete = False
+        try:
+            encoding = res.getheader('Content-Encoding')
+            if res.status != 200:
+                data = res.read()
+                complete = True
+                raise TransportError(res.status, res.reason,
+                    decode(data, encoding))
+            if (encoding or 'identity').strip().lower() == 'identity':
+                yield res
+            else:
+                yield DecodedResponse(res, encoding.strip().lower())
+            complete = res.isclosed()
+        finally:
+            self._release(latency, res.status)
+            self.pool.put(conn, reusable=(
+                complete and self.keepalive and not res.will_close))
+            if self.cache is not None:
+                invalidate(self.cache, request.xml_data or ())
+
+    def upload(self, commands):
+        """
+        Streams a request built from the client's application and auth
+        and an iterable of commands, then returns the parsed <response>
+        element. Commands are serialized one at a time while the upload
+        is in progress, so memory use does not grow with their number.
+
+        Arguments:
+            commands (iter): command objects, ElementTree objects or
+                             already serialized bytestrings
+
+        """
+        if self.application is None or self.auth is None:
+            raise Exception('client needs an application and auth to build requests')
+        writer = RequestWriter(self.application, self.auth)
+        sent = []
+
+        def record(commands):
+            for command in commands:
+                # the count is not known up front, so commands are
+                # metered as they are streamed
+                if self.limiter is not None:
+                    self.limiter.acquire(1, 0)
+                if self.cache is not None:
+                    sent.append(command)
+                yield command
+
+        try:
+            response = ET.fromstring(self._request(
+                writer.chunks(record(commands)), self._headers(), 0))
+        finally:
+            if self.cache is not None:
+                invalidate(self.cache, sent)
+        if self.concurrency is not None:
+            self.concurrency.observe(response)
+        return response
+
+    def _fetch_error(self, code):
+        """
+        Reads the message of an error code from the server, or returns
+        None when the server answered without one. Raises when the
+        server could not be asked, so the code is tried again later.
+
+        """
+        if self.application is None:
+            raise Exception('client needs an application to read error codes')
+        data = self._request(Error(self.application, code).tostring(),
+            self._headers())
+        error = ET.fromstring(data).find('.//Error')
+        if error is None:
+            return None
+        return error.findtext('text') or error.findtext('comment') or None
+
+    def describe(self, code):
+        """
+        Returns the message of a status code from the client's error
+        catalog. Codes the catalog does not know are read from the
+        server once, which needs the client's application.
+
+        Arguments:
+            code (str): a status code, e.g. 601
+
+        """
+        return self.errors.lookup(code, self._fetch_error)
+
+    def envelope(self, xml_data):
+        """
+        Returns a Request wrapping xml_data with the client's
+        application and auth.
+
+        Arguments:
+            xml_data (list): a list of ElementTree command objects
+
+        """
+        if self.application is None or self.auth is None:
+            raise Exception('client needs an application and auth to build requests')
+        return Request(self.application, self.auth, xml_data)
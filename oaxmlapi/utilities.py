@@ -3,7 +3,9 @@
 with XML.
 """
 
+import io
 import json
+import os
 
 try:
     import xml.etree.cElementTree as ET
@@ -11,63 +13,118 @@ except ImportError:
     import xml.etree.ElementTree as ET
 
 
-ADDRESS_FIELDS = ('first', 'middle', 'last', 'salutation', 'email', 'phone',
-    'fax', 'mobile', 'addr1', 'addr2', 'addr3', 'addr4', 'city', 'state',
-    'zip', 'country', )
+class Choices(tuple):
+    """
+    A tuple of allowed values which tests membership against a
+    frozenset built once, and raises the same error everywhere a value
+    falls outside it.
 
-READ_METHODS = ('all', 'equal to', 'not equal to', 'custom equal to', 'user',
-    'project', 'not exported', )
+    Arguments:
+        name (str): the attribute name used in error messages
+        values (tuple): the allowed values, in documentation order
 
-READ_ATTRIBUTES = ('limit', 'deleted', 'include_flags', '_include_nondeleted',
-    '_with_project_only', 'base_currency', 'generic', 'enable_custom', )
+    """
+    def __new__(cls, name, values):
+        self = tuple.__new__(cls, values)
+        self.name = name
+        self._lookup = frozenset(values)
+        return self
 
-REPORT_TYPES = ('Envelope', 'Timesheet', 'Report', )
+    def __reduce__(self):
+        return (Choices, (self.name, tuple(self)))
 
-SUBMIT_TYPES = ('Envelope', 'Timesheet', 'Invoice', )
+    def __contains__(self, value):
+        try:
+            return value in self._lookup
+        except TypeError:
+            return False
 
-SWITCH_TYPES = ('Company', 'User', )
+    def check(self, value):
+        """
+        Returns value if it is allowed, otherwise raises an Exception.
 
-PAGE_ATTRIBUTES = ('default-url', 'company-settings', 'currency-rates',
-    'import-export', 'custom-fields', 'list-reports', 'list-customers',
-    'list-projects', 'list-prospects', 'list-resources', 'list-timesheets',
-    'create-timesheet', 'list-timebills', 'list-invoices', 'create-invoice',
-    'list-envelope-receipts', 'list-envelopes', 'create-envelope',
-    'create-envelope-receipt', 'dashboard', 'list-purchase-requests',
-    'quick-search-resources', 'custom-search-resources', 'view-invoice',
-    'dashboard-project', 'grid-timesheet', 'report-timesheet', )
+        Arguments:
+            value (str): the value to check
 
-APP_ATTRIBUTES = ('km', 'ma', 'pb', 'rm', 'pm', 'ta', 'te', 'tb', )
+        """
+        if value not in self:
+            raise Exception('{name} "{value}" must be one of {allowed}'.format(
+                name=self.name, value=value, allowed=tuple(self)))
+        return value
 
 
-def elem2dict(elem, strip=True):
+ADDRESS_FIELDS = Choices('field', ('first', 'middle', 'last', 'salutation',
+    'email', 'phone', 'fax', 'mobile', 'addr1', 'addr2', 'addr3', 'addr4',
+    'city', 'state', 'zip', 'country', ))
+
+READ_METHODS = Choices('method', ('all', 'equal to', 'not equal to',
+    'custom equal to', 'user', 'project', 'not exported', ))
+
+READ_ATTRIBUTES = Choices('attribute', ('limit', 'deleted', 'include_flags',
+    '_include_nondeleted', '_with_project_only', 'base_currency', 'generic',
+    'enable_custom', ))
+
+REPORT_TYPES = Choices('type', ('Envelope', 'Timesheet', 'Report', ))
+
+SUBMIT_TYPES = Choices('type', ('Envelope', 'Timesheet', 'Invoice', ))
+
+SWITCH_TYPES = Choices('type', ('Company', 'User', ))
+
+PAGE_ATTRIBUTES = Choices('page', ('default-url', 'company-settings',
+    'currency-rates', 'import-export', 'custom-fields', 'list-reports',
+    'list-customers', 'list-projects', 'list-prospects', 'list-resources',
+    'list-timesheets', 'create-timesheet', 'list-timebills', 'list-invoices',
+    'create-invoice', 'list-envelope-receipts', 'list-envelopes',
+    'create-envelope', 'create-envelope-receipt', 'dashboard',
+    'list-purchase-requests', 'quick-search-resources',
+    'custom-search-resources', 'view-invoice', 'dashboard-project',
+    'grid-timesheet', 'report-timesheet', ))
+
+APP_ATTRIBUTES = Choices('app', ('km', 'ma', 'pb', 'rm', 'pm', 'ta', 'te',
+    'tb', ))
+
+# the result tags of the auth block in a <response>, as opposed to the
+# results of the commands
+AUTH_TAGS = ('Auth', 'RemoteAuth', )
+
+
+def _save_json(path, data):
     """
-    Convert an ElementTree() object into a Python dictionary.
+    Writes data to path as JSON, replacing the file in one step so a
+    reader never sees it half written.
 
-    Arguments:
-        elem (obj): a valid ElementTree() object
-        strip (bool): a boolean value for striping whitespace (optional)
+    """
+    text = json.dumps(data, indent=0, sort_keys=True, ensure_ascii=False)
+    if not isinstance(text, bytes):
+        # json.dumps returns str on Python 2 unless data holds unicode
+        text = text.encode('utf-8')
+    tmp = path + '.tmp'
+    with io.open(tmp, 'wb') as fp:
+        fp.write(text)
+    if hasattr(os, 'replace'):
+        os.replace(tmp, path)
+    else:  # pragma: no cover
+        if os.path.exists(path):
+            os.remove(path)
+        os.rename(tmp, path)
 
-    Credit: Hay Kranen (https://github.com/hay/xml2json)
 
+def _attribs(elem):
     """
-    d = {}
-    for key, value in elem.attrib.items():
-        d['@'+key] = value
+    Return a new dictionary of an element's attributes keyed '@name'.
 
-    # loop over subelements to merge them
-    for subelem in elem:
-        v = elem2dict(subelem, strip=strip)
-        tag = subelem.tag
-        value = v[tag]
-        try:
-            # add to existing list for this tag
-            d[tag].append(value)
-        except AttributeError:
-            # turn existing entry into a list
-            d[tag] = [d[tag], value]
-        except KeyError:
-            # add a new non-list entry
-            d[tag] = value
+    """
+    if not elem.attrib:
+        return {}
+    return dict(('@' + k, v) for k, v in elem.attrib.items())
+
+
+def _finish(elem, d, strip):
+    """
+    Complete the dictionary of an element whose children have all been
+    merged into d, returning the value stored under the element's tag.
+
+    """
     text = elem.text
     tail = elem.tail
     if strip:
@@ -83,12 +140,70 @@ def elem2dict(elem, strip=True):
     if d:
         # use #text element if other attributes exist
         if text:  # pragma: no cover
-            d["#text"] = text
-    else:
-        # text is the value if no attributes
-        d = text or None
+            d['#text'] = text
+        return d
+    # text is the value if no attributes
+    return text or None
+
+
+def elem2dict(elem, strip=True):
+    """
+    Convert an ElementTree() object into a Python dictionary. The tree
+    is walked with an explicit stack, so deep trees cannot hit the
+    recursion limit.
+
+    Arguments:
+        elem (obj): a valid ElementTree() object
+        strip (bool): a boolean value for striping whitespace (optional)
 
-    return {elem.tag: d}
+    Credit: Hay Kranen (https://github.com/hay/xml2json)
+
+    """
+    # each stack entry is (element, its dictionary, its child iterator)
+    stack = [(elem, _attribs(elem), iter(elem))]
+    while True:
+        node, d, children = stack[-1]
+        for subelem in children:
+            if len(subelem) or subelem.attrib:
+                # descend; merged into d once its children are done
+                stack.append((subelem, _attribs(subelem), iter(subelem)))
+                break
+
+            # leaf elements without attributes are finished inline
+            text = subelem.text
+            tail = subelem.tail
+            if strip:
+                if text:
+                    text = text.strip()
+                if tail:  # pragma: no cover
+                    tail = tail.strip()
+            if tail:  # pragma: no cover
+                value = {'#tail': tail}
+                if text:
+                    value['#text'] = text
+            else:
+                value = text or None
+
+            tag = subelem.tag
+            if tag not in d:
+                d[tag] = value
+            elif type(d[tag]) is list:
+                d[tag].append(value)
+            else:
+                d[tag] = [d[tag], value]
+        else:
+            stack.pop()
+            value = _finish(node, d, strip)
+            if not stack:
+                return {node.tag: value}
+            parent = stack[-1][1]
+            tag = node.tag
+            if tag not in parent:
+                parent[tag] = value
+            elif type(parent[tag]) is list:
+                parent[tag].append(value)
+            else:
+                parent[tag] = [parent[tag], value]
 
 
 def xml2json(xmlstring, strip=True):
@@ -104,3 +219,92 @@ def xml2json(xmlstring, strip=True):
     """
     elem = ET.fromstring(xmlstring)
     return json.dumps(elem2dict(elem, strip=strip))
+
+
+def failure(tag, status, describe=None):
+    """
+    Returns the message for a command or Auth tag which failed with a
+    status code, including the code's text when describe knows it.
+
+    Arguments:
+        tag (str): the failed tag, e.g. Read
+        status (str): the status code
+        describe (func): maps a status code to its text (optional)
+
+    """
+    message = '{tag} failed with status "{status}"'.format(tag=tag, status=status)
+    text = describe(status) if describe is not None else None
+    if text:
+        message += ': ' + text
+    return message
+
+
+class StatusError(Exception):
+    """
+    Raised when a command or Auth tag of a response failed with a
+    status code.
+
+    Arguments:
+        tag (str): the failed tag, e.g. Read
+        status (str): the status code
+        describe (func): maps a status code to its text (optional)
+
+    """
+    def __init__(self, tag, status, describe=None):
+        Exception.__init__(self, failure(tag, status, describe))
+        self.tag = tag
+        self.status = status
+
+    def described(self, describe):
+        """
+        Returns a copy of the error whose message includes the text of
+        the status code. Call it once the response is closed, since
+        describe may need a connection of its own.
+
+        Arguments:
+            describe (func): maps a status code to its text
+
+        """
+        return StatusError(self.tag, self.status, describe)
+
+
+def iterrecords(source, tag=None, describe=None):
+    """
+    Yield the records (<Project>, <Task>, ...) of an XML response one
+    at a time while the response is still being parsed. Each record is
+    detached from the tree once the consumer moves on, so peak memory
+    does not grow with the number of records.
+
+    Arguments:
+        source (obj): a file-like object or an XML bytestring
+        tag (str): only yield records with this tag (optional)
+        describe (func): maps a status code to its text, for error
+                         messages (optional); it is called while source
+                         is still open, so a function which needs a
+                         connection, e.g. Client.describe, should be
+                         applied with StatusError.described() instead
+
+    """
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+
+    depth = 0
+    command = None
+    auth = False
+    for event, elem in ET.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            depth += 1
+            if depth == 2:
+                # Auth and command tags carry the status attribute
+                if elem.get('status', '0') != '0':
+                    raise StatusError(elem.tag, elem.get('status'), describe)
+                command = elem
+                # an Auth result may carry a session token, not records
+                auth = elem.tag in AUTH_TAGS
+            continue
+
+        if depth == 3:
+            if not auth and (tag is None or elem.tag == tag):
+                yield elem
+            command.remove(elem)
+        depth -= 1
@@ -7,6 +7,7 @@ setup(
     author='Ryan Morrissey',
     author_email='contactme@ryancmorrissey.com',
     packages=find_packages(),
+    package_data={'oaxmlapi': ['schema.json']},
     url='https://github.com/23maverick23/oaxmlapi',
     license='LICENSE',
     description='A Python wrapper around the NetSuite OpenAir XML API.',
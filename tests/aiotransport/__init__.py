@@ -0,0 +1,5 @@
+# Path hack for cross-package imports
+if __name__ == "__main__" and __package__ is None:
+    from sys import path
+    from os.path import dirname as dir
+    path.append(dir(path[0]))
@@ -0,0 +1,151 @@
+# -*- coding: utf-8
+from __future__ import absolute_import
+import asyncio
+import time
+import unittest
+from oaxmlapi import aiotransport, commands, connections, datatypes, transport
+from mockserver import MockServer, echo_status
+
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+
+def time_request():
+    app = connections.Application('test', '1.0', 'default', 'abc123')
+    auth = connections.Auth('company', 'username', 'p@ssw0rd')
+    return connections.Request(app, auth, [commands.Time().time()])
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class TestAsyncClientClass(unittest.TestCase):
+
+    def test_str(self):
+        self.assertEqual(
+            str(aiotransport.AsyncClient('https://www.openair.com/api.pl')),
+            '<AsyncClient url=https://www.openair.com/api.pl>'
+        )
+
+    def test_invalid_scheme(self):
+        with self.assertRaises(Exception):
+            aiotransport.AsyncClient('ftp://www.openair.com/api.pl')
+
+    def test_send(self):
+        async def main(url):
+            async with aiotransport.AsyncClient(url) as client:
+                return await client.send(time_request())
+
+        with MockServer() as server:
+            response = run(main(server.url))
+        self.assertEqual(
+            ET.tostring(response),
+            b'<response><Auth status="0" /><Time status="0" /></response>'
+        )
+        self.assertEqual(server.requests, [time_request().tostring()])
+
+    def test_send_compressed(self):
+        async def main(url):
+            async with aiotransport.AsyncClient(url) as client:
+                return await client.send(time_request())
+
+        with MockServer(encoding='gzip') as server:
+            response = run(main(server.url))
+        self.assertEqual(
+            ET.tostring(response),
+            b'<response><Auth status="0" /><Time status="0" /></response>'
+        )
+        self.assertEqual(server.headers[0].get('Accept-Encoding'), 'gzip, deflate')
+
+    def test_gather_order(self):
+        def respond(body):
+            code = ET.fromstring(body).find('Read/Error/code').text
+            return '<response><Read status="{code}" /></response>'.format(
+                code=code).encode('utf-8')
+
+        app = connections.Application('test', '1.0', 'default', 'abc123')
+        requests = [connections.Error(app, code) for code in range(20)]
+
+        async def main(url):
+            async with aiotransport.AsyncClient(url, pool_size=4) as client:
+                return await client.gather(requests, concurrency=4)
+
+        with MockServer(respond=respond) as server:
+            responses = run(main(server.url))
+        self.assertEqual(
+            [r.find('Read').get('status') for r in responses],
+            [str(code) for code in range(20)]
+        )
+        self.assertLessEqual(server.connections, 4)
+
+    def test_gather_overlaps_waits(self):
+        requests = [time_request() for i in range(10)]
+
+        async def sequential(url):
+            async with aiotransport.AsyncClient(url) as client:
+                for request in requests:
+                    await client.send(request)
+
+        async def concurrent(url):
+            async with aiotransport.AsyncClient(url, pool_size=10) as client:
+                await client.gather(requests, concurrency=10)
+
+        with MockServer(delay=0.05) as server:
+            start = time.time()
+            run(sequential(server.url))
+            sequential_time = time.time() - start
+
+            start = time.time()
+            run(concurrent(server.url))
+            concurrent_time = time.time() - start
+
+        self.assertGreaterEqual(sequential_time, 0.5)
+        self.assertLess(concurrent_time, sequential_time / 2)
+
+    def test_http_error(self):
+        async def main(url):
+            async with aiotransport.AsyncClient(url) as client:
+                return await client.send(time_request())
+
+        with MockServer(respond=lambda body: (503, b'busy')) as server:
+            with self.assertRaises(transport.TransportError) as ctx:
+                run(main(server.url))
+        self.assertEqual(ctx.exception.status, 503)
+
+    def test_hang_up_after_send(self):
+        calls = []
+
+        def respond(body):
+            calls.append(body)
+            if len(calls) == 2:
+                return None
+            return echo_status(body)
+
+        app = connections.Application('test', '1.0', 'default', 'abc123')
+        auth = connections.Auth('company', 'username', 'p@ssw0rd')
+        add = commands.Add('Task', {}, datatypes.Datatype('Task', {'name': 'x'})).add()
+
+        async def main(url):
+            async with aiotransport.AsyncClient(url) as client:
+                await client.send(time_request())
+                # the Add may have run, so it is not sent again
+                with self.assertRaises(transport.TransportError):
+                    await client.send(connections.Request(app, auth, [add]))
+                del calls[:]
+                await client.send(time_request())
+                # a Time is safe to send again
+                await client.send(time_request())
+
+        with MockServer(respond=respond) as server:
+            run(main(server.url))
+        self.assertEqual(len(server.requests), 5)
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestAsyncClientClass)
+unittest.TextTestRunner(verbosity=2).run(suite)
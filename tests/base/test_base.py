@@ -36,5 +36,13 @@ class TestBaseClass(unittest.TestCase):
             b'<?xml version="1.0" encoding="utf-8"?>'
         )
 
+    def test_canonical(self):
+        self.assertEqual(base._Base().canonical(), b'')
+        self.assertEqual(len(base._Base().digest()), 40)
+
+    def test_slots(self):
+        with self.assertRaises(AttributeError):
+            base._Base().__dict__
+
 suite = unittest.TestLoader().loadTestsFromTestCase(TestBaseClass)
 unittest.TextTestRunner(verbosity=2).run(suite)
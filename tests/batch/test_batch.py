@@ -0,0 +1,149 @@
+# -*- coding: utf-8
+from __future__ import absolute_import
+import unittest
+from oaxmlapi import batch, commands, connections, datatypes, transport
+from mockserver import MockServer
+
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+
+def modifies(count):
+    return [
+        commands.Modify('Task', {}, datatypes.Datatype('Task', {'id': str(i)}))
+        for i in range(count)
+    ]
+
+
+class TestPackFunction(unittest.TestCase):
+
+    def test_max_commands(self):
+        elements = [m.modify() for m in modifies(120)]
+        groups = batch.pack(elements, max_commands=50)
+        self.assertEqual([len(g) for g in groups], [50, 50, 20])
+        self.assertEqual(sum(groups, []), elements)
+
+    def test_max_bytes(self):
+        elements = [m.modify() for m in modifies(10)]
+        length = len(ET.tostring(elements[0]))
+        groups = batch.pack(elements, max_bytes=100 + 3 * length, overhead=100)
+        self.assertEqual([len(g) for g in groups], [3, 3, 3, 1])
+
+    def test_oversized(self):
+        elements = [m.modify() for m in modifies(3)]
+        groups = batch.pack(elements, max_bytes=10)
+        self.assertEqual([len(g) for g in groups], [1, 1, 1])
+
+    def test_invalid_max_commands(self):
+        with self.assertRaises(Exception):
+            batch.pack([], max_commands=0)
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestPackFunction)
+unittest.TextTestRunner(verbosity=2).run(suite)
+
+
+class TestBatchClass(unittest.TestCase):
+
+    def setUp(self):
+        self.app = connections.Application('test', '1.0', 'default', 'abc123')
+        self.auth = connections.Auth('company', 'username', 'p@ssw0rd')
+
+    def test_str(self):
+        self.assertEqual(
+            str(batch.Batch(self.app, self.auth, modifies(120))),
+            '<Batch commands=120 requests=3>'
+        )
+
+    def test_requests(self):
+        requests = batch.Batch(self.app, self.auth, modifies(3), max_commands=2).requests()
+        self.assertEqual(len(requests), 2)
+        self.assertEqual(
+            requests[1].tostring(),
+            (
+                b'<?xml version="1.0" encoding="utf-8"?>'
+                b'<request API_ver="1.0" client="test" client_ver="1.0" '
+                b'key="abc123" namespace="default"><Auth><Login>'
+                b'<company>company</company><user>username</user>'
+                b'<password>p@ssw0rd</password></Login></Auth>'
+                b'<Modify type="Task"><Task><id>2</id></Task></Modify>'
+                b'</request>'
+            )
+        )
+
+    def test_split(self):
+        b = batch.Batch(self.app, self.auth, modifies(3), max_commands=2)
+        responses = [
+            ET.fromstring(b'<response><Auth status="0"/><Modify status="0"/>'
+                          b'<Modify status="601"/></response>'),
+            ET.fromstring(b'<response><Auth status="0"/><Modify status="0"/></response>'),
+        ]
+        self.assertEqual(
+            [r.get('status') for r in b.split(responses)],
+            ['0', '601', '0']
+        )
+
+    def test_split_auth_failed(self):
+        b = batch.Batch(self.app, self.auth, modifies(1))
+        responses = [ET.fromstring(b'<response><Auth status="401"/></response>')]
+        with self.assertRaises(Exception):
+            b.split(responses)
+
+    def test_split_count_mismatch(self):
+        b = batch.Batch(self.app, self.auth, modifies(2))
+        responses = [ET.fromstring(b'<response><Auth status="0"/><Modify status="0"/></response>')]
+        with self.assertRaises(Exception):
+            b.split(responses)
+
+    def test_send(self):
+        with MockServer() as server:
+            with transport.Client(server.url) as client:
+                found = batch.Batch(self.app, self.auth, modifies(120)).send(client)
+        self.assertEqual(len(server.requests), 3)
+        self.assertEqual(len(found), 120)
+        self.assertEqual(set(r.tag for r in found), set(['Modify']))
+
+    def test_merge_reads(self):
+        reads = [
+            commands.Read('Project', 'all', {'limit': '1', 'deleted': '1'}, None, None, ['id', 'name']),
+            commands.Read('Project', 'all', {'deleted': '1', 'limit': '1'}, None, None, ['name', 'id']),
+            commands.Read('User', 'all', {'limit': '1'}),
+        ]
+        b = batch.Batch(self.app, self.auth, reads + modifies(2) + modifies(1))
+        self.assertEqual(str(b), '<Batch commands=6 requests=1>')
+        self.assertEqual(len(b.elements), 5)
+        responses = [ET.fromstring(
+            b'<response><Auth status="0"/><Read status="0"/><Read status="1"/>'
+            b'<Modify status="2"/><Modify status="3"/><Modify status="4"/></response>')]
+        self.assertEqual(
+            [r.get('status') for r in b.split(responses)],
+            ['0', '0', '1', '2', '3', '4']
+        )
+
+    def test_merge_reads_with_filters_reordered(self):
+        newer = commands.Read.Filter('newer-than', 'updated',
+            datatypes.Datatype('Date', {'year': '2018'})).getFilter()
+        older = commands.Read.Filter('older-than', 'created',
+            datatypes.Datatype('Date', {'year': '2019'})).getFilter()
+        reads = [
+            commands.Read('Project', 'all', {}, [newer, older]),
+            commands.Read('Project', 'all', {}, [older, newer]).read(),
+        ]
+        b = batch.Batch(self.app, self.auth, reads)
+        self.assertEqual(len(b.elements), 1)
+        self.assertEqual(b.index, [0, 0])
+
+    def test_merge_not_across_writes(self):
+        read = commands.Read('Project', 'all', {'limit': '1'})
+        modify = commands.Modify('Project', {}, datatypes.Datatype('Project', {'id': '1'}))
+        b = batch.Batch(self.app, self.auth, [read, modify, read, read])
+        self.assertEqual([e.tag for e in b.elements], ['Read', 'Modify', 'Read'])
+        self.assertEqual(b.index, [0, 1, 2, 2])
+
+    def test_merge_off(self):
+        reads = [commands.Read('User', 'all', {'limit': '1'}) for i in range(2)]
+        self.assertEqual(len(batch.Batch(self.app, self.auth, reads, merge=False).elements), 2)
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestBatchClass)
+unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,82 @@
+# -*- coding: utf-8
+"""Compare utilities.elem2dict with the previous recursive version on
+a 10k-record OpenAir Read response.
+
+Run from the root package directory:
+
+    python -m tests.benchmarks.bench_elem2dict
+"""
+from __future__ import absolute_import, print_function
+import timeit
+
+from oaxmlapi import utilities
+
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+
+RECORDS = 10000
+REPEAT = 3
+
+
+def recursive_elem2dict(elem, strip=True):
+    d = {}
+    for key, value in elem.attrib.items():
+        d['@'+key] = value
+
+    for subelem in elem:
+        v = recursive_elem2dict(subelem, strip=strip)
+        tag = subelem.tag
+        value = v[tag]
+        try:
+            d[tag].append(value)
+        except AttributeError:
+            d[tag] = [d[tag], value]
+        except KeyError:
+            d[tag] = value
+    text = elem.text
+    tail = elem.tail
+    if strip:
+        if text:
+            text = text.strip()
+        if tail:
+            tail = tail.strip()
+
+    if tail:
+        d['#tail'] = tail
+
+    if d:
+        if text:
+            d["#text"] = text
+    else:
+        d = text or None
+
+    return {elem.tag: d}
+
+
+def response(records):
+    parts = [b'<response><Auth status="0"/><Read status="0">']
+    for i in range(records):
+        parts.append((
+            '<Timesheet><id>{i}</id><userid>{user}</userid>'
+            '<status>A</status><total> 40.00 </total><notes/>'
+            '<starts><Date><year>2018</year><month>05</month><day>14</day></Date></starts>'
+            '<ends><Date><year>2018</year><month>05</month><day>20</day></Date></ends>'
+            '<flags><Flag><name>approved</name><setting>1</setting></Flag>'
+            '<Flag><name>locked</name><setting>0</setting></Flag></flags>'
+            '</Timesheet>'
+        ).format(i=i, user=i % 50).encode('utf-8'))
+    parts.append(b'</Read></response>')
+    return ET.fromstring(b''.join(parts))
+
+
+if __name__ == '__main__':
+    root = response(RECORDS)
+    assert recursive_elem2dict(root) == utilities.elem2dict(root)
+
+    before = min(timeit.repeat(lambda: recursive_elem2dict(root), number=1, repeat=REPEAT))
+    after = min(timeit.repeat(lambda: utilities.elem2dict(root), number=1, repeat=REPEAT))
+    print('{records} records  recursive {before:7.1f} ms  iterative {after:7.1f} ms  ({ratio:.2f}x)'.format(
+        records=RECORDS, before=before * 1e3, after=after * 1e3, ratio=before / after))
@@ -0,0 +1,55 @@
+# -*- coding: utf-8
+"""Memory per instance and build time of Datatype, Read, Add and Modify
+with __slots__, compared with otherwise identical subclasses which
+carry a __dict__.
+
+Run from the root package directory:
+
+    python -m tests.benchmarks.bench_memory
+"""
+from __future__ import absolute_import, print_function
+import gc
+import timeit
+import tracemalloc
+
+from oaxmlapi import commands, datatypes
+
+
+INSTANCES = 100000
+
+
+def with_dict(cls):
+    # a subclass without __slots__ gets a __dict__ back
+    return type(cls.__name__, (cls, ), {})
+
+
+def builders(Datatype, Read, Add, Modify):
+    return [
+        ('Datatype', lambda i: Datatype('Project', {'id': str(i)})),
+        ('Read', lambda i: Read('Project', 'equal to', {'limit': '1000'})),
+        ('Add', lambda i: Add('Project', {}, datatypes.Datatype('Project', {}))),
+        ('Modify', lambda i: Modify('Project', {}, datatypes.Datatype('Project', {}))),
+    ]
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    kept = [build(i) for i in range(INSTANCES)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size / float(INSTANCES)
+
+
+if __name__ == '__main__':
+    slotted = builders(datatypes.Datatype, commands.Read, commands.Add,
+        commands.Modify)
+    dicts = builders(with_dict(datatypes.Datatype), with_dict(commands.Read),
+        with_dict(commands.Add), with_dict(commands.Modify))
+    for (name, build), (_, build_dict) in zip(slotted, dicts):
+        d, s = measure(build_dict), measure(build)
+        td = timeit.timeit(lambda: build_dict(1), number=INSTANCES)
+        ts = timeit.timeit(lambda: build(1), number=INSTANCES)
+        print('{name:<9} __dict__ {d:5.0f} B {td:5.2f}s  __slots__ {s:5.0f} B {ts:5.2f}s  ({saved:.0f} B/instance saved)'.format(
+            name=name, d=d, td=td, s=s, ts=ts, saved=d - s))
@@ -0,0 +1,35 @@
+# -*- coding: utf-8
+"""Memory per record of records.torecord compared with the dictionaries
+built by utilities.elem2dict, for Timesheet rows.
+
+Run from the root package directory:
+
+    python -m tests.benchmarks.bench_records
+"""
+from __future__ import absolute_import, print_function
+import gc
+import tracemalloc
+
+from oaxmlapi import records, utilities
+from tests.benchmarks.bench_elem2dict import response
+
+
+RECORDS = 20000
+
+
+def measure(convert, elements):
+    gc.collect()
+    tracemalloc.start()
+    kept = [convert(e) for e in elements]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size / float(len(elements))
+
+
+if __name__ == '__main__':
+    elements = list(response(RECORDS).find('Read'))
+    as_dict = measure(lambda e: utilities.elem2dict(e)['Timesheet'], elements)
+    as_record = measure(records.torecord, elements)
+    print('{records} Timesheets  dict {d:6.0f} B/record  record {r:6.0f} B/record  ({ratio:.1f}x smaller)'.format(
+        records=RECORDS, d=as_dict, r=as_record, ratio=as_dict / as_record))
@@ -0,0 +1,38 @@
+# -*- coding: utf-8
+"""Compare Datatype.tostring() with a compiled Template for the same
+Task shape filled with different values.
+
+Run from the root package directory:
+
+    python -m tests.benchmarks.bench_template
+"""
+from __future__ import absolute_import, print_function
+import timeit
+
+from oaxmlapi import datatypes
+
+
+NUMBER = 5000
+REPEAT = 5
+
+
+def task(i):
+    date = datatypes.Datatype('Date', {'year': '2018', 'month': '05', 'day': str(i % 28 + 1)})
+    return datatypes.Datatype('Task', {
+        'name': 'Task {i} & review'.format(i=i),
+        'projectid': str(i % 97),
+        'timesheetid': str(i),
+        'date': date,
+        'email': 'owner{i}@example.com'.format(i=i),
+    })
+
+
+if __name__ == '__main__':
+    tasks = [task(i) for i in range(NUMBER)]
+    template = tasks[0].template()
+    assert all(template.render(t) == t.tostring() for t in tasks)
+
+    before = min(timeit.repeat(lambda: [t.tostring() for t in tasks], number=1, repeat=REPEAT))
+    after = min(timeit.repeat(lambda: [template.render(t) for t in tasks], number=1, repeat=REPEAT))
+    print('Task  tostring {before:6.2f} us  template {after:6.2f} us  ({ratio:.1f}x)'.format(
+        before=before / NUMBER * 1e6, after=after / NUMBER * 1e6, ratio=before / after))
@@ -0,0 +1,83 @@
+# -*- coding: utf-8
+"""Per-request build cost of tostring() for Request, Read and Add.
+
+Run from the root package directory:
+
+    python -m tests.benchmarks.bench_tostring
+
+The "before" column replays the old _Base.tostring(), which called
+_main() once to test for None and again to serialize.
+"""
+from __future__ import absolute_import, print_function
+import timeit
+
+from oaxmlapi import commands, connections, datatypes
+
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+
+NUMBER = 2000
+REPEAT = 5
+
+
+def legacy_tostring(obj):
+    header, body = None, None
+    if obj._header:
+        header = b'<?xml version="1.0" encoding="utf-8"?>'
+    if obj._main() is not None:
+        body = ET.tostring(obj._main(), 'utf-8')
+    return (header if header else b'') + (body if body else b'')
+
+
+def build_read():
+    date = datatypes.Datatype('Date', {'year': '2018', 'month': '05', 'day': '01'})
+    filter1 = commands.Read.Filter('newer-than', 'updated', date).getFilter()
+    return commands.Read(
+        'Task',
+        'equal to',
+        {'limit': '0,1000'},
+        [filter1],
+        {'field': 'id', 'order': 'asc'},
+        ['id', 'name', 'projectid', 'updated']
+    )
+
+
+def build_add():
+    date = datatypes.Datatype('Date', {'year': '2018', 'month': '05', 'day': '01'})
+    task = datatypes.Datatype('Task', {
+        'name': 'Design review',
+        'projectid': '13',
+        'timesheetid': '42',
+        'date': date,
+        'email': 'owner@example.com',
+    })
+    return commands.Add('Task', {'enable_custom': '1'}, task)
+
+
+def build_request():
+    app = connections.Application('bench', '1.0', 'default', 'abc123')
+    auth = connections.Auth('company', 'username', 'p@ssw0rd')
+    return connections.Request(app, auth, [build_read().read(), build_add().add()])
+
+
+def run(name, obj):
+    build = min(timeit.repeat(obj._main, number=NUMBER, repeat=REPEAT))
+    before = min(timeit.repeat(lambda: legacy_tostring(obj), number=NUMBER, repeat=REPEAT))
+    after = min(timeit.repeat(obj.tostring, number=NUMBER, repeat=REPEAT))
+    assert legacy_tostring(obj) == obj.tostring()
+    print(('{name:<8} build {build:6.1f} us  '
+           'before {before:6.1f} us  after {after:6.1f} us  ({ratio:.2f}x)').format(
+        name=name,
+        build=build / NUMBER * 1e6,
+        before=before / NUMBER * 1e6,
+        after=after / NUMBER * 1e6,
+        ratio=before / after))
+
+
+if __name__ == '__main__':
+    run('Read', build_read())
+    run('Add', build_add())
+    run('Request', build_request())
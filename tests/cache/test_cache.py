@@ -0,0 +1,227 @@
+# -*- coding: utf-8
+from __future__ import absolute_import
+import time
+import unittest
+from oaxmlapi import cache, commands, connections, datatypes, transport
+from mockserver import MockServer
+
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+
+def answer(body):
+    """
+    Answer Reads with one record holding the read type, and every
+    other command with an empty result.
+
+    """
+    request = ET.fromstring(body)
+    response = ET.Element('response')
+    ET.SubElement(response, 'Auth', {'status': '0'})
+    for elem in request:
+        if elem.tag in ('Auth', 'RemoteAuth'):
+            continue
+        result = ET.SubElement(response, elem.tag, {'status': '0'})
+        if elem.tag == 'Read':
+            ET.SubElement(result, elem.get('type')).text = elem.get('type')
+    return ET.tostring(response, 'utf-8')
+
+
+def sent(server):
+    """
+    Returns the command tags of every request the server received.
+
+    """
+    return [
+        [e.tag for e in ET.fromstring(body) if e.tag not in ('Auth', 'RemoteAuth')]
+        for body in server.requests
+    ]
+
+
+class TestMemoryCacheClass(unittest.TestCase):
+
+    def test_str(self):
+        self.assertEqual(str(cache.MemoryCache()), '<MemoryCache entries=0>')
+
+    def test_get_set(self):
+        c = cache.MemoryCache()
+        c.set('a', b'1', 'Project')
+        self.assertEqual(c.get('a'), b'1')
+        self.assertIsNone(c.get('b'))
+
+    def test_lru(self):
+        c = cache.MemoryCache(maxsize=2)
+        c.set('a', b'1', 'Project')
+        c.set('b', b'2', 'Project')
+        c.get('a')
+        c.set('c', b'3', 'Project')
+        self.assertEqual(c.get('a'), b'1')
+        self.assertIsNone(c.get('b'))
+        self.assertEqual(len(c), 2)
+
+    def test_ttl(self):
+        c = cache.MemoryCache(ttl=-1)
+        c.set('a', b'1', 'Project')
+        self.assertIsNone(c.get('a'))
+
+    def test_invalidate(self):
+        c = cache.MemoryCache()
+        c.set('a', b'1', 'Project')
+        c.set('b', b'2', 'User')
+        c.invalidate('Project')
+        self.assertIsNone(c.get('a'))
+        self.assertEqual(c.get('b'), b'2')
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestMemoryCacheClass)
+unittest.TextTestRunner(verbosity=2).run(suite)
+
+
+class TestSqliteCacheClass(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = cache.SqliteCache(':memory:', maxsize=2)
+
+    def tearDown(self):
+        self.cache.close()
+
+    def test_str(self):
+        self.assertEqual(str(self.cache), '<SqliteCache path=:memory:>')
+
+    def test_lru(self):
+        self.cache.set('a', b'1', 'Project')
+        time.sleep(0.01)
+        self.cache.set('b', b'2', 'Project')
+        time.sleep(0.01)
+        self.cache.get('a')
+        time.sleep(0.01)
+        self.cache.set('c', b'3', 'Project')
+        self.assertEqual(self.cache.get('a'), b'1')
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual(len(self.cache), 2)
+
+    def test_ttl(self):
+        c = cache.SqliteCache(':memory:', ttl=-1)
+        c.set('a', b'1', 'Project')
+        self.assertIsNone(c.get('a'))
+        c.close()
+
+    def test_invalidate_and_clear(self):
+        self.cache.set('a', b'1', 'Project')
+        self.cache.set('b', b'2', 'User')
+        self.cache.invalidate('Project')
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(self.cache.get('b'), b'2')
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestSqliteCacheClass)
+unittest.TextTestRunner(verbosity=2).run(suite)
+
+
+class TestClientCache(unittest.TestCase):
+
+    def setUp(self):
+        self.app = connections.Application('test', '1.0', 'default', 'abc123')
+        self.auth = connections.Auth('company', 'username', 'p@ssw0rd')
+
+    def client(self, server):
+        return transport.Client(server.url, application=self.app,
+            auth=self.auth, cache=cache.MemoryCache())
+
+    def read(self, type='Project'):
+        return commands.Read(type, 'all', {'limit': '1'}).read()
+
+    def test_key_ignores_password(self):
+        other = connections.Auth('company', 'username', 'changed')
+        self.assertEqual(
+            cache.key(self.auth, self.read()),
+            cache.key(other, self.read())
+        )
+        self.assertNotEqual(
+            cache.key(self.auth, self.read()),
+            cache.key(connections.Auth('company', 'other', 'p'), self.read())
+        )
+
+    def test_hit(self):
+        with MockServer(respond=answer) as server:
+            with self.client(server) as client:
+                first = client.send(client.envelope([self.read()]))
+                second = client.send(client.envelope([self.read()]))
+        self.assertEqual(ET.tostring(first), ET.tostring(second))
+        self.assertEqual(len(server.requests), 1)
+
+    def test_hit_with_filters_reordered(self):
+        newer = commands.Read.Filter('newer-than', 'updated',
+            datatypes.Datatype('Date', {'year': '2018'})).getFilter()
+        older = commands.Read.Filter('older-than', 'created',
+            datatypes.Datatype('Date', {'year': '2019'})).getFilter()
+        with MockServer(respond=answer) as server:
+            with self.client(server) as client:
+                client.send(client.envelope([commands.Read(
+                    'Project', 'all', {}, [newer, older]).read()]))
+                client.send(client.envelope([commands.Read(
+                    'Project', 'all', {}, [older, newer]).read()]))
+        self.assertEqual(len(server.requests), 1)
+
+    def test_partial_hit(self):
+        with MockServer(respond=answer) as server:
+            with self.client(server) as client:
+                client.send(client.envelope([self.read('Project')]))
+                response = client.send(client.envelope(
+                    [self.read('User'), self.read('Project')]))
+        self.assertEqual(sent(server), [['Read'], ['Read']])
+        self.assertEqual(
+            [r[0].tag for r in response if r.tag == 'Read'],
+            ['User', 'Project']
+        )
+
+    def test_write_invalidates(self):
+        add = commands.Add('Project', {}, datatypes.Datatype('Project', {'name': 'x'}))
+        reads = lambda: [self.read('Project'), self.read('User')]
+        with MockServer(respond=answer) as server:
+            with self.client(server) as client:
+                client.send(client.envelope(reads()))
+                client.send(client.envelope([add.add()]))
+                client.send(client.envelope(reads()))
+        self.assertEqual(sent(server), [['Read', 'Read'], ['Add'], ['Read']])
+
+    def test_read_before_write_in_one_request(self):
+        modify = commands.Modify('Project', {},
+            datatypes.Datatype('Project', {'id': '1', 'name': 'x'}))
+        with MockServer(respond=answer) as server:
+            with self.client(server) as client:
+                client.send(client.envelope([self.read(), modify.modify()]))
+                client.send(client.envelope([self.read()]))
+        self.assertEqual(sent(server), [['Read', 'Modify'], ['Read']])
+
+    def test_write_before_read_in_one_request(self):
+        modify = commands.Modify('Project', {},
+            datatypes.Datatype('Project', {'id': '1', 'name': 'x'}))
+        with MockServer(respond=answer) as server:
+            with self.client(server) as client:
+                client.send(client.envelope([self.read()]))
+                client.send(client.envelope([modify.modify(), self.read()]))
+        self.assertEqual(sent(server), [['Read'], ['Modify', 'Read']])
+
+    def test_upload_invalidates(self):
+        add = commands.Add('Project', {}, datatypes.Datatype('Project', {'name': 'x'}))
+        with MockServer(respond=answer) as server:
+            with self.client(server) as client:
+                client.send(client.envelope([self.read()]))
+                client.upload([add])
+                client.send(client.envelope([self.read()]))
+        self.assertEqual(len(server.requests), 3)
+
+    def test_failed_read_not_cached(self):
+        respond = lambda body: (
+            b'<response><Auth status="0"/><Read status="601"/></response>')
+        with MockServer(respond=respond) as server:
+            with self.client(server) as client:
+                client.send(client.envelope([self.read()]))
+                client.send(client.envelope([self.read()]))
+        self.assertEqual(len(server.requests), 2)
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestClientCache)
+unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,133 @@
+# -*- coding: utf-8
+from __future__ import absolute_import
+import datetime
+import io
+import json
+import math
+import struct
+import sys
+import unittest
+from oaxmlapi import columnar
+
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+
+SLIPS = ET.fromstring(
+    b'<Read status="0">'
+    b'<Slip><id>1</id><cost>12.50</cost><description>Taxi</description>'
+    b'<date><Date><year>2018</year><month>05</month><day>14</day></Date></date>'
+    b'<updated><Date><year>2018</year><month>05</month><day>16</day>'
+    b'<hour>09</hour><minute>30</minute><second>05</second></Date></updated></Slip>'
+    b'<Slip><id>2</id><cost/><description/>'
+    b'<date><Date><year/><month/><day/></Date></date></Slip>'
+    b'</Read>'
+)
+
+FIELDS = ['id', 'cost', 'description', 'date', 'updated']
+
+TYPES = {'id': 'int', 'cost': 'float', 'date': 'date', 'updated': 'datetime'}
+
+
+def slips():
+    columns = columnar.Columns(FIELDS, TYPES)
+    columns.extend(SLIPS)
+    return columns
+
+
+class TestColumnsClass(unittest.TestCase):
+
+    def test_str(self):
+        self.assertEqual(str(slips()), '<Columns fields=5 rows=2>')
+
+    def test_invalid_type(self):
+        with self.assertRaises(Exception):
+            columnar.Columns(['id'], {'id': 'decimal'})
+
+    def test_unknown_field(self):
+        with self.assertRaises(Exception):
+            columnar.Columns(['id'], {'cost': 'float'})
+
+    def test_columns(self):
+        columns = slips()
+        self.assertEqual(len(columns), 2)
+        self.assertEqual(columns.column('id').itemsize, 8)
+        self.assertEqual(list(columns.column('id')), [1, 2])
+        self.assertEqual(columns.column('cost')[0], 12.5)
+        self.assertTrue(math.isnan(columns.column('cost')[1]))
+        self.assertEqual(columns.column('description'), ['Taxi', None])
+        self.assertEqual(
+            list(columns.column('date')),
+            [datetime.date(2018, 5, 14).toordinal(), 0]
+        )
+        self.assertEqual(columns.column('updated')[1], columnar.MISSING_INT)
+
+    def test_repeated_field(self):
+        columns = columnar.Columns(['id', 'cost'], {'id': 'int'})
+        columns.append(ET.fromstring(b'<Slip><id>1</id><id>2</id></Slip>'))
+        self.assertEqual(list(columns.column('id')), [1])
+        self.assertEqual(columns.column('cost'), [None])
+
+    def test_rows(self):
+        self.assertEqual(
+            list(slips().rows()),
+            [
+                (1, 12.5, 'Taxi', datetime.date(2018, 5, 14),
+                 datetime.datetime(2018, 5, 16, 9, 30, 5)),
+                (2, None, None, None, None),
+            ]
+        )
+
+    @unittest.skipIf(sys.version_info < (3, ), 'csv writes byte strings on Python 2')
+    def test_tocsv(self):
+        out = io.StringIO(newline='')
+        slips().tocsv(out)
+        self.assertEqual(
+            out.getvalue(),
+            (
+                'id,cost,description,date,updated\r\n'
+                '1,12.5,Taxi,2018-05-14,2018-05-16T09:30:05\r\n'
+                '2,,,,\r\n'
+            )
+        )
+
+    def test_binary_roundtrip(self):
+        out = io.BytesIO()
+        slips().tobinary(out)
+        out.seek(0)
+        columns = columnar.Columns.frombinary(out)
+        self.assertEqual(columns.types, slips().types)
+        self.assertEqual(list(columns.rows()), list(slips().rows()))
+
+    def test_frombinary_other_typecode(self):
+        for typecode, fmt, order in (('d', '>2d', 'big'), ('q', '<2q', 'little')):
+            header = json.dumps({
+                'fields': ['id'], 'types': {'id': 'int'}, 'length': 2,
+                'byteorder': order, 'sizes': [16],
+                'typecodes': [typecode], 'itemsizes': [8],
+            }).encode('utf-8')
+            data = (columnar.MAGIC + struct.pack('<I', len(header)) + header +
+                struct.pack(fmt, 1, -2))
+            columns = columnar.Columns.frombinary(io.BytesIO(data))
+            self.assertEqual(list(columns.column('id')), [1, -2])
+
+    def test_frombinary_invalid(self):
+        with self.assertRaises(Exception):
+            columnar.Columns.frombinary(io.BytesIO(b'nope'))
+
+    @unittest.skipIf(columnar.numpy is None, 'numpy is not installed')
+    def test_tonumpy(self):
+        arrays = slips().tonumpy()
+        self.assertEqual(arrays['id'].tolist(), [1, 2])
+        self.assertEqual(str(arrays['date'][0]), '2018-05-14')
+        self.assertTrue(str(arrays['date'][1]) == 'NaT')
+
+    @unittest.skipIf(columnar.numpy is not None, 'numpy is installed')
+    def test_tonumpy_missing(self):
+        with self.assertRaises(Exception):
+            slips().tonumpy()
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestColumnsClass)
+unittest.TextTestRunner(verbosity=2).run(suite)
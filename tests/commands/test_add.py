@@ -74,6 +74,21 @@ class TestAddClass(unittest.TestCase):
             )
         )
 
+    def test_datatype_is_lazy(self):
+        project = datatypes.Datatype(
+            'Project',
+            {'name': 'New project'}
+        )
+        add = commands.Add('Project', {}, project)
+        project.fields['name'] = 'Renamed project'
+        self.assertEqual(
+            add.tostring(),
+            (
+                b'<Add type="Project"><Project><name>Renamed project</name>'
+                b'</Project></Add>'
+            )
+        )
+
     def test_invalid_type_user(self):
         with self.assertRaises(Exception):
             user = datatypes.Datatype(
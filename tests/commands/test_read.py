@@ -1,7 +1,8 @@
 # -*- coding: utf-8
 from __future__ import absolute_import
 import unittest
-from oaxmlapi import commands, datatypes
+import warnings
+from oaxmlapi import commands, datatypes, schema
 
 try:
     import xml.etree.cElementTree as ET
@@ -175,6 +176,53 @@ class TestReadClass(unittest.TestCase):
                 None
             )
 
+    def test_canonical(self):
+        newer = commands.Read.Filter(
+            'newer-than', 'updated', datatypes.Datatype('Date', {'year': '2018'})
+        ).getFilter()
+        older = commands.Read.Filter(
+            'older-than', 'created', datatypes.Datatype('Date', {'year': '2019'})
+        ).getFilter()
+        first = commands.Read('Slip', 'all', {'limit': '1', 'deleted': '1'},
+            [newer, older], None, ['projectid', 'id'])
+        second = commands.Read('Slip', 'all', {'deleted': '1', 'limit': '1'},
+            [older, newer], None, ['id', 'projectid'])
+        self.assertNotEqual(first.tostring(), second.tostring())
+        self.assertEqual(first.canonical(), second.canonical())
+        self.assertEqual(first.digest(), second.digest())
+        self.assertEqual(first.filters, [newer, older])
+
+    def test_validate(self):
+        read = commands.Read('Slip', 'all', {'limit': '0, 1000'})
+        self.assertIs(read.validate(), read)
+
+    def test_validate_filter(self):
+        f = commands.Read.Filter('older-than', 'date',
+            datatypes.Datatype('Date', {'yeer': '2013'}))
+        with self.assertRaises(Exception):
+            commands.Read('Slip', 'all', {}, [f]).validate()
+
+    def test_validate_invalid(self):
+        with self.assertRaises(Exception):
+            commands.Read('Slip', 'all', {'limt': '0, 1000'}).validate()
+
+    def test_validate_unknown(self):
+        # the bundled schema does not list every datatype and field
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            commands.Read('Slp', 'all', {'limit': '0, 1000'}).validate()
+            commands.Read('Slip', 'all', {}, None, None, ['id', 'projcetid']).validate()
+        self.assertEqual(
+            [w.category for w in caught],
+            [schema.SchemaWarning, schema.SchemaWarning]
+        )
+
+    def test_validate_return_fields(self):
+        commands.Read('Slip', 'all', {}, None, None, ['id', 'projectid']).validate()
+        with self.assertRaises(Exception):
+            commands.Read('Slip', 'all', {}, None, None, ['id', 'projcetid']).validate(
+                schema.Schema({'Slip': {'id': 'int', 'projectid': 'int'}}))
+
 suite = unittest.TestLoader().loadTestsFromTestCase(TestReadClass)
 unittest.TextTestRunner(verbosity=2).run(suite)
 
@@ -198,5 +246,33 @@ class TestReadFilterClass(unittest.TestCase):
             '<Filter type=older-than field=date>'
         )
 
+    def test_getFilter(self):
+        date = datatypes.Datatype('Date', {'year': '2013'})
+        f = commands.Read.Filter('older-than', 'date', date).getFilter()
+        self.assertEqual(f['filter'], 'older-than')
+        self.assertEqual(f['fieldname'], 'date')
+        self.assertEqual(
+            ET.tostring(f['datatype']),
+            b'<Date><year>2013</year></Date>'
+        )
+        self.assertNotIn('_datatype', f)
+
+    def test_filter_object(self):
+        date = datatypes.Datatype('Date', {'year': '2013'})
+        f = commands.Read.Filter('older-than', 'date', date)
+        self.assertEqual(
+            commands.Read('Slip', 'all', {}, [f]).tostring(),
+            commands.Read('Slip', 'all', {}, [f.getFilter()]).tostring()
+        )
+
+    def test_datatype_memoized(self):
+        f = commands.Read.Filter('older-than', 'date',
+            datatypes.Datatype('Date', {'year': '2013'}))
+        self.assertIs(f.datatype, f.datatype)
+        f.datatype.find('year').text = '2014'
+        self.assertEqual(f.getFilter()['datatype'].find('year').text, '2014')
+        f.datatype = datatypes.Datatype('Date', {'year': '2015'})
+        self.assertEqual(f.datatype.find('year').text, '2015')
+
 suite = unittest.TestLoader().loadTestsFromTestCase(TestReadFilterClass)
 unittest.TextTestRunner(verbosity=2).run(suite)
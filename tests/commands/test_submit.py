@@ -25,6 +25,19 @@ class TestSubmitClass(unittest.TestCase):
             '<Submit type=Timesheet>'
         )
 
+    def test_type_and_datatype(self):
+        timesheet = datatypes.Datatype(
+            'Timesheet',
+            {'id': '476'}
+        )
+        approval = datatypes.Datatype(
+            'Approval',
+            {}
+        )
+        submit = commands.Submit('Timesheet', timesheet, approval)
+        self.assertEqual(submit.type, 'Timesheet')
+        self.assertEqual(submit.datatype.tag, 'Timesheet')
+
     def test_submit(self):
         timesheet = datatypes.Datatype(
             'Timesheet',
@@ -1,5 +1,6 @@
 # -*- coding: utf-8
 from __future__ import absolute_import
+import io
 import unittest
 from oaxmlapi import connections, datatypes, commands
 
@@ -103,5 +104,113 @@ class TestRequestClass(unittest.TestCase):
             )
         )
 
+    def test_envelope(self):
+        app = connections.Application('test', '1.0', 'default', 'abc123')
+        auth = connections.Auth('company', 'username', 'p@ssw0rd')
+        self.assertEqual(
+            connections.Request(app, auth, None).envelope(),
+            (
+                b'<?xml version="1.0" encoding="utf-8"?>'
+                b'<request API_ver="1.0" client="test" client_ver="1.0" '
+                b'key="abc123" namespace="default"><Auth><Login>'
+                b'<company>company</company><user>username</user>'
+                b'<password>p@ssw0rd</password></Login></Auth>',
+                b'</request>'
+            )
+        )
+
+    def test_envelope_cached(self):
+        app = connections.Application('test', '1.0', 'default', 'abc123')
+        auth = connections.Auth('company', 'username', 'p@ssw0rd')
+        first = connections.Request(app, auth, None).envelope()
+        second = connections.Request(app, auth, None).envelope()
+        self.assertIs(first, second)
+
+    def test_envelope_credentials_changed(self):
+        app = connections.Application('test', '1.0', 'default', 'abc123')
+        auth = connections.Auth('company', 'username', 'p@ssw0rd')
+        connections.Request(app, auth, None).envelope()
+        auth.password = 'n3w&p@ss'
+        self.assertIn(
+            b'<password>n3w&amp;p@ss</password>',
+            connections.Request(app, auth, None).envelope()[0]
+        )
+
+    def test_envelope_application_changed(self):
+        app = connections.Application('test', '1.0', 'default', 'abc123')
+        auth = connections.Auth('company', 'username', 'p@ssw0rd')
+        connections.Request(app, auth, None).envelope()
+        other = connections.Application('test', '1.0', 'default', 'def456')
+        self.assertIn(
+            b'key="def456"',
+            connections.Request(other, auth, None).envelope()[0]
+        )
+
+    def test_tostring_matches_tree(self):
+        app = connections.Application('test', '1.0', 'default', 'abc123')
+        auth = connections.RemoteAuth('company', 'username', 'p@ssw0rd')
+        read = commands.Read('Task', 'all', {'limit': '0,10'}, None, None, ['id'])
+        xml_data = [commands.Time().time(), read.read()]
+        req = connections.Request(app, auth, xml_data)
+        self.assertEqual(
+            req.tostring(),
+            b'<?xml version="1.0" encoding="utf-8"?>' + ET.tostring(req.request(), 'utf-8')
+        )
+
 suite = unittest.TestLoader().loadTestsFromTestCase(TestRequestClass)
 unittest.TextTestRunner(verbosity=2).run(suite)
+
+
+class TestRequestWriterClass(unittest.TestCase):
+
+    def setUp(self):
+        self.app = connections.Application('test', '1.0', 'default', 'abc123')
+        self.auth = connections.Auth('company', 'username', 'p@ssw0rd')
+
+    def test_str(self):
+        self.assertEqual(
+            str(connections.RequestWriter(self.app, self.auth)),
+            '<RequestWriter client=test company=company username=username>'
+        )
+
+    def test_write_matches_request(self):
+        tasks = [datatypes.Datatype('Task', {'id': str(i)}) for i in range(5)]
+        adds = [commands.Add('Task', {}, t) for t in tasks]
+        out = io.BytesIO()
+        size = connections.RequestWriter(self.app, self.auth).write(out, iter(adds))
+        expected = connections.Request(self.app, self.auth, [a.add() for a in adds]).tostring()
+        self.assertEqual(out.getvalue(), expected)
+        self.assertEqual(size, len(expected))
+
+    def test_write_mixed(self):
+        elements = [commands.Time().time(), b'<Time />', commands.Time()]
+        out = io.BytesIO()
+        connections.RequestWriter(self.app, self.auth).write(out, elements)
+        self.assertEqual(
+            out.getvalue(),
+            connections.Request(self.app, self.auth, [commands.Time().time()] * 3).tostring()
+        )
+
+    def test_write_empty(self):
+        out = io.BytesIO()
+        connections.RequestWriter(self.app, self.auth).write(out, [])
+        self.assertEqual(
+            out.getvalue(),
+            connections.Request(self.app, self.auth, None).tostring()
+        )
+
+    def test_chunks_lazy(self):
+        built = []
+
+        def adds():
+            for i in range(3):
+                built.append(i)
+                yield commands.Add('Task', {}, datatypes.Datatype('Task', {'id': str(i)}))
+
+        chunks = connections.RequestWriter(self.app, self.auth).chunks(adds())
+        next(chunks)
+        next(chunks)
+        self.assertEqual(built, [0])
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestRequestWriterClass)
+unittest.TextTestRunner(verbosity=2).run(suite)
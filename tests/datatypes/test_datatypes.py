@@ -1,7 +1,8 @@
 # -*- coding: utf-8
 from __future__ import absolute_import
 import unittest
-from oaxmlapi import datatypes
+import warnings
+from oaxmlapi import datatypes, schema
 
 try:
     import xml.etree.cElementTree as ET
@@ -85,5 +86,56 @@ class TestDatatypesClass(unittest.TestCase):
             )
         )
 
+    def test_canonical(self):
+        first = datatypes.Datatype('Project', {
+            'name': 'New project',
+            'id': '1',
+            'start_date': datatypes.Datatype('Date', {'year': '2018', 'day': '01'}),
+        })
+        second = datatypes.Datatype('Project', {
+            'start_date': datatypes.Datatype('Date', {'day': '01', 'year': '2018'}),
+            'id': '1',
+            'name': 'New project',
+        })
+        self.assertEqual(
+            first.canonical(),
+            (
+                b'<Project><id>1</id><name>New project</name><start_date>'
+                b'<Date><day>01</day><year>2018</year></Date></start_date>'
+                b'</Project>'
+            )
+        )
+        self.assertEqual(first.digest(), second.digest())
+        self.assertNotEqual(
+            first.digest(),
+            datatypes.Datatype('Project', {'id': '2'}).digest()
+        )
+
+    def test_validate(self):
+        date = datatypes.Datatype('Date', {'year': '2018'})
+        project = datatypes.Datatype(
+            'Project',
+            {'name': 'New project', 'start_date': date, 'region__c': 'EMEA'}
+        )
+        self.assertIs(project.validate(), project)
+
+    def test_validate_unknown(self):
+        # the bundled schema does not list every datatype and field
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            datatypes.Datatype('Projct', {'name': 'New project'}).validate()
+            datatypes.Datatype('Project', {'nmae': 'New project'}).validate()
+        self.assertEqual(
+            [w.category for w in caught],
+            [schema.SchemaWarning, schema.SchemaWarning, schema.SchemaWarning]
+        )
+
+    def test_validate_invalid(self):
+        with self.assertRaises(Exception):
+            datatypes.Datatype(
+                'Project',
+                {'start_date': datatypes.Datatype('Date', {'yaer': '2018'})}
+            ).validate()
+
 suite = unittest.TestLoader().loadTestsFromTestCase(TestDatatypesClass)
 unittest.TextTestRunner(verbosity=2).run(suite)
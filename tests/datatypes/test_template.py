@@ -0,0 +1,76 @@
+# -*- coding: utf-8
+from __future__ import absolute_import
+import unittest
+from oaxmlapi import datatypes
+
+
+class TestTemplateClass(unittest.TestCase):
+
+    def test_str(self):
+        self.assertEqual(
+            str(datatypes.Datatype('Date', {}).template()),
+            '<Template type=Date>'
+        )
+
+    def test_render_matches_tostring(self):
+        date = datatypes.Datatype('Date', {'month': '03', 'day': ''})
+        task = datatypes.Datatype(
+            'Task',
+            {
+                'name': 'R&D <phase 1>',
+                'date': date,
+                'email': 'john.doe@email.com',
+                'phone': None,
+                'id': '1'
+            }
+        )
+        self.assertEqual(task.template().render(task), task.tostring())
+
+    def test_render_values(self):
+        template = datatypes.Datatype(
+            'Task',
+            {'id': '', 'date': datatypes.Datatype('Date', {'year': ''})}
+        ).template()
+        for i in range(3):
+            fields = {'id': str(i), 'date': {'year': '201' + str(i)}}
+            self.assertEqual(
+                template.render(fields),
+                datatypes.Datatype(
+                    'Task',
+                    {'id': str(i), 'date': datatypes.Datatype('Date', {'year': '201' + str(i)})}
+                ).tostring()
+            )
+
+    def test_render_filter(self):
+        cust_filter = datatypes.Datatype('Filter', {'id': '1', 'email': 'a@b.c'})
+        self.assertEqual(
+            cust_filter.template().render(cust_filter),
+            b'<Filter type="customer"><id>1</id><email>a@b.c</email></Filter>'
+        )
+
+    def test_render_empty(self):
+        date = datatypes.Datatype('Date', {})
+        self.assertEqual(date.template().render(date), b'<Date />')
+
+    def test_render_explicit_shape(self):
+        template = datatypes.Template(
+            'Task',
+            ['name', ('date', datatypes.Template('Date', ['year']))]
+        )
+        self.assertEqual(
+            template.render({'name': 'a', 'date': {'year': '2018'}}),
+            b'<Task><name>a</name><date><Date><year>2018</year></Date></date></Task>'
+        )
+
+    def test_render_missing_field(self):
+        template = datatypes.Template('Task', ['id', 'name'])
+        with self.assertRaises(Exception):
+            template.render({'id': '1'})
+
+    def test_render_not_text(self):
+        template = datatypes.Template('Task', ['id'])
+        with self.assertRaises(TypeError):
+            template.render({'id': 1})
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestTemplateClass)
+unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,141 @@
+# -*- coding: utf-8
+from __future__ import absolute_import
+import os
+import shutil
+import tempfile
+import unittest
+from oaxmlapi import batch, connections, errors, transport
+from mockserver import MockServer
+
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+
+def answer_error(body):
+    """
+    Answer an Error read with a message made from its code.
+
+    """
+    code = ET.fromstring(body).find('.//code').text
+    return (
+        b'<response><Read status="0"><Error><code>' + code.encode('utf-8') +
+        b'</code><text>Message ' + code.encode('utf-8') +
+        b'</text></Error></Read></response>'
+    )
+
+
+class TestErrorCatalogClass(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'errors.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_str(self):
+        self.assertEqual(
+            str(errors.ErrorCatalog()),
+            '<ErrorCatalog codes=0>'
+        )
+
+    def test_fetch_once(self):
+        calls = []
+
+        def fetch(code):
+            calls.append(code)
+            return 'Message ' + code if code == '1234' else None
+
+        catalog = errors.ErrorCatalog()
+        for i in range(3):
+            self.assertEqual(catalog.lookup('1234', fetch), 'Message 1234')
+            self.assertIsNone(catalog.lookup('4321', fetch))
+        self.assertEqual(calls, ['1234', '4321'])
+
+    def test_failed_fetch_is_retried(self):
+        calls = []
+
+        def fetch(code):
+            calls.append(code)
+            if len(calls) == 1:
+                raise IOError('unavailable')
+            return 'Message ' + code
+
+        catalog = errors.ErrorCatalog()
+        self.assertIsNone(catalog.lookup('1234', fetch))
+        self.assertEqual(catalog.lookup('1234', fetch), 'Message 1234')
+        self.assertEqual(calls, ['1234', '1234'])
+
+    def test_fetch_without_lock(self):
+        catalog = errors.ErrorCatalog()
+        inner = []
+
+        def fetch(code):
+            # another code can be looked up while this one is fetched
+            inner.append(catalog.lookup('42', lambda c: 'Message ' + c))
+            return 'Message ' + code
+
+        self.assertEqual(catalog.lookup('1234', fetch), 'Message 1234')
+        self.assertEqual(inner, ['Message 42'])
+
+    def test_persist(self):
+        catalog = errors.ErrorCatalog(path=self.path)
+        catalog.lookup('1234', lambda code: 'Message ' + code)
+        self.assertTrue(os.path.exists(self.path))
+        reloaded = errors.ErrorCatalog(path=self.path)
+        self.assertEqual(reloaded.lookup('1234'), 'Message 1234')
+
+    def test_persist_non_ascii(self):
+        catalog = errors.ErrorCatalog(path=self.path)
+        catalog.lookup('1234', lambda code: u'Ung\xfcltiger Wert')
+        reloaded = errors.ErrorCatalog(path=self.path)
+        self.assertEqual(reloaded.lookup('1234'), u'Ung\xfcltiger Wert')
+
+    def test_default(self):
+        self.assertIs(errors.default(), errors.default())
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestErrorCatalogClass)
+unittest.TextTestRunner(verbosity=2).run(suite)
+
+
+class TestClientDescribe(unittest.TestCase):
+
+    def setUp(self):
+        self.app = connections.Application('test', '1.0', 'default', 'abc123')
+        self.auth = connections.Auth('company', 'username', 'p@ssw0rd')
+
+    def test_describe(self):
+        catalog = errors.ErrorCatalog()
+        with MockServer(respond=answer_error) as server:
+            with transport.Client(server.url, application=self.app,
+                                  errors=catalog) as client:
+                self.assertEqual(client.describe('1234'), 'Message 1234')
+                self.assertEqual(client.describe(1234), 'Message 1234')
+        self.assertEqual(len(server.requests), 1)
+
+    def test_describe_unavailable(self):
+        catalog = errors.ErrorCatalog()
+        answers = [(503, b'unavailable')]
+
+        def respond(body):
+            return answers.pop() if answers else answer_error(body)
+
+        with MockServer(respond=respond) as server:
+            with transport.Client(server.url, application=self.app,
+                                  errors=catalog) as client:
+                self.assertIsNone(client.describe('1234'))
+                self.assertEqual(client.describe('1234'), 'Message 1234')
+        self.assertEqual(len(server.requests), 2)
+
+    def test_batch_message(self):
+        catalog = errors.ErrorCatalog()
+        catalog.lookup('401', lambda code: 'Auth failed')
+        response = ET.fromstring(b'<response><Auth status="401"/></response>')
+        with self.assertRaises(Exception) as raised:
+            batch.results(response, catalog.lookup)
+        self.assertIn('Auth failed', str(raised.exception))
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestClientDescribe)
+unittest.TextTestRunner(verbosity=2).run(suite)
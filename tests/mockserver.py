@@ -0,0 +1,150 @@
+# -*- coding: utf-8
+"""A loopback stand-in for the OpenAir XML API used by the transport
+tests. By default every command in the request is answered with an
+empty element carrying status="0".
+"""
+from __future__ import absolute_import
+import threading
+import time
+import zlib
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+
+def echo_status(body):
+    """
+    Answer each command in the request with <Command status="0"/>.
+
+    """
+    request = ET.fromstring(body)
+    response = ET.Element('response')
+    for elem in request:
+        ET.SubElement(response, elem.tag).attrib = {'status': '0'}
+    return ET.tostring(response, 'utf-8')
+
+
+def compress(data, encoding):
+    """
+    Returns data compressed with gzip, deflate or raw-deflate.
+
+    """
+    wbits = {'gzip': 16 + zlib.MAX_WBITS, 'deflate': zlib.MAX_WBITS,
+        'raw-deflate': -zlib.MAX_WBITS}[encoding]
+    encoder = zlib.compressobj(6, zlib.DEFLATED, wbits)
+    return encoder.compress(data) + encoder.flush()
+
+
+class _Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        with self.server.mock.lock:
+            self.server.mock.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def _read_chunked(self):
+        data = []
+        while True:
+            size = int(self.rfile.readline().split(b';')[0], 16)
+            if size == 0:
+                self.rfile.readline()
+                return b''.join(data)
+            data.append(self.rfile.read(size))
+            self.rfile.readline()
+
+    def do_POST(self):
+        mock = self.server.mock
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            body = self._read_chunked()
+        else:
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.headers.get('Content-Encoding') == 'gzip':
+            body = zlib.decompress(body, 16 + zlib.MAX_WBITS)
+        with mock.lock:
+            mock.requests.append(body)
+            # Python 2 lowercases the names
+            mock.headers.append(dict((k.title(), v) for k, v in self.headers.items()))
+        if mock.delay:
+            time.sleep(mock.delay)
+        status, data = 200, mock.respond(body)
+        if data is None:
+            # hang up without an answer, after the request was read
+            self.close_connection = True
+            return
+        if isinstance(data, tuple):
+            status, data = data
+        encoding = mock.encoding
+        accepted = self.headers.get('Accept-Encoding', '')
+        if encoding and encoding.replace('raw-', '') in accepted:
+            data = compress(data, encoding)
+        else:
+            encoding = None
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/xml')
+        if encoding:
+            self.send_header('Content-Encoding', encoding.replace('raw-', ''))
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class MockServer(object):
+    """
+    A threaded HTTP/1.1 server on 127.0.0.1 with keep-alive support.
+
+    Arguments:
+        respond (func): maps the request body to response bytes or
+                        a (status, bytes) tuple, or None to close the
+                        connection without answering
+        delay (float): seconds to wait before answering each request
+        encoding (str): compress responses with gzip, deflate or
+                        raw-deflate (a deflate body without the zlib
+                        header) when the client accepts it (optional)
+
+    """
+    def __init__(self, respond=echo_status, delay=0, encoding=None):
+        self.respond = respond
+        self.delay = delay
+        self.encoding = encoding
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = []
+        self.headers = []
+        self._server = _Server(('127.0.0.1', 0), _Handler)
+        self._server.mock = self
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.01, ))
+        self._thread.daemon = True
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:{port}/api.pl'.format(
+            port=self._server.server_address[1])
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
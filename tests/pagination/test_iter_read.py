@@ -0,0 +1,256 @@
+# -*- coding: utf-8
+from __future__ import absolute_import
+import threading
+import unittest
+from oaxmlapi import commands, connections, errors, pagination, transport
+from oaxmlapi.utilities import StatusError
+from mockserver import MockServer
+
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+
+def table(total):
+    """
+    Answer Read commands from a table of total Task rows.
+
+    """
+    def respond(body):
+        read = ET.fromstring(body).find('Read')
+        offset, size = [int(x) for x in read.get('limit').split(',')]
+        response = ET.Element('response')
+        ET.SubElement(response, 'Auth').attrib = {'status': '0'}
+        result = ET.SubElement(response, 'Read')
+        result.attrib = {'status': '0'}
+        for i in range(offset, min(offset + size, total)):
+            task = ET.SubElement(result, 'Task')
+            ET.SubElement(task, 'id').text = str(i)
+        return ET.tostring(response, 'utf-8')
+    return respond
+
+
+def failing(body):
+    """
+    Answer Error reads with a message, and every other Read with
+    status 999.
+
+    """
+    read = ET.fromstring(body).find('Read')
+    if read.get('type') == 'Error':
+        return (b'<response><Read status="0"><Error><code>999</code>'
+            b'<text>Try again later</text></Error></Read></response>')
+    return b'<response><Auth status="0"/><Read status="999"/></response>'
+
+
+def client(url, **kwargs):
+    return transport.Client(
+        url,
+        application=connections.Application('test', '1.0', 'default', 'abc123'),
+        auth=connections.Auth('company', 'username', 'p@ssw0rd'),
+        **kwargs
+    )
+
+
+def read_tasks(attribs=None):
+    return commands.Read('Task', 'all', attribs or {}, None, None, ['id'])
+
+
+class TestPageFunction(unittest.TestCase):
+
+    def test_page(self):
+        read = read_tasks({'limit': '1000', 'deleted': '1'})
+        window = pagination.page(read, 2000, 500)
+        self.assertEqual(window.attribs, {'limit': '2000,500', 'deleted': '1'})
+        self.assertEqual(read.attribs, {'limit': '1000', 'deleted': '1'})
+
+    def test_start(self):
+        self.assertEqual(pagination.start(read_tasks({'limit': '300,100'})), 300)
+        self.assertEqual(pagination.start(read_tasks({'limit': '100'})), 0)
+        self.assertEqual(pagination.start(read_tasks()), 0)
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestPageFunction)
+unittest.TextTestRunner(verbosity=2).run(suite)
+
+
+class TestIterReadFunction(unittest.TestCase):
+
+    def test_iter_read(self):
+        with MockServer(respond=table(25)) as server:
+            with client(server.url) as c:
+                ids = [t.find('id').text for t in pagination.iter_read(c, read_tasks(), page_size=10)]
+        self.assertEqual(ids, [str(i) for i in range(25)])
+        self.assertEqual(len(server.requests), 3)
+
+    def test_exact_multiple(self):
+        with MockServer(respond=table(20)) as server:
+            with client(server.url) as c:
+                records = list(pagination.iter_read(c, read_tasks(), page_size=10))
+        self.assertEqual(len(records), 20)
+        self.assertEqual(len(server.requests), 3)
+
+    @unittest.skipIf(pagination.ThreadPoolExecutor is None, 'needs concurrent.futures')
+    def test_prefetch(self):
+        with MockServer(respond=table(25)) as server:
+            with client(server.url) as c:
+                ids = [t.find('id').text for t in pagination.iter_read(
+                    c, read_tasks(), page_size=10, prefetch=True)]
+        self.assertEqual(ids, [str(i) for i in range(25)])
+        self.assertEqual(len(server.requests), 3)
+
+    def test_offset(self):
+        with MockServer(respond=table(25)) as server:
+            with client(server.url) as c:
+                ids = [t.find('id').text for t in pagination.iter_read(
+                    c, read_tasks({'limit': '20,5'}), page_size=10)]
+        self.assertEqual(ids, [str(i) for i in range(20, 25)])
+
+    def test_send_while_reading(self):
+        # a single pooled connection must be free again inside the loop
+        found = []
+
+        def run(c):
+            for task in pagination.iter_read(c, read_tasks(), page_size=10):
+                found.append(c.send(c.envelope([read_tasks({'limit': '0,1'}).read()])))
+
+        with MockServer(respond=table(15)) as server:
+            with client(server.url, pool_size=1) as c:
+                thread = threading.Thread(target=run, args=(c, ))
+                thread.daemon = True
+                thread.start()
+                thread.join(10)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(found), 15)
+
+    def test_status_error(self):
+        respond = lambda body: b'<response><Auth status="0"/><Read status="602"/></response>'
+        with MockServer(respond=respond) as server:
+            with client(server.url) as c:
+                with self.assertRaises(Exception):
+                    list(pagination.iter_read(c, read_tasks()))
+
+    def test_no_auth(self):
+        with self.assertRaises(Exception):
+            list(pagination.iter_read(transport.Client('http://127.0.0.1/'), read_tasks()))
+
+    def test_invalid_page_size(self):
+        with self.assertRaises(Exception):
+            list(pagination.iter_read(None, read_tasks(), page_size=0))
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestIterReadFunction)
+unittest.TextTestRunner(verbosity=2).run(suite)
+
+
+@unittest.skipIf(pagination.ThreadPoolExecutor is None, 'needs concurrent.futures')
+class TestIterReadParallelFunction(unittest.TestCase):
+
+    def test_ordered(self):
+        with MockServer(respond=table(95)) as server:
+            with client(server.url) as c:
+                ids = [t.find('id').text for t in pagination.iter_read_parallel(
+                    c, read_tasks(), page_size=10, workers=4)]
+        self.assertEqual(ids, [str(i) for i in range(95)])
+        self.assertLessEqual(len(server.requests), 10 + 3)
+
+    def test_unordered(self):
+        with MockServer(respond=table(95)) as server:
+            with client(server.url) as c:
+                ids = [t.find('id').text for t in pagination.iter_read_parallel(
+                    c, read_tasks(), page_size=10, workers=4, ordered=False)]
+        self.assertEqual(sorted(ids, key=int), [str(i) for i in range(95)])
+
+    def test_exact_total(self):
+        with MockServer(respond=table(95)) as server:
+            with client(server.url) as c:
+                records = list(pagination.iter_read_parallel(
+                    c, read_tasks(), page_size=10, workers=4, total=95))
+        self.assertEqual(len(records), 95)
+        self.assertEqual(len(server.requests), 10)
+
+    def test_exact_total_multiple(self):
+        # a full last page cannot tell an exact total from an
+        # underestimate, so one window past it is read
+        with MockServer(respond=table(20)) as server:
+            with client(server.url) as c:
+                records = list(pagination.iter_read_parallel(
+                    c, read_tasks(), page_size=10, workers=4, total=20))
+        self.assertEqual(len(records), 20)
+        self.assertEqual(len(server.requests), 3)
+
+    def test_underestimated_total(self):
+        with MockServer(respond=table(95)) as server:
+            with client(server.url) as c:
+                records = list(pagination.iter_read_parallel(
+                    c, read_tasks(), page_size=10, workers=4, total=50))
+        self.assertEqual(len(records), 95)
+
+    def test_overestimated_total(self):
+        with MockServer(respond=table(35)) as server:
+            with client(server.url) as c:
+                ids = [t.find('id').text for t in pagination.iter_read_parallel(
+                    c, read_tasks(), page_size=10, workers=2, total=200)]
+        self.assertEqual(ids, [str(i) for i in range(35)])
+        self.assertLessEqual(len(server.requests), 5)
+
+    def test_status_error_described(self):
+        # every pool slot is busy with a failing page while the code is
+        # looked up, so the lookup must wait for the pages to close
+        raised = []
+
+        def run(c):
+            try:
+                list(pagination.iter_read_parallel(
+                    c, read_tasks(), page_size=10, workers=4))
+            except StatusError as e:
+                raised.append(e)
+
+        with MockServer(respond=failing) as server:
+            with client(server.url, pool_size=4,
+                    errors=errors.ErrorCatalog()) as c:
+                thread = threading.Thread(target=run, args=(c, ))
+                thread.daemon = True
+                thread.start()
+                thread.join(10)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(raised[0].status, '999')
+        self.assertIn('Try again later', str(raised[0]))
+
+    def test_without_futures(self):
+        executor = pagination.ThreadPoolExecutor
+        pagination.ThreadPoolExecutor = None
+        try:
+            with self.assertRaises(Exception):
+                list(pagination.iter_read_parallel(None, read_tasks()))
+            with self.assertRaises(Exception):
+                list(pagination.iter_read(None, read_tasks(), prefetch=True))
+        finally:
+            pagination.ThreadPoolExecutor = executor
+
+    def test_invalid_workers(self):
+        with self.assertRaises(Exception):
+            list(pagination.iter_read_parallel(None, read_tasks(), workers=0))
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestIterReadParallelFunction)
+unittest.TextTestRunner(verbosity=2).run(suite)
+
+
+class TestReadColumnsFunction(unittest.TestCase):
+
+    def test_read_columns(self):
+        with MockServer(respond=table(25)) as server:
+            with client(server.url) as c:
+                columns = pagination.read_columns(
+                    c, read_tasks(), ['id'], {'id': 'int'}, page_size=10)
+        self.assertEqual(list(columns.column('id')), list(range(25)))
+
+    @unittest.skipIf(pagination.ThreadPoolExecutor is None, 'needs concurrent.futures')
+    def test_read_columns_parallel(self):
+        with MockServer(respond=table(25)) as server:
+            with client(server.url) as c:
+                columns = pagination.read_columns(
+                    c, read_tasks(), ['id'], {'id': 'int'}, page_size=10, workers=3)
+        self.assertEqual(list(columns.column('id')), list(range(25)))
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestReadColumnsFunction)
+unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,103 @@
+# -*- coding: utf-8
+from __future__ import absolute_import
+import datetime
+import unittest
+from oaxmlapi import records
+
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+
+TIMESHEET = (
+    b'<Timesheet><id>12</id><userid>7</userid><notes/>'
+    b'<starts><Date><year>2018</year><month>05</month><day>14</day>'
+    b'<hour/><minute/><second/></Date></starts>'
+    b'<updated><Date><year>2018</year><month>05</month><day>16</day>'
+    b'<hour>09</hour><minute>30</minute><second>05</second></Date></updated>'
+    b'<approved><Date><year/><month/><day/></Date></approved>'
+    b'<flags><Flag><name>a</name><setting>1</setting></Flag>'
+    b'<Flag><name>b</name><setting>0</setting></Flag></flags>'
+    b'</Timesheet>'
+)
+
+
+class TestRecordClass(unittest.TestCase):
+
+    def test_fields(self):
+        ts = records.torecord(ET.fromstring(TIMESHEET))
+        self.assertEqual(ts._type, 'Timesheet')
+        self.assertEqual(ts.id, '12')
+        self.assertEqual(ts.userid, '7')
+        self.assertIsNone(ts.notes)
+
+    def test_slots(self):
+        ts = records.torecord(ET.fromstring(TIMESHEET))
+        self.assertFalse(hasattr(ts, '__dict__'))
+        with self.assertRaises(AttributeError):
+            ts.other = '1'
+
+    def test_class_cache(self):
+        a = records.torecord(ET.fromstring(TIMESHEET))
+        b = records.torecord(ET.fromstring(TIMESHEET))
+        self.assertIs(type(a), type(b))
+        self.assertEqual(type(a).__name__, 'Timesheet')
+
+    def test_class_cache_bounded(self):
+        for i in range(records._CLASSES_MAX + 10):
+            records.record_class('Task', ('f{0}'.format(i), ))
+        self.assertEqual(len(records._CLASSES), records._CLASSES_MAX)
+
+    def test_reserved_fields(self):
+        rec = records.torecord(ET.fromstring(
+            b'<Task><id>1</id><get>a</get><asdict>b</asdict><_raw>c</_raw></Task>'))
+        self.assertEqual(rec.get('get'), 'a')
+        self.assertEqual(rec.get('_raw'), 'c')
+        self.assertEqual(rec.asdict(), {'id': '1', 'get': 'a', 'asdict': 'b', '_raw': 'c'})
+        self.assertEqual(rec._raw, ('1', 'a', 'b', 'c'))
+        self.assertEqual(rec.id, '1')
+
+    def test_lazy(self):
+        ts = records.torecord(ET.fromstring(TIMESHEET))
+        self.assertIsNone(ts._values)
+        ts.starts
+        self.assertIs(ts._values[0], records._PENDING)
+        self.assertEqual(ts._values[3], datetime.date(2018, 5, 14))
+
+    def test_dates(self):
+        ts = records.torecord(ET.fromstring(TIMESHEET))
+        self.assertEqual(ts.starts, datetime.date(2018, 5, 14))
+        self.assertEqual(ts.updated, datetime.datetime(2018, 5, 16, 9, 30, 5))
+        self.assertIsNone(ts.approved)
+
+    def test_nested(self):
+        ts = records.torecord(ET.fromstring(TIMESHEET))
+        self.assertEqual([f.name for f in ts.flags], ['a', 'b'])
+        self.assertEqual(ts.flags[1].setting, '0')
+
+    def test_repeated(self):
+        rec = records.torecord(ET.fromstring(b'<Task><id>1</id><id>2</id></Task>'))
+        self.assertEqual(rec.id, ['1', '2'])
+
+    def test_get(self):
+        ts = records.torecord(ET.fromstring(TIMESHEET))
+        self.assertEqual(ts.get('id'), '12')
+        self.assertEqual(ts.get('missing', 'x'), 'x')
+
+    def test_asdict_eq(self):
+        a = records.torecord(ET.fromstring(b'<Task><id>1</id><name>A</name></Task>'))
+        b = records.torecord(ET.fromstring(b'<Task><id>1</id><name>A</name></Task>'))
+        self.assertEqual(a.asdict(), {'id': '1', 'name': 'A'})
+        self.assertEqual(a, b)
+
+    def test_repr(self):
+        rec = records.torecord(ET.fromstring(b'<Task><id>1</id><name>A</name></Task>'))
+        self.assertEqual(repr(rec), "<Task id='1' name='A'>")
+
+    def test_iterrecords(self):
+        xml_res = b'<response><Auth status="0"/><Read status="0">' + TIMESHEET * 3 + b'</Read></response>'
+        self.assertEqual([r.id for r in records.iterrecords(xml_res)], ['12'] * 3)
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestRecordClass)
+unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,197 @@
+# -*- coding: utf-8
+from __future__ import absolute_import
+import unittest
+from oaxmlapi import batch, commands, connections, datatypes, retry, transport
+from oaxmlapi.transport import TransportError
+from mockserver import MockServer
+
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+
+def flaky(failures=(), busy=(), status=503):
+    """
+    Returns a responder which answers request n with HTTP status when
+    n is in failures, and every other time answers each command with
+    status 0, or with status 555 for the tags in busy on the first pass.
+
+    """
+    count = []
+
+    def respond(body):
+        count.append(1)
+        if len(count) in failures:
+            return status, b'unavailable'
+        request = ET.fromstring(body)
+        response = ET.Element('response')
+        ET.SubElement(response, 'Auth', {'status': '0'})
+        for elem in request:
+            if elem.tag == 'Auth':
+                continue
+            code = '555' if elem.tag in busy and len(count) == 1 else '0'
+            ET.SubElement(response, elem.tag, {'status': code})
+        return ET.tostring(response, 'utf-8')
+    return respond
+
+
+def sent(server):
+    """
+    Returns the command tags of every request the server received.
+
+    """
+    return [
+        [e.tag for e in ET.fromstring(body) if e.tag != 'Auth']
+        for body in server.requests
+    ]
+
+
+class TestRetryClass(unittest.TestCase):
+
+    def setUp(self):
+        self.app = connections.Application('test', '1.0', 'default', 'abc123')
+        self.auth = connections.Auth('company', 'username', 'p@ssw0rd')
+        self.retry = retry.Retry(base=0.001, codes=['555'])
+
+    def add(self):
+        return commands.Add('Project', {},
+            datatypes.Datatype('Project', {'name': 'x'})).add()
+
+    def request(self, *elements):
+        return connections.Request(self.app, self.auth, list(elements))
+
+    def test_str(self):
+        self.assertEqual(str(retry.Retry()), '<Retry attempts=3>')
+
+    def test_invalid_attempts(self):
+        with self.assertRaises(Exception):
+            retry.Retry(attempts=0)
+
+    def test_delay(self):
+        r = retry.Retry(base=1, cap=3)
+        for attempt in range(1, 6):
+            self.assertTrue(0 <= r.delay(attempt) <= min(3, 2 ** (attempt - 1)))
+
+    def test_no_failure(self):
+        with MockServer(respond=flaky()) as server:
+            with transport.Client(server.url) as client:
+                found = self.retry.send(client, self.request(
+                    commands.Time().time(), self.add()))
+        self.assertEqual([r.tag for r in found], ['Time', 'Add'])
+        self.assertEqual(len(server.requests), 1)
+
+    def test_retries_failed_commands_only(self):
+        read = commands.Read('Project', 'all', {'limit': '1'}).read()
+        with MockServer(respond=flaky(busy=('Read', 'Add'))) as server:
+            with transport.Client(server.url) as client:
+                found = self.retry.send(client, self.request(
+                    commands.Time().time(), read, self.add()))
+        self.assertEqual(sent(server), [['Time', 'Read', 'Add'], ['Read', 'Add']])
+        self.assertEqual([r.get('status') for r in found], ['0', '0', '0'])
+
+    def test_transport_failure_replays_reads(self):
+        read = commands.Read('Project', 'all', {'limit': '1'}).read()
+        with MockServer(respond=flaky(failures=(1, ))) as server:
+            with transport.Client(server.url) as client:
+                found = self.retry.send(client, self.request(
+                    read, commands.Time().time()))
+        self.assertEqual(sent(server), [['Read', 'Time'], ['Read', 'Time']])
+        self.assertEqual([r.tag for r in found], ['Read', 'Time'])
+
+    def test_transport_failure_never_replays_adds(self):
+        read = commands.Read('Project', 'all', {'limit': '1'}).read()
+        with MockServer(respond=flaky(failures=(1, ))) as server:
+            with transport.Client(server.url) as client:
+                with self.assertRaises(retry.RetryError) as caught:
+                    self.retry.send(client, self.request(self.add(), read))
+        self.assertEqual(sent(server), [['Add', 'Read'], ['Read']])
+        self.assertIsNone(caught.exception.results[0])
+        self.assertEqual(caught.exception.results[1].tag, 'Read')
+        self.assertIsInstance(caught.exception.error, TransportError)
+
+    def test_transport_failure_drops_stale_results(self):
+        busy = flaky(busy=('Add', ))
+        calls = []
+
+        def respond(body):
+            calls.append(body)
+            if len(calls) == 2:
+                # hang up, so the Add may or may not have run
+                return None
+            return busy(body)
+
+        with MockServer(respond=respond) as server:
+            with transport.Client(server.url) as client:
+                with self.assertRaises(retry.RetryError) as caught:
+                    self.retry.send(client, self.request(self.add()))
+        self.assertEqual(sent(server), [['Add'], ['Add']])
+        self.assertEqual(caught.exception.results, [None])
+
+    def test_too_many_requests_replays_adds(self):
+        read = commands.Read('Project', 'all', {'limit': '1'}).read()
+        with MockServer(respond=flaky(failures=(1, ), status=429)) as server:
+            with transport.Client(server.url) as client:
+                found = self.retry.send(client, self.request(self.add(), read))
+        self.assertEqual(sent(server), [['Add', 'Read'], ['Add', 'Read']])
+        self.assertEqual([r.tag for r in found], ['Add', 'Read'])
+
+    def test_attempts_run_out(self):
+        with MockServer(respond=flaky(failures=(1, 2, 3))) as server:
+            with transport.Client(server.url) as client:
+                with self.assertRaises(retry.RetryError):
+                    self.retry.send(client, self.request(commands.Time().time()))
+        self.assertEqual(len(server.requests), 3)
+
+    def test_permanent_failure(self):
+        with MockServer(respond=lambda body: (400, b'bad request')) as server:
+            with transport.Client(server.url) as client:
+                with self.assertRaises(TransportError):
+                    self.retry.send(client, self.request(commands.Time().time()))
+        self.assertEqual(len(server.requests), 1)
+
+    def test_permanent_failure_keeps_results(self):
+        busy = flaky(busy=('Read', ))
+        calls = []
+
+        def respond(body):
+            calls.append(body)
+            if len(calls) == 2:
+                return 400, b'bad request'
+            return busy(body)
+
+        read = commands.Read('Project', 'all', {'limit': '1'}).read()
+        with MockServer(respond=respond) as server:
+            with transport.Client(server.url) as client:
+                with self.assertRaises(retry.RetryError) as caught:
+                    self.retry.send(client, self.request(self.add(), read))
+        self.assertEqual(sent(server), [['Add', 'Read'], ['Read']])
+        self.assertEqual(caught.exception.results[0].get('status'), '0')
+        self.assertIsNone(caught.exception.results[1])
+        self.assertEqual(caught.exception.error.status, 400)
+
+    def test_batch(self):
+        reads = [
+            commands.Read('Project', 'all', {'limit': str(i)}) for i in range(4)
+        ]
+        with MockServer(respond=flaky(failures=(1, ))) as server:
+            with transport.Client(server.url) as client:
+                found = batch.Batch(self.app, self.auth, reads,
+                    max_commands=2).send(client, retry=self.retry)
+        self.assertEqual(len(found), 4)
+        self.assertEqual(sent(server), [['Read'] * 2] * 3)
+
+    def test_batch_keeps_results_of_other_requests(self):
+        adds = [self.add() for i in range(4)]
+        with MockServer(respond=flaky(failures=(3, ), status=500)) as server:
+            with transport.Client(server.url) as client:
+                with self.assertRaises(retry.RetryError) as caught:
+                    batch.Batch(self.app, self.auth, adds,
+                        max_commands=1).send(client, retry=self.retry)
+        self.assertEqual(sent(server), [['Add']] * 4)
+        found = caught.exception.results
+        self.assertEqual([r is None for r in found], [False, False, True, False])
+        self.assertEqual(caught.exception.error.status, 500)
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestRetryClass)
+unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,164 @@
+# -*- coding: utf-8
+from __future__ import absolute_import
+import datetime
+import unittest
+import warnings
+from oaxmlapi import datatypes, schema
+
+
+class TestSchemaClass(unittest.TestCase):
+
+    def setUp(self):
+        self.schema = schema.Schema({
+            'Project': {'id': 'int', 'name': 'str', 'budget': 'float',
+                        'active': 'bool', 'start_date': 'date'},
+            'Date': {'year': 'int', 'month': 'int', 'day': 'int'},
+            'User': {'id': 'int', 'addr': 'Address'},
+            'Filter': {'*': 'str'},
+        })
+
+    def test_str(self):
+        self.assertEqual(
+            str(self.schema),
+            '<Schema datatypes=4>'
+        )
+
+    def test_default(self):
+        self.assertIs(schema.default(), schema.default())
+        self.assertEqual(schema.default().check_datatype('Timesheet'), 'Timesheet')
+
+    def test_check_datatype(self):
+        self.assertEqual(self.schema.check_datatype('Project'), 'Project')
+        with self.assertRaises(Exception):
+            self.schema.check_datatype('Projct')
+
+    def test_check_field(self):
+        self.assertEqual(self.schema.check_field('Project', 'name'), 'name')
+        with self.assertRaises(Exception):
+            self.schema.check_field('Project', 'nme')
+
+    def test_partial(self):
+        partial = schema.Schema({'Project': {'id': 'int'}, 'Date': {'year': 'int'}},
+            complete=['Date'])
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.assertEqual(partial.check_datatype('Widget'), 'Widget')
+            self.assertEqual(partial.check_field('Project', 'budget'), 'budget')
+            self.assertEqual(partial.check_field('Widget', 'size'), 'size')
+        self.assertEqual(
+            [w.category for w in caught],
+            [schema.SchemaWarning] * 3
+        )
+        with self.assertRaises(Exception):
+            partial.check_field('Date', 'yaer')
+
+    def test_default_partial(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            schema.default().check_field('Project', 'not_listed')
+        self.assertEqual(len(caught), 1)
+        with self.assertRaises(Exception):
+            schema.default().check_field('Date', 'yaer')
+
+    def test_check_field_custom(self):
+        self.assertEqual(
+            self.schema.check_field('Project', 'region__c'),
+            'region__c'
+        )
+
+    def test_check_field_address(self):
+        self.assertEqual(self.schema.check_field('User', 'email'), 'email')
+        with self.assertRaises(Exception):
+            self.schema.check_field('Project', 'email')
+
+    def test_check_field_any(self):
+        self.assertEqual(self.schema.check_field('Filter', 'anything'), 'anything')
+
+    def test_check_return(self):
+        self.assertEqual(
+            self.schema.check_return('Project', ['id', 'name']),
+            ['id', 'name']
+        )
+        with self.assertRaises(Exception):
+            self.schema.check_return('Project', ['id', 'nmae'])
+
+    def test_kind(self):
+        self.assertEqual(self.schema.kind('Project', 'budget'), 'float')
+        self.assertEqual(self.schema.kind('Project', 'region__c'), 'str')
+        self.assertEqual(self.schema.kind('User', 'addr'), 'str')
+
+    def test_coerce_numbers(self):
+        self.assertEqual(self.schema.coerce('Project', 'id', 12), '12')
+        self.assertEqual(self.schema.coerce('Project', 'id', ' 12'), '12')
+        self.assertEqual(self.schema.coerce('Project', 'budget', 99.5), '99.5')
+        self.assertEqual(self.schema.coerce('Project', 'name', 7), '7')
+        self.assertIsNone(self.schema.coerce('Project', 'id', None))
+
+    def test_coerce_float_fixed_point(self):
+        self.assertEqual(self.schema.coerce('Project', 'budget', 1e-05), '0.00001')
+        self.assertEqual(self.schema.coerce('Project', 'budget', '2E-3'), '0.002')
+        self.assertEqual(
+            self.schema.coerce('Project', 'budget', 1.5e20),
+            '150000000000000000000'
+        )
+        with self.assertRaises(Exception):
+            self.schema.coerce('Project', 'budget', float('inf'))
+
+    def test_coerce_unknown_field(self):
+        partial = schema.Schema({'Project': {'id': 'int'}}, complete=[])
+        value = object()
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.assertIs(partial.coerce('Project', 'budget', value), value)
+        self.assertEqual(len(caught), 1)
+        with self.assertRaises(Exception):
+            self.schema.coerce('Project', 'budget_total', 1)
+
+    def test_coerce_bool(self):
+        self.assertEqual(self.schema.coerce('Project', 'active', True), '1')
+        self.assertEqual(self.schema.coerce('Project', 'active', 'false'), '0')
+
+    def test_coerce_date(self):
+        date = self.schema.coerce('Project', 'start_date', datetime.date(2018, 5, 4))
+        # canonical() sorts the fields, which plain dicts on Python 2 do not keep in order
+        self.assertEqual(
+            date.canonical(),
+            datatypes.Datatype('Date', {'year': '2018', 'month': '05', 'day': '04'}).canonical()
+        )
+        date = self.schema.coerce('Project', 'start_date', '2018-05-04 09:30:00')
+        self.assertEqual(date.fields['hour'], '09')
+        self.assertEqual(date.fields['minute'], '30')
+
+    def test_coerce_invalid(self):
+        for value in ('twelve', 1.5, True):
+            with self.assertRaises(Exception):
+                self.schema.coerce('Project', 'id', value)
+        with self.assertRaises(Exception):
+            self.schema.coerce('Project', 'active', 'maybe')
+        with self.assertRaises(Exception):
+            self.schema.coerce('Project', 'start_date', '05/04/2018')
+
+    def test_register(self):
+        self.schema.register('Project', {'priority': 'int'})
+        self.schema.register('Widget', {'id': 'int'})
+        self.assertEqual(self.schema.kind('Project', 'priority'), 'int')
+        self.assertEqual(self.schema.check_datatype('Widget'), 'Widget')
+        with self.assertRaises(Exception):
+            self.schema.register('Widget', {'size': 'long'})
+
+    def test_datatype_coerce(self):
+        project = datatypes.Datatype(
+            'Project',
+            {'id': 12, 'active': False, 'start_date': datetime.date(2018, 5, 4)}
+        ).coerce(self.schema)
+        date = datatypes.Datatype('Date', {'year': '2018', 'month': '05', 'day': '04'})
+        self.assertEqual(
+            project.canonical(),
+            datatypes.Datatype(
+                'Project',
+                {'id': '12', 'active': '0', 'start_date': date}
+            ).canonical()
+        )
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestSchemaClass)
+unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,175 @@
+# -*- coding: utf-8
+from __future__ import absolute_import
+import unittest
+from oaxmlapi import batch, cache, commands, connections, session, transport
+from mockserver import MockServer
+
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+
+def issuer(tokens=('t1', 't2', 't3')):
+    """
+    Returns a responder which issues a session token on each full
+    login, and accepts only the latest token afterwards.
+
+    """
+    issued = list(tokens)
+    current = []
+
+    def respond(body):
+        request = ET.fromstring(body)
+        response = ET.Element('response')
+        auth = request.find('Auth')
+        result = ET.SubElement(response, 'Auth')
+        if auth.find('Login') is not None:
+            current[:] = [issued.pop(0)]
+            result.set('status', '0')
+            ET.SubElement(result, 'session').text = current[0]
+        elif current and auth.findtext('Session/id') == current[0]:
+            result.set('status', '0')
+        else:
+            result.set('status', '2')
+            return ET.tostring(response, 'utf-8')
+        for elem in request:
+            if elem.tag != 'Auth':
+                ET.SubElement(response, elem.tag, {'status': '0'})
+        return ET.tostring(response, 'utf-8')
+    return respond
+
+
+def logins(server):
+    """
+    Returns, per request the server received, the token it carried or
+    'login' for a full login.
+
+    """
+    kinds = []
+    for body in server.requests:
+        auth = ET.fromstring(body).find('Auth')
+        token = auth.findtext('Session/id')
+        kinds.append(token if token is not None else 'login')
+    return kinds
+
+
+class TestSessionAuthClass(unittest.TestCase):
+
+    def test_str(self):
+        self.assertEqual(
+            str(connections.SessionAuth('company', 'username', 't1')),
+            '<SessionAuth company=company username=username>'
+        )
+
+    def test_tostring(self):
+        self.assertEqual(
+            connections.SessionAuth('company', 'username', 't1').tostring(),
+            (
+                b'<Auth><Session><company>company</company>'
+                b'<user>username</user><id>t1</id></Session></Auth>'
+            )
+        )
+
+    def test_request(self):
+        app = connections.Application('test', '1.0', 'default', 'abc123')
+        auth = connections.SessionAuth('company', 'username', 't1')
+        request = connections.Request(app, auth, [commands.Time().time()])
+        self.assertEqual(request.tostring(), connections._Base.tostring(request))
+        self.assertIn(b'<id>t1</id>', request.tostring())
+
+    def test_cache_key_ignores_token(self):
+        read = commands.Read('Project', 'all', {'limit': '1'}).read()
+        self.assertEqual(
+            cache.key(connections.Auth('company', 'username', 'p'), read),
+            cache.key(connections.SessionAuth('company', 'username', 't1'), read)
+        )
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestSessionAuthClass)
+unittest.TextTestRunner(verbosity=2).run(suite)
+
+
+class TestSessionClass(unittest.TestCase):
+
+    def setUp(self):
+        self.app = connections.Application('test', '1.0', 'default', 'abc123')
+        self.auth = connections.Auth('company', 'username', 'p@ssw0rd')
+
+    def client(self, server):
+        return transport.Client(server.url, application=self.app, auth=self.auth)
+
+    def test_str(self):
+        client = transport.Client('http://127.0.0.1/api.pl',
+            application=self.app, auth=self.auth)
+        self.assertEqual(
+            str(session.Session(client)),
+            '<Session company=company username=username active=False>'
+        )
+
+    def test_requires_auth(self):
+        client = transport.Client('http://127.0.0.1/api.pl')
+        with self.assertRaises(Exception):
+            session.Session(client)
+
+    def test_reuses_token(self):
+        with MockServer(respond=issuer()) as server:
+            with self.client(server) as client:
+                s = session.Session(client)
+                for _ in range(3):
+                    response = s.send([commands.Time().time()])
+        self.assertEqual(logins(server), ['login', 't1', 't1'])
+        self.assertEqual(response.find('Time').get('status'), '0')
+        self.assertEqual(s.token, 't1')
+
+    def test_expired_token(self):
+        with MockServer(respond=issuer()) as server:
+            with self.client(server) as client:
+                s = session.Session(client)
+                s.login()
+                s.token = 'stale'
+                response = s.send([commands.Time().time()])
+                s.send([commands.Time().time()])
+        self.assertEqual(logins(server), ['login', 'stale', 'login', 't2'])
+        self.assertEqual(response.find('Auth').get('status'), '0')
+        self.assertEqual(response.find('Time').get('status'), '0')
+
+    def test_no_token_issued(self):
+        with MockServer() as server:
+            with self.client(server) as client:
+                s = session.Session(client)
+                self.assertIsNone(s.login())
+                s.send([commands.Time().time()])
+        self.assertEqual(logins(server), ['login', 'login'])
+
+    def test_send_request(self):
+        with MockServer(respond=issuer()) as server:
+            with self.client(server) as client:
+                s = session.Session(client)
+                s.login()
+                s.send(client.envelope([commands.Time().time()]))
+        self.assertEqual(logins(server), ['login', 't1'])
+
+    def test_batch(self):
+        reads = [commands.Read('Project', 'all', {'limit': '1'}) for _ in range(2)]
+        with MockServer(respond=issuer()) as server:
+            with self.client(server) as client:
+                s = session.Session(client)
+                s.login()
+                b = batch.Batch(self.app, self.auth, reads + [commands.Time()],
+                    max_commands=1)
+                found = b.send(s)
+        self.assertEqual(logins(server), ['login', 't1', 't1'])
+        self.assertEqual([r.tag for r in found], ['Read', 'Read', 'Time'])
+
+    def test_expire(self):
+        with MockServer(respond=issuer()) as server:
+            with self.client(server) as client:
+                s = session.Session(client)
+                s.login()
+                s.expire('other')
+                self.assertEqual(s.token, 't1')
+                s.expire()
+                self.assertIsInstance(s.auth, connections.Auth)
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestSessionClass)
+unittest.TextTestRunner(verbosity=2).run(suite)
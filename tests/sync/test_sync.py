@@ -0,0 +1,181 @@
+# -*- coding: utf-8
+from __future__ import absolute_import
+import os
+import shutil
+import tempfile
+import unittest
+from oaxmlapi import connections, sync, transport
+from mockserver import MockServer
+
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+
+def record(id, updated):
+    """
+    Returns a Project record element stamped updated.
+
+    """
+    day, time = updated.split(' ')
+    year, month, day = day.split('-')
+    hour, minute, second = time.split(':')
+    elem = ET.Element('Project')
+    ET.SubElement(elem, 'id').text = id
+    date = ET.SubElement(ET.SubElement(elem, 'updated'), 'Date')
+    for name, value in (('year', year), ('month', month), ('day', day),
+            ('hour', hour), ('minute', minute), ('second', second)):
+        ET.SubElement(date, name).text = value
+    return elem
+
+
+def table(rows):
+    """
+    Returns a responder which answers a Read from rows, a dict of id
+    to updated timestamp, honouring the newer-than filter, the order
+    and the limit.
+
+    """
+    def respond(body):
+        read = ET.fromstring(body).find('Read')
+        found = sorted(rows.items(), key=lambda row: (row[1], row[0]))
+        if read.get('filter') == 'newer-than':
+            after = sync.timestamp(read, '.')
+            found = [row for row in found if row[1] > after]
+        offset, size = [int(n) for n in read.get('limit').split(',')]
+        response = ET.Element('response')
+        ET.SubElement(response, 'Auth', {'status': '0'})
+        result = ET.SubElement(response, 'Read', {'status': '0'})
+        for id, updated in found[offset:offset + size]:
+            result.append(record(id, updated))
+        return ET.tostring(response, 'utf-8')
+    return respond
+
+
+class TestTimestamp(unittest.TestCase):
+
+    def test_timestamp(self):
+        self.assertEqual(
+            sync.timestamp(record('1', '2024-03-05 07:08:09')),
+            '2024-03-05 07:08:09'
+        )
+
+    def test_pads_fields(self):
+        elem = ET.fromstring(
+            b'<Project><updated><Date><year>2024</year><month>3</month>'
+            b'<day>5</day></Date></updated></Project>')
+        self.assertEqual(sync.timestamp(elem), '2024-03-05 00:00:00')
+
+    def test_missing(self):
+        self.assertIsNone(sync.timestamp(ET.Element('Project')))
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestTimestamp)
+unittest.TextTestRunner(verbosity=2).run(suite)
+
+
+class TestSyncClass(unittest.TestCase):
+
+    def setUp(self):
+        self.app = connections.Application('test', '1.0', 'default', 'abc123')
+        self.auth = connections.Auth('company', 'username', 'p@ssw0rd')
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, 'state.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def client(self, server):
+        return transport.Client(server.url, application=self.app, auth=self.auth)
+
+    def ids(self, rows, page_size=2):
+        with MockServer(respond=table(rows)) as server:
+            with self.client(server) as client:
+                s = sync.Sync(client, self.path, page_size=page_size)
+                return [r.findtext('id') for r in s.changes('Project')]
+
+    def test_str(self):
+        self.assertEqual(
+            str(sync.Sync(None, self.path)),
+            '<Sync state={path}>'.format(path=self.path)
+        )
+
+    def test_read(self):
+        s = sync.Sync(None, self.path)
+        self.assertEqual(
+            s.read('Project', '2024-01-01 00:00:00', fields=['name']).canonical(),
+            (
+                b'<Read field="updated" filter="newer-than" method="all" '
+                b'order="updated,asc" type="Project"><Date><day>31</day>'
+                b'<hour>23</hour><minute>59</minute><month>12</month>'
+                b'<second>59</second><year>2023</year></Date><_Return><id />'
+                b'<name /><updated /></_Return></Read>'
+            )
+        )
+
+    def test_first_run_reads_everything(self):
+        rows = {'1': '2024-01-01 00:00:01', '2': '2024-01-01 00:00:02',
+            '3': '2024-01-01 00:00:03'}
+        self.assertEqual(self.ids(rows), ['1', '2', '3'])
+        self.assertEqual(
+            sync.SyncState(self.path).mark('Project'),
+            ('2024-01-01 00:00:03', set(['3']))
+        )
+
+    def test_only_deltas(self):
+        rows = {'1': '2024-01-01 00:00:01', '2': '2024-01-01 00:00:02'}
+        self.ids(rows)
+        self.assertEqual(self.ids(rows), [])
+        rows['1'] = '2024-01-02 00:00:00'
+        rows['3'] = '2024-01-02 00:00:01'
+        self.assertEqual(self.ids(rows), ['1', '3'])
+
+    def test_shared_timestamp(self):
+        rows = dict((str(i), '2024-01-01 00:00:00') for i in range(5))
+        rows['9'] = '2024-01-01 00:00:01'
+        self.assertEqual(sorted(self.ids(rows)), ['0', '1', '2', '3', '4', '9'])
+
+    def test_window_never_exceeds_page_size(self):
+        rows = dict((str(i), '2024-01-01 00:00:00') for i in range(7))
+        rows['9'] = '2024-01-01 00:00:01'
+        with MockServer(respond=table(rows)) as server:
+            with self.client(server) as client:
+                s = sync.Sync(client, self.path, page_size=2)
+                ids = [r.findtext('id') for r in s.changes('Project')]
+                again = list(s.changes('Project'))
+        self.assertEqual(sorted(ids), sorted(rows))
+        self.assertEqual(again, [])
+        limits = [ET.fromstring(body).find('Read').get('limit')
+            for body in server.requests]
+        self.assertTrue(all(limit.endswith(',2') for limit in limits))
+        # the tied run is paged through once, not re-read on every page
+        self.assertEqual(limits, ['0,2', '2,2', '4,2', '6,2', '1,2', '0,2'])
+
+    def test_late_write_at_mark(self):
+        rows = {'1': '2024-01-01 00:00:05', '2': '2024-01-01 00:00:05'}
+        self.ids(rows)
+        # written in the same second, after the last run read the mark
+        rows['3'] = '2024-01-01 00:00:05'
+        self.assertEqual(self.ids(rows), ['3'])
+
+    def test_stopped_run_resumes(self):
+        rows = dict((str(i), '2024-01-01 00:00:0{0}'.format(i)) for i in range(1, 6))
+        with MockServer(respond=table(rows)) as server:
+            with self.client(server) as client:
+                changes = sync.Sync(client, self.path, page_size=2).changes('Project')
+                first = [next(changes).findtext('id') for _ in range(3)]
+                changes.close()
+        self.assertEqual(first, ['1', '2', '3'])
+        # the second page was not finished, so it is read again
+        self.assertEqual(self.ids(rows), ['3', '4', '5'])
+
+    def test_reset(self):
+        rows = {'1': '2024-01-01 00:00:01'}
+        self.ids(rows)
+        state = sync.SyncState(self.path)
+        state.reset('Project')
+        state.save()
+        self.assertEqual(self.ids(rows), ['1'])
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestSyncClass)
+unittest.TextTestRunner(verbosity=2).run(suite)
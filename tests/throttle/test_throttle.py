@@ -0,0 +1,204 @@
+# -*- coding: utf-8
+from __future__ import absolute_import
+import threading
+import time
+import unittest
+from oaxmlapi import commands, connections, throttle, transport
+from oaxmlapi.transport import TransportError
+from mockserver import MockServer
+
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+
+class TestTokenBucketClass(unittest.TestCase):
+
+    def test_str(self):
+        self.assertEqual(
+            str(throttle.TokenBucket(10, 2)),
+            '<TokenBucket rate=10.0 burst=2.0>'
+        )
+
+    def test_burst(self):
+        bucket = throttle.TokenBucket(10, 2)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertAlmostEqual(bucket.reserve(), 0.1, places=2)
+
+    def test_debt(self):
+        bucket = throttle.TokenBucket(100, 10)
+        self.assertAlmostEqual(bucket.reserve(60), 0.5, places=2)
+
+    def test_invalid_rate(self):
+        with self.assertRaises(Exception):
+            throttle.TokenBucket(0)
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestTokenBucketClass)
+unittest.TextTestRunner(verbosity=2).run(suite)
+
+
+class TestRateLimiterClass(unittest.TestCase):
+
+    def test_str(self):
+        self.assertEqual(
+            str(throttle.RateLimiter(requests=5)),
+            '<RateLimiter requests=5.0 commands=None>'
+        )
+
+    def test_requires_a_limit(self):
+        with self.assertRaises(Exception):
+            throttle.RateLimiter()
+
+    def test_commands(self):
+        limiter = throttle.RateLimiter(requests=100, commands=10)
+        self.assertEqual(limiter.reserve(10), 0)
+        self.assertAlmostEqual(limiter.reserve(5), 0.5, places=2)
+
+    def test_acquire_waits(self):
+        limiter = throttle.RateLimiter(requests=20, burst=1)
+        started = time.time()
+        for _ in range(3):
+            limiter.acquire()
+        self.assertGreaterEqual(time.time() - started, 0.09)
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestRateLimiterClass)
+unittest.TextTestRunner(verbosity=2).run(suite)
+
+
+class TestAdaptiveLimitClass(unittest.TestCase):
+
+    def test_str(self):
+        self.assertEqual(
+            str(throttle.AdaptiveLimit()),
+            '<AdaptiveLimit limit=4 in_flight=0>'
+        )
+
+    def test_invalid_limits(self):
+        with self.assertRaises(Exception):
+            throttle.AdaptiveLimit(minimum=4, maximum=2)
+        with self.assertRaises(Exception):
+            throttle.AdaptiveLimit(backoff=1)
+
+    def test_increase(self):
+        limit = throttle.AdaptiveLimit(initial=2, maximum=3)
+        for _ in range(20):
+            limit.acquire()
+            limit.release(0.1)
+        self.assertEqual(limit.limit, 3)
+
+    def test_throttled(self):
+        limit = throttle.AdaptiveLimit(initial=8)
+        limit.throttled()
+        self.assertEqual(limit.limit, 4)
+        # a second signal within the same window is ignored
+        limit.throttled()
+        self.assertEqual(limit.limit, 4)
+        for _ in range(4):
+            limit.acquire()
+            limit.release(0.1)
+        limit.throttled()
+        self.assertEqual(limit.limit, 2)
+
+    def test_minimum(self):
+        limit = throttle.AdaptiveLimit(initial=2, minimum=2)
+        limit.throttled()
+        self.assertEqual(limit.limit, 2)
+
+    def test_latency(self):
+        limit = throttle.AdaptiveLimit(initial=8)
+        limit.acquire()
+        limit.release(0.1)
+        for _ in range(10):
+            limit.acquire()
+            limit.release(1.0)
+        self.assertLess(limit.limit, 8)
+
+    def test_failed_request(self):
+        limit = throttle.AdaptiveLimit(initial=4)
+        limit.acquire()
+        limit.release()
+        self.assertEqual((limit.limit, limit.in_flight), (4, 0))
+
+    def test_blocks_at_limit(self):
+        limit = throttle.AdaptiveLimit(initial=1)
+        limit.acquire()
+        acquired = []
+        thread = threading.Thread(
+            target=lambda: acquired.append(limit.acquire()))
+        thread.start()
+        thread.join(0.05)
+        self.assertEqual(acquired, [])
+        limit.release(0.1)
+        thread.join(1)
+        self.assertEqual(len(acquired), 1)
+
+    def test_observe(self):
+        response = ET.fromstring(
+            b'<response><Auth status="0"/><Read status="555"/></response>')
+        self.assertFalse(throttle.AdaptiveLimit().observe(response))
+        limit = throttle.AdaptiveLimit(initial=8, codes=[555])
+        self.assertTrue(limit.observe(response))
+        self.assertEqual(limit.limit, 4)
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestAdaptiveLimitClass)
+unittest.TextTestRunner(verbosity=2).run(suite)
+
+
+class TestClientThrottle(unittest.TestCase):
+
+    def setUp(self):
+        self.app = connections.Application('test', '1.0', 'default', 'abc123')
+        self.auth = connections.Auth('company', 'username', 'p@ssw0rd')
+
+    def request(self, count=1):
+        return connections.Request(self.app, self.auth,
+            [commands.Time().time() for _ in range(count)])
+
+    def test_http_throttle(self):
+        limit = throttle.AdaptiveLimit(initial=8)
+        with MockServer(respond=lambda body: (429, b'slow down')) as server:
+            with transport.Client(server.url, concurrency=limit) as client:
+                with self.assertRaises(TransportError):
+                    client.send(self.request())
+        self.assertEqual((limit.limit, limit.in_flight), (4, 0))
+
+    def test_status_throttle(self):
+        limit = throttle.AdaptiveLimit(initial=8, codes=['555'])
+        respond = lambda body: b'<response><Time status="555"/></response>'
+        with MockServer(respond=respond) as server:
+            with transport.Client(server.url, concurrency=limit) as client:
+                client.send(self.request())
+        self.assertEqual(limit.limit, 4)
+
+    def test_stream_releases(self):
+        limit = throttle.AdaptiveLimit(initial=1)
+        with MockServer() as server:
+            with transport.Client(server.url, concurrency=limit) as client:
+                for _ in range(2):
+                    with client.stream(self.request()) as res:
+                        res.read()
+        self.assertEqual(limit.in_flight, 0)
+
+    def test_commands_limit(self):
+        limiter = throttle.RateLimiter(commands=20)
+        with MockServer() as server:
+            with transport.Client(server.url, limiter=limiter) as client:
+                started = time.time()
+                client.send(self.request(20))
+                client.send(self.request(2))
+        self.assertGreaterEqual(time.time() - started, 0.09)
+
+    def test_upload_meters_commands(self):
+        limiter = throttle.RateLimiter(commands=20)
+        with MockServer() as server:
+            with transport.Client(server.url, application=self.app,
+                    auth=self.auth, limiter=limiter) as client:
+                started = time.time()
+                response = client.upload(commands.Time().time() for _ in range(22))
+        self.assertEqual(len(response.findall('Time')), 22)
+        self.assertGreaterEqual(time.time() - started, 0.09)
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestClientThrottle)
+unittest.TextTestRunner(verbosity=2).run(suite)
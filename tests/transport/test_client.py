@@ -0,0 +1,149 @@
+# -*- coding: utf-8
+from __future__ import absolute_import
+import unittest
+from oaxmlapi import commands, connections, datatypes, transport
+from mockserver import MockServer, echo_status
+
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+
+def time_request():
+    app = connections.Application('test', '1.0', 'default', 'abc123')
+    auth = connections.Auth('company', 'username', 'p@ssw0rd')
+    return connections.Request(app, auth, [commands.Time().time()])
+
+
+class TestClientClass(unittest.TestCase):
+
+    def test_str(self):
+        self.assertEqual(
+            str(transport.Client('https://www.openair.com/api.pl')),
+            '<Client url=https://www.openair.com/api.pl>'
+        )
+
+    def test_invalid_scheme(self):
+        with self.assertRaises(Exception):
+            transport.Client('ftp://www.openair.com/api.pl')
+
+    def test_send(self):
+        with MockServer() as server:
+            with transport.Client(server.url) as client:
+                response = client.send(time_request())
+        self.assertIsInstance(response, ET.Element)
+        self.assertEqual(
+            ET.tostring(response),
+            b'<response><Auth status="0" /><Time status="0" /></response>'
+        )
+        self.assertEqual(server.requests, [time_request().tostring()])
+
+    def test_keepalive_reuses_connection(self):
+        with MockServer() as server:
+            with transport.Client(server.url, pool_size=2) as client:
+                for i in range(5):
+                    client.send(time_request())
+        self.assertEqual(len(server.requests), 5)
+        self.assertEqual(server.connections, 1)
+
+    def test_no_keepalive(self):
+        with MockServer() as server:
+            with transport.Client(server.url, keepalive=False) as client:
+                for i in range(3):
+                    client.send(time_request())
+        self.assertEqual(server.connections, 3)
+
+    def test_stale_connection(self):
+        with MockServer() as server:
+            client = transport.Client(server.url)
+            client.send(time_request())
+            conn = client.pool._idle.get_nowait()
+            conn.sock.close()
+            client.pool._idle.put(conn)
+            client.send(time_request())
+            client.close()
+        self.assertEqual(len(server.requests), 2)
+
+    def test_hang_up_after_send(self):
+        calls = []
+
+        def respond(body):
+            calls.append(body)
+            if len(calls) == 2:
+                return None
+            return echo_status(body)
+
+        app = connections.Application('test', '1.0', 'default', 'abc123')
+        auth = connections.Auth('company', 'username', 'p@ssw0rd')
+        add = commands.Add('Task', {}, datatypes.Datatype('Task', {'name': 'x'})).add()
+        with MockServer(respond=respond) as server:
+            with transport.Client(server.url) as client:
+                client.send(time_request())
+                # the Add may have run, so it is not sent again
+                with self.assertRaises(Exception):
+                    client.send(connections.Request(app, auth, [add]))
+                del calls[:]
+                client.send(time_request())
+                # a Time is safe to send again
+                client.send(time_request())
+        self.assertEqual(len(server.requests), 5)
+
+    def test_stream(self):
+        with MockServer() as server:
+            with transport.Client(server.url) as client:
+                with client.stream(time_request()) as res:
+                    data = res.read()
+                client.send(time_request())
+        self.assertEqual(
+            data,
+            b'<response><Auth status="0" /><Time status="0" /></response>'
+        )
+        self.assertEqual(server.connections, 1)
+
+    def test_stream_unread(self):
+        with MockServer() as server:
+            with transport.Client(server.url) as client:
+                with client.stream(time_request()) as res:
+                    res.read(10)
+                client.send(time_request())
+        self.assertEqual(server.connections, 2)
+
+    def test_stream_http_error(self):
+        with MockServer(respond=lambda body: (500, b'oops')) as server:
+            with transport.Client(server.url) as client:
+                with self.assertRaises(transport.TransportError):
+                    with client.stream(time_request()) as res:
+                        res.read()
+
+    def test_upload(self):
+        app = connections.Application('test', '1.0', 'default', 'abc123')
+        auth = connections.Auth('company', 'username', 'p@ssw0rd')
+        adds = [
+            commands.Add('Task', {}, datatypes.Datatype('Task', {'id': str(i)}))
+            for i in range(100)
+        ]
+        with MockServer() as server:
+            with transport.Client(server.url, application=app, auth=auth) as client:
+                response = client.upload(iter(adds))
+        self.assertEqual(len(response.findall('Add')), 100)
+        self.assertEqual(
+            server.requests,
+            [connections.Request(app, auth, [a.add() for a in adds]).tostring()]
+        )
+        self.assertEqual(server.headers[0].get('Transfer-Encoding'), 'chunked')
+
+    def test_upload_no_auth(self):
+        with self.assertRaises(Exception):
+            transport.Client('http://127.0.0.1/').upload([])
+
+    def test_http_error(self):
+        with MockServer(respond=lambda body: (500, b'oops')) as server:
+            with transport.Client(server.url) as client:
+                with self.assertRaises(transport.TransportError) as ctx:
+                    client.send(time_request())
+        self.assertEqual(ctx.exception.status, 500)
+        self.assertEqual(ctx.exception.body, b'oops')
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestClientClass)
+unittest.TextTestRunner(verbosity=2).run(suite)
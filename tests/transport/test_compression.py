@@ -0,0 +1,149 @@
+# -*- coding: utf-8
+from __future__ import absolute_import
+import io
+import unittest
+from oaxmlapi import commands, connections, datatypes, transport, utilities
+from oaxmlapi.transport import TransportError
+from mockserver import MockServer, compress
+
+
+RECORDS = 2000
+
+
+def wide_read(body):
+    """
+    Answer with a Read result of RECORDS repetitive Task records.
+
+    """
+    tasks = b''.join(
+        b'<Task><id>' + str(i).encode('ascii') + b'</id><name>Task name</name>'
+        b'<notes>The same notes on every task</notes></Task>'
+        for i in range(RECORDS))
+    return (b'<response><Auth status="0"/><Read status="0">' + tasks +
+        b'</Read></response>')
+
+
+def read_request():
+    app = connections.Application('test', '1.0', 'default', 'abc123')
+    auth = connections.Auth('company', 'username', 'p@ssw0rd')
+    return connections.Request(app, auth,
+        [commands.Read('Task', 'all', {'limit': '1000'}).read()])
+
+
+class TestDecode(unittest.TestCase):
+
+    def test_identity(self):
+        self.assertEqual(transport.decode(b'<a/>', None), b'<a/>')
+        self.assertEqual(transport.decode(b'<a/>', 'identity'), b'<a/>')
+
+    def test_encodings(self):
+        for encoding in ('gzip', 'deflate', 'raw-deflate'):
+            self.assertEqual(
+                transport.decode(compress(b'<a/>', encoding),
+                    encoding.replace('raw-', '')),
+                b'<a/>'
+            )
+
+    def test_unsupported(self):
+        with self.assertRaises(Exception):
+            transport.decode(b'<a/>', 'br')
+
+    def test_decoded_response(self):
+        data = wide_read(b'')
+        for encoding in ('gzip', 'deflate', 'raw-deflate'):
+            res = transport.DecodedResponse(
+                io.BytesIO(compress(data, encoding)), encoding.replace('raw-', ''))
+            parts = []
+            while True:
+                part = res.read(1000)
+                if not part:
+                    break
+                parts.append(part)
+            self.assertEqual(b''.join(parts), data)
+
+    def test_decoded_response_bounded(self):
+        data = b'<a>' + b' ' * (4 * 1024 * 1024) + b'</a>'
+        res = transport.DecodedResponse(io.BytesIO(compress(data, 'gzip')), 'gzip')
+        sizes = []
+        while True:
+            part = res.read(1000)
+            if not part:
+                break
+            sizes.append(len(part))
+        self.assertEqual(max(sizes), 1000)
+        self.assertEqual(sum(sizes), len(data))
+        res = transport.DecodedResponse(io.BytesIO(compress(data, 'gzip')), 'gzip')
+        self.assertEqual(res.read(10) + res.read(), data)
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestDecode)
+unittest.TextTestRunner(verbosity=2).run(suite)
+
+
+class TestClientCompression(unittest.TestCase):
+
+    def test_accept_encoding(self):
+        with MockServer() as server:
+            with transport.Client(server.url) as client:
+                client.send(read_request())
+            with transport.Client(server.url, compression=False) as client:
+                client.send(read_request())
+        self.assertEqual(server.headers[0].get('Accept-Encoding'), 'gzip, deflate')
+        self.assertEqual(server.headers[1].get('Accept-Encoding'), 'identity')
+
+    def test_send(self):
+        for encoding in ('gzip', 'deflate', 'raw-deflate'):
+            with MockServer(respond=wide_read, encoding=encoding) as server:
+                with transport.Client(server.url) as client:
+                    response = client.send(read_request())
+            self.assertEqual(len(response.find('Read')), RECORDS)
+
+    def test_stream(self):
+        for encoding in ('gzip', 'deflate', 'raw-deflate'):
+            with MockServer(respond=wide_read, encoding=encoding) as server:
+                with transport.Client(server.url) as client:
+                    for _ in range(2):
+                        with client.stream(read_request()) as res:
+                            ids = [t.findtext('id') for t in utilities.iterrecords(res)]
+                        self.assertEqual(len(ids), RECORDS)
+                        self.assertEqual(ids[-1], str(RECORDS - 1))
+            # the fully read connection went back to the pool
+            self.assertEqual(server.connections, 1)
+
+    def test_http_error(self):
+        with MockServer(respond=lambda body: (503, b'unavailable'),
+                encoding='gzip') as server:
+            with transport.Client(server.url) as client:
+                with self.assertRaises(TransportError) as ctx:
+                    client.send(read_request())
+        self.assertEqual(ctx.exception.body, b'unavailable')
+
+    def test_compress_requests(self):
+        request = read_request()
+        with MockServer() as server:
+            with transport.Client(server.url, compress_requests=100) as client:
+                client.send(request)
+            with transport.Client(server.url, compress_requests=10 ** 6) as client:
+                client.send(request)
+        self.assertEqual(server.headers[0].get('Content-Encoding'), 'gzip')
+        self.assertIsNone(server.headers[1].get('Content-Encoding'))
+        self.assertEqual(server.requests, [request.tostring()] * 2)
+
+    def test_compress_upload(self):
+        app = connections.Application('test', '1.0', 'default', 'abc123')
+        auth = connections.Auth('company', 'username', 'p@ssw0rd')
+        adds = [
+            commands.Add('Task', {}, datatypes.Datatype('Task', {'name': str(i)}))
+            for i in range(100)
+        ]
+        with MockServer(encoding='gzip') as server:
+            with transport.Client(server.url, application=app, auth=auth,
+                    compress_requests=0) as client:
+                response = client.upload(adds)
+        self.assertEqual(len(response.findall('Add')), 100)
+        self.assertEqual(server.headers[0].get('Content-Encoding'), 'gzip')
+        self.assertEqual(server.headers[0].get('Transfer-Encoding'), 'chunked')
+        self.assertEqual(server.requests,
+            [connections.Request(app, auth, [a.add() for a in adds]).tostring()])
+
+suite = unittest.TestLoader().loadTestsFromTestCase(TestClientCompression)
+unittest.TextTestRunner(verbosity=2).run(suite)
@@ -1,5 +1,7 @@
 # -*- coding: utf-8
 from __future__ import absolute_import, print_function
+import io
+import sys
 import unittest
 from oaxmlapi import utilities
 
@@ -37,5 +39,105 @@ class TestUtilitiesClass(unittest.TestCase):
             )
         )
 
+    def test_elem2dict_repeated(self):
+        elem = ET.fromstring(
+            '<Read status="0"><Task><id>1</id></Task><Task><id>2</id></Task>'
+            '<Task><id>3</id></Task></Read>'
+        )
+        self.assertEqual(
+            utilities.elem2dict(elem),
+            {'Read': {'@status': '0', 'Task': [{'id': '1'}, {'id': '2'}, {'id': '3'}]}}
+        )
+
+    def test_elem2dict_repeated_leaf(self):
+        elem = ET.fromstring('<flags><name>a</name><name/><name>c</name></flags>')
+        self.assertEqual(
+            utilities.elem2dict(elem),
+            {'flags': {'name': ['a', None, 'c']}}
+        )
+
+    def test_elem2dict_text_and_attribs(self):
+        elem = ET.fromstring('<total currency="USD"> 99.00 </total>')
+        self.assertEqual(
+            utilities.elem2dict(elem),
+            {'total': {'@currency': 'USD', '#text': '99.00'}}
+        )
+
+    def test_elem2dict_deep(self):
+        depth = sys.getrecursionlimit() + 100
+        elem = ET.fromstring('<a>' * depth + 'x' + '</a>' * depth)
+        value = utilities.elem2dict(elem)
+        for i in range(depth - 1):
+            value = value['a']
+        self.assertEqual(value, {'a': 'x'})
+
+    def test_iterrecords(self):
+        xml_res = (
+            b'<response><Auth status="0"/><Read status="0">'
+            b'<Task><id>1</id></Task><Task><id>2</id></Task></Read></response>'
+        )
+        self.assertEqual(
+            [r.find('id').text for r in utilities.iterrecords(xml_res)],
+            ['1', '2']
+        )
+
+    def test_iterrecords_file(self):
+        xml_res = io.BytesIO(
+            b'<response><Auth status="0"/><Read status="0">'
+            b'<Task><id>1</id></Task></Read></response>'
+        )
+        self.assertEqual(
+            [r.tag for r in utilities.iterrecords(xml_res)],
+            ['Task']
+        )
+
+    def test_iterrecords_tag(self):
+        xml_res = (
+            b'<response><Auth status="0"/><Read status="0"><Task><id>1</id></Task>'
+            b'</Read><Read status="0"><Project><id>2</id></Project></Read></response>'
+        )
+        self.assertEqual(
+            [r.tag for r in utilities.iterrecords(xml_res, tag='Project')],
+            ['Project']
+        )
+
+    def test_iterrecords_kept(self):
+        xml_res = (
+            b'<response><Auth status="0"/><Read status="0">'
+            b'<Task><id>1</id></Task><Task><id>2</id></Task></Read></response>'
+        )
+        kept = list(utilities.iterrecords(xml_res))
+        self.assertEqual([r.find('id').text for r in kept], ['1', '2'])
+
+    def test_iterrecords_session_token(self):
+        xml_res = (
+            b'<response><Auth status="0"><session>tok</session></Auth>'
+            b'<Read status="0"><Task><id>1</id></Task></Read></response>'
+        )
+        self.assertEqual(
+            [r.tag for r in utilities.iterrecords(xml_res)],
+            ['Task']
+        )
+
+    def test_iterrecords_status(self):
+        xml_res = b'<response><Auth status="0"/><Read status="602"/></response>'
+        with self.assertRaises(Exception):
+            list(utilities.iterrecords(xml_res))
+
+    def test_iterrecords_auth_status(self):
+        xml_res = b'<response><Auth status="401"/></response>'
+        with self.assertRaises(Exception):
+            list(utilities.iterrecords(xml_res))
+
+    def test_choices(self):
+        self.assertIsInstance(utilities.READ_METHODS, tuple)
+        self.assertIn('equal to', utilities.READ_METHODS)
+        self.assertNotIn(['all'], utilities.READ_METHODS)
+        self.assertEqual(utilities.READ_METHODS.check('all'), 'all')
+
+    def test_choices_invalid(self):
+        with self.assertRaises(Exception):
+            utilities.PAGE_ATTRIBUTES.check('no-such-page')
+
 suite = unittest.TestLoader().loadTestsFromTestCase(TestUtilitiesClass)
 unittest.TextTestRunner(verbosity=2).run(suite)